@@ -0,0 +1,30 @@
+"""rename scrape_costs cpu_ms to python_cpu_ms
+
+Revision ID: 1e8b4d6a9c52
+Revises: 7c2e4a9d1f36
+Create Date: 2026-10-19 14:03:27.518240
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '1e8b4d6a9c52'
+down_revision: Union[str, Sequence[str], None] = '7c2e4a9d1f36'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# The column holds the scraping thread's own CPU, which is mostly spent waiting on
+# Playwright; the browser doing the work runs in separate processes.
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.alter_column('scrape_costs', 'cpu_ms', new_column_name='python_cpu_ms')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.alter_column('scrape_costs', 'python_cpu_ms', new_column_name='cpu_ms')
@@ -0,0 +1,50 @@
+"""add scrape jobs table
+
+Revision ID: 3f1c2b7d9e04
+Revises: 8c9eab87aa95
+Create Date: 2026-10-19 11:40:02.518736
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3f1c2b7d9e04'
+down_revision: Union[str, Sequence[str], None] = '8c9eab87aa95'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('scrape_jobs',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('game_id', sa.Integer(), nullable=True),
+    sa.Column('kind', sa.String(), nullable=True),
+    sa.Column('status', sa.String(), nullable=True),
+    sa.Column('result', sa.JSON(), nullable=True),
+    sa.Column('error', sa.String(), nullable=True),
+    sa.Column('attempts', sa.Integer(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('started_at', sa.DateTime(), nullable=True),
+    sa.Column('finished_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_scrape_jobs_id'), 'scrape_jobs', ['id'], unique=False)
+    op.create_index(op.f('ix_scrape_jobs_game_id'), 'scrape_jobs', ['game_id'], unique=False)
+    op.create_index('ix_scrape_jobs_queued', 'scrape_jobs', ['status', 'id'], unique=False)
+    op.create_index('uq_scrape_jobs_active', 'scrape_jobs', ['game_id', 'kind'], unique=True,
+                    postgresql_where=sa.text("status IN ('queued', 'running')"),
+                    sqlite_where=sa.text("status IN ('queued', 'running')"))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('uq_scrape_jobs_active', table_name='scrape_jobs')
+    op.drop_index('ix_scrape_jobs_queued', table_name='scrape_jobs')
+    op.drop_index(op.f('ix_scrape_jobs_game_id'), table_name='scrape_jobs')
+    op.drop_index(op.f('ix_scrape_jobs_id'), table_name='scrape_jobs')
+    op.drop_table('scrape_jobs')
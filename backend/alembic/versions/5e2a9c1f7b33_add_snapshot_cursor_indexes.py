@@ -0,0 +1,40 @@
+"""add snapshot cursor indexes
+
+Revision ID: 5e2a9c1f7b33
+Revises: c47e0d1a5b62
+Create Date: 2026-10-19 14:21:48.530117
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5e2a9c1f7b33'
+down_revision: Union[str, Sequence[str], None] = 'c47e0d1a5b62'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+INDEXES = [
+    ('ix_quarter_snapshots_game_id_id', 'quarter_snapshots', ['game_id', 'id']),
+    ('ix_quarter_snapshots_game_id_timestamp', 'quarter_snapshots', ['game_id', 'timestamp']),
+    ('ix_live_odds_snapshots_game_id_id', 'live_odds_snapshots', ['game_id', 'id']),
+    ('ix_live_odds_snapshots_game_id_timestamp', 'live_odds_snapshots', ['game_id', 'timestamp']),
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # CONCURRENTLY cannot run inside a transaction; avoids locking writers on live tables
+    with op.get_context().autocommit_block():
+        for name, table, columns in INDEXES:
+            op.create_index(name, table, columns, postgresql_concurrently=True, if_not_exists=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        for name, table, _ in INDEXES:
+            op.drop_index(name, table_name=table, postgresql_concurrently=True, if_exists=True)
@@ -0,0 +1,40 @@
+"""sqlite autoincrement snapshot ids
+
+Revision ID: 7c2e4a9d1f36
+Revises: b5c19e7a4f20
+Create Date: 2026-10-20 10:12:44.208311
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7c2e4a9d1f36'
+down_revision: Union[str, Sequence[str], None] = 'b5c19e7a4f20'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Without AUTOINCREMENT SQLite reuses the ids of deleted rows, so a snapshot written
+# after its game was archived and pruned could get an archived row's id. Postgres
+# sequences never go back, so this only rebuilds the SQLite tables.
+TABLES = ['quarter_snapshots', 'live_odds_snapshots']
+
+
+def _rebuild(autoincrement: bool) -> None:
+    if op.get_bind().dialect.name != 'sqlite':
+        return
+    for table in TABLES:
+        with op.batch_alter_table(table, recreate='always', table_kwargs={'sqlite_autoincrement': autoincrement}):
+            pass
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    _rebuild(True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    _rebuild(False)
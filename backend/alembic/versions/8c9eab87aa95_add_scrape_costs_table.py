@@ -0,0 +1,46 @@
+"""add scrape costs table
+
+Revision ID: 8c9eab87aa95
+Revises: a9692de0a2aa
+Create Date: 2026-10-19 09:12:41.204118
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8c9eab87aa95'
+down_revision: Union[str, Sequence[str], None] = 'a9692de0a2aa'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('scrape_costs',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('game_id', sa.Integer(), nullable=True),
+    sa.Column('cycle_id', sa.Integer(), nullable=True),
+    sa.Column('kind', sa.String(), nullable=True),
+    sa.Column('wall_ms', sa.Integer(), nullable=True),
+    sa.Column('cpu_ms', sa.Integer(), nullable=True),
+    sa.Column('bytes_in', sa.Integer(), nullable=True),
+    sa.Column('pages_opened', sa.Integer(), nullable=True),
+    sa.Column('retries', sa.Integer(), nullable=True),
+    sa.Column('timestamp', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_scrape_costs_id'), 'scrape_costs', ['id'], unique=False)
+    op.create_index(op.f('ix_scrape_costs_game_id'), 'scrape_costs', ['game_id'], unique=False)
+    op.create_index(op.f('ix_scrape_costs_cycle_id'), 'scrape_costs', ['cycle_id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_scrape_costs_cycle_id'), table_name='scrape_costs')
+    op.drop_index(op.f('ix_scrape_costs_game_id'), table_name='scrape_costs')
+    op.drop_index(op.f('ix_scrape_costs_id'), table_name='scrape_costs')
+    op.drop_table('scrape_costs')
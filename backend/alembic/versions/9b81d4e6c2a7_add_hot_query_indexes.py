@@ -0,0 +1,45 @@
+"""add hot query indexes
+
+Revision ID: 9b81d4e6c2a7
+Revises: 5e2a9c1f7b33
+Create Date: 2026-10-19 16:02:11.274903
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9b81d4e6c2a7'
+down_revision: Union[str, Sequence[str], None] = '5e2a9c1f7b33'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# The snapshot (game_id, id) / (game_id, timestamp) indexes landed in 5e2a9c1f7b33;
+# these cover the remaining queries the scheduler, alerts and dashboard run every cycle
+ACTIVE_GAMES = "status IN ('scheduled', 'live')"
+
+INDEXES = [
+    ('ix_games_active', 'games', ['status']),
+    ('ix_alerts_game_id_timestamp', 'alerts', ['game_id', 'timestamp']),
+    ('ix_live_odds_snapshots_timestamp', 'live_odds_snapshots', ['timestamp']),
+    ('ix_odds_snapshots_game_id_timestamp', 'odds_snapshots', ['game_id', 'timestamp']),
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    with op.get_context().autocommit_block():
+        for name, table, columns in INDEXES:
+            where = {'postgresql_where': sa.text(ACTIVE_GAMES), 'sqlite_where': sa.text(ACTIVE_GAMES)} \
+                if name == 'ix_games_active' else {}
+            op.create_index(name, table, columns, postgresql_concurrently=True, if_not_exists=True, **where)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        for name, table, _ in INDEXES:
+            op.drop_index(name, table_name=table, postgresql_concurrently=True, if_exists=True)
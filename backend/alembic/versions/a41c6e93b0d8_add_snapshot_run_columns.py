@@ -0,0 +1,34 @@
+"""add snapshot run columns
+
+Revision ID: a41c6e93b0d8
+Revises: d2f7a3c8e915
+Create Date: 2026-10-19 19:27:03.604118
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a41c6e93b0d8'
+down_revision: Union[str, Sequence[str], None] = 'd2f7a3c8e915'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+TABLES = ('quarter_snapshots', 'live_odds_snapshots')
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    for table in TABLES:
+        op.add_column(table, sa.Column('valid_until', sa.DateTime(), nullable=True))
+        op.add_column(table, sa.Column('repeat_count', sa.Integer(), nullable=False, server_default='1'))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for table in TABLES:
+        op.drop_column(table, 'repeat_count')
+        op.drop_column(table, 'valid_until')
@@ -0,0 +1,35 @@
+"""unique games.oddsportal_url
+
+Revision ID: b5c19e7a4f20
+Revises: e83b5f0d2c41
+Create Date: 2026-10-19 23:41:06.518204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b5c19e7a4f20'
+down_revision: Union[str, Sequence[str], None] = 'e83b5f0d2c41'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Sync matched duplicate URLs to their lowest id; the others keep their
+    # snapshots but lose the URL (NULLs don't collide in a unique index)
+    op.execute(sa.text(
+        "UPDATE games SET oddsportal_url = NULL "
+        "WHERE oddsportal_url IS NOT NULL AND id NOT IN ("
+        "SELECT keep_id FROM (SELECT MIN(id) AS keep_id FROM games GROUP BY oddsportal_url) AS keep)"
+    ))
+    op.create_index('uq_games_oddsportal_url', 'games', ['oddsportal_url'], unique=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('uq_games_oddsportal_url', table_name='games')
@@ -0,0 +1,28 @@
+"""add games data_version
+
+Revision ID: c47e0d1a5b62
+Revises: 3f1c2b7d9e04
+Create Date: 2026-10-19 13:05:27.914402
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c47e0d1a5b62'
+down_revision: Union[str, Sequence[str], None] = '3f1c2b7d9e04'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('games', sa.Column('data_version', sa.Integer(), nullable=False, server_default='0'))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('games', 'data_version')
@@ -0,0 +1,109 @@
+"""partition snapshot tables by month
+
+Revision ID: d2f7a3c8e915
+Revises: 9b81d4e6c2a7
+Create Date: 2026-10-19 18:40:37.518204
+
+"""
+from datetime import date, datetime, timezone
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd2f7a3c8e915'
+down_revision: Union[str, Sequence[str], None] = '9b81d4e6c2a7'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Partitions ahead of the current month; app/partitions.py keeps this window rolling
+PREMAKE_MONTHS = 3
+
+# (name, columns) recreated on the partitioned parent, which cascades them to every partition
+INDEXES = {
+    'quarter_snapshots': [
+        ('ix_quarter_snapshots_id', ['id']),
+        ('ix_quarter_snapshots_game_id_id', ['game_id', 'id']),
+        ('ix_quarter_snapshots_game_id_timestamp', ['game_id', 'timestamp']),
+    ],
+    'live_odds_snapshots': [
+        ('ix_live_odds_snapshots_id', ['id']),
+        ('ix_live_odds_snapshots_game_id', ['game_id']),
+        ('ix_live_odds_snapshots_game_id_id', ['game_id', 'id']),
+        ('ix_live_odds_snapshots_game_id_timestamp', ['game_id', 'timestamp']),
+        ('ix_live_odds_snapshots_timestamp', ['timestamp']),
+    ],
+}
+
+
+def _add_months(month: date, n: int) -> date:
+    index = month.year * 12 + month.month - 1 + n
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def _create_indexes(table: str) -> None:
+    for name, columns in INDEXES[table]:
+        op.create_index(name, table, columns)
+    if table == 'quarter_snapshots':
+        op.create_foreign_key('quarter_snapshots_game_id_fkey', table, 'games', ['game_id'], ['id'])
+
+
+def _partition(table: str) -> None:
+    bind = op.get_bind()
+    legacy = f'{table}_legacy'
+    op.rename_table(table, legacy)
+
+    op.execute(f'CREATE TABLE {table} (LIKE {legacy} INCLUDING DEFAULTS) PARTITION BY RANGE (timestamp)')
+    # the partition key must be part of every unique constraint, and can't be NULL
+    op.execute(f"UPDATE {legacy} SET timestamp = '1970-01-01' WHERE timestamp IS NULL")
+    op.alter_column(table, 'timestamp', nullable=False)
+    op.create_primary_key(f'{table}_pkey_partitioned', table, ['id', 'timestamp'])
+    op.execute(f'ALTER SEQUENCE {table}_id_seq OWNED BY {table}.id')
+
+    now = datetime.now(timezone.utc)
+    oldest = bind.execute(sa.text(f"SELECT min(timestamp) FROM {legacy} WHERE timestamp > '1970-01-01'")).scalar() or now
+    month = date(oldest.year, oldest.month, 1)
+    last = _add_months(date(now.year, now.month, 1), PREMAKE_MONTHS)
+    while month <= last:
+        op.execute(
+            f"CREATE TABLE {table}_p{month:%Y%m} PARTITION OF {table} "
+            f"FOR VALUES FROM ('{month.isoformat()}') TO ('{_add_months(month, 1).isoformat()}')"
+        )
+        month = _add_months(month, 1)
+    # catches backfilled NULL timestamps and anything written before maintenance runs
+    op.execute(f'CREATE TABLE {table}_default PARTITION OF {table} DEFAULT')
+
+    op.execute(f'INSERT INTO {table} SELECT * FROM {legacy}')
+    op.drop_table(legacy)
+    _create_indexes(table)
+
+
+def _unpartition(table: str) -> None:
+    partitioned = f'{table}_partitioned'
+    op.rename_table(table, partitioned)
+
+    op.execute(f'CREATE TABLE {table} (LIKE {partitioned} INCLUDING DEFAULTS)')
+    op.alter_column(table, 'timestamp', nullable=True)
+    op.create_primary_key(f'{table}_pkey', table, ['id'])
+    op.execute(f'ALTER SEQUENCE {table}_id_seq OWNED BY {table}.id')
+    op.execute(f'INSERT INTO {table} SELECT * FROM {partitioned}')
+    op.execute(f'DROP TABLE {partitioned} CASCADE')
+    _create_indexes(table)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+    for table in INDEXES:
+        _partition(table)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+    for table in INDEXES:
+        _unpartition(table)
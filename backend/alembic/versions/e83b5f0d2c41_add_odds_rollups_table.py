@@ -0,0 +1,52 @@
+"""add odds_rollups table
+
+Revision ID: e83b5f0d2c41
+Revises: a41c6e93b0d8
+Create Date: 2026-10-19 20:12:48.330917
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e83b5f0d2c41'
+down_revision: Union[str, Sequence[str], None] = 'a41c6e93b0d8'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+METRICS = ('home', 'away', 'spread', 'total')
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'odds_rollups',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('game_id', sa.Integer(), nullable=False),
+        sa.Column('bucket', sa.String(), nullable=False),
+        sa.Column('bucket_key', sa.String(), nullable=False),
+        sa.Column('bucket_start', sa.DateTime(), nullable=False),
+        sa.Column('first_ts', sa.DateTime(), nullable=True),
+        sa.Column('last_ts', sa.DateTime(), nullable=True),
+        sa.Column('samples', sa.Integer(), nullable=False),
+        *[
+            sa.Column(f'{metric}_{part}', sa.Float(), nullable=True)
+            for metric in METRICS for part in ('open', 'high', 'low', 'close')
+        ],
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_odds_rollups_id'), 'odds_rollups', ['id'], unique=False)
+    op.create_index('uq_odds_rollups_bucket', 'odds_rollups', ['game_id', 'bucket', 'bucket_key'], unique=True)
+    op.create_index('ix_odds_rollups_game_id_bucket_start', 'odds_rollups', ['game_id', 'bucket', 'bucket_start'], unique=False)
+    # existing snapshots are rolled up by rebuild_rollups.py
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_odds_rollups_game_id_bucket_start', table_name='odds_rollups')
+    op.drop_index('uq_odds_rollups_bucket', table_name='odds_rollups')
+    op.drop_index(op.f('ix_odds_rollups_id'), table_name='odds_rollups')
+    op.drop_table('odds_rollups')
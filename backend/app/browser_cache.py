@@ -0,0 +1,193 @@
+"""
+Browser Cache
+Persistent on-disk cache for static OddsPortal assets (JS, CSS, fonts, images)
+shared by every Playwright context the scrapers open.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from pathlib import Path
+
+from .scrape_costs import add_cost
+
+logger = logging.getLogger(__name__)
+
+CACHE_DIR = Path(os.getenv("SCRAPER_CACHE_DIR", Path(__file__).resolve().parent.parent / ".scraper_cache"))
+CACHE_MAX_BYTES = int(os.getenv("SCRAPER_CACHE_MAX_MB", "256")) * 1024 * 1024
+CACHE_TTL_SECONDS = int(os.getenv("SCRAPER_CACHE_TTL_SECONDS", str(24 * 3600)))
+PRUNE_INTERVAL_SECONDS = int(os.getenv("SCRAPER_CACHE_PRUNE_INTERVAL", "600"))
+CACHE_ENABLED = os.getenv("SCRAPER_CACHE_ENABLED", "1") != "0"
+
+CACHEABLE_TYPES = {"script", "stylesheet", "font", "image"}
+# Headers that no longer describe the body once Playwright has decoded it
+_DROP_HEADERS = {"content-encoding", "content-length", "transfer-encoding"}
+
+CACHE_METRICS = {"hits": 0, "misses": 0, "hit_bytes": 0, "network_bytes": 0, "last_prune": None, "pruned_files": 0}
+
+_lock = threading.Lock()
+_last_prune_ts = 0.0
+
+
+def _key(url: str) -> str:
+    return hashlib.sha1(url.encode("utf-8")).hexdigest()
+
+
+def _load(url: str):
+    key = _key(url)
+    body_path = CACHE_DIR / f"{key}.bin"
+    meta_path = CACHE_DIR / f"{key}.json"
+    try:
+        meta = json.loads(meta_path.read_text(encoding="utf-8"))
+        if time.time() - meta.get("stored_at", 0) > CACHE_TTL_SECONDS:
+            return None
+        body = body_path.read_bytes()
+        os.utime(body_path)  # bump recency for LRU pruning
+        return meta, body
+    except (OSError, ValueError):
+        return None
+
+
+def _store(url: str, status: int, headers: dict, body: bytes):
+    if status != 200 or "no-store" in (headers.get("cache-control") or ""):
+        return
+    key = _key(url)
+    meta = {
+        "url": url,
+        "status": status,
+        "headers": {k: v for k, v in headers.items() if k.lower() not in _DROP_HEADERS},
+        "stored_at": time.time(),
+        "size": len(body),
+    }
+    try:
+        CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        # write-then-rename so concurrent scrapes never read a partial file
+        tmp_body = CACHE_DIR / f"{key}.bin.{os.getpid()}.{threading.get_ident()}"
+        tmp_body.write_bytes(body)
+        os.replace(tmp_body, CACHE_DIR / f"{key}.bin")
+        (CACHE_DIR / f"{key}.json").write_text(json.dumps(meta), encoding="utf-8")
+    except OSError as e:
+        logger.warning(f"Failed to write browser cache entry: {e}")
+
+
+def cache_size_bytes() -> int:
+    if not CACHE_DIR.exists():
+        return 0
+    return sum(p.stat().st_size for p in CACHE_DIR.glob("*.bin"))
+
+
+def prune(max_bytes: int = None) -> int:
+    """Delete least recently used entries until the cache fits under 90% of the cap."""
+    max_bytes = CACHE_MAX_BYTES if max_bytes is None else max_bytes
+    if not CACHE_DIR.exists():
+        return 0
+
+    entries = []
+    total = 0
+    for body_path in CACHE_DIR.glob("*.bin"):
+        try:
+            st = body_path.stat()
+        except OSError:
+            continue
+        entries.append((st.st_mtime, st.st_size, body_path))
+        total += st.st_size
+
+    removed = 0
+    if total > max_bytes:
+        target = int(max_bytes * 0.9)
+        for _, size, body_path in sorted(entries):
+            if total <= target:
+                break
+            for path in (body_path, body_path.with_suffix(".json")):
+                try:
+                    path.unlink()
+                except OSError:
+                    pass
+            total -= size
+            removed += 1
+
+    CACHE_METRICS["last_prune"] = time.time()
+    CACHE_METRICS["pruned_files"] += removed
+    if removed:
+        logger.info(f"Pruned {removed} browser cache entries, {total} bytes remain")
+    return removed
+
+
+def _maybe_prune():
+    global _last_prune_ts
+    with _lock:
+        if time.time() - _last_prune_ts < PRUNE_INTERVAL_SECONDS:
+            return
+        _last_prune_ts = time.time()
+    prune()
+
+
+def attach_cache(context) -> dict:
+    """
+    Route a Playwright browser context through the persistent cache.
+    Returns a per-scrape stats dict that is filled in as requests complete.
+    """
+    stats = {"hits": 0, "misses": 0, "hit_bytes": 0, "network_bytes": 0}
+
+    def _count(field, amount):
+        stats[field] += amount
+        CACHE_METRICS[field] += amount
+        if field == "network_bytes":
+            add_cost("bytes_in", amount)
+
+    def _on_finished(request):
+        # With the cache on, GETs of cacheable types are counted in the route handler
+        if CACHE_ENABLED and request.method == "GET" and request.resource_type in CACHEABLE_TYPES:
+            return
+        try:
+            _count("network_bytes", max(request.sizes().get("responseBodySize", 0), 0))
+        except Exception:
+            pass
+
+    # Byte counting doesn't depend on the cache: scrape costs need bytes_in either way
+    context.on("requestfinished", _on_finished)
+    if not CACHE_ENABLED:
+        return stats
+
+    _maybe_prune()
+
+    def _handle(route):
+        request = route.request
+        if request.method != "GET" or request.resource_type not in CACHEABLE_TYPES:
+            route.continue_()
+            return
+
+        cached = _load(request.url)
+        if cached:
+            meta, body = cached
+            _count("hits", 1)
+            _count("hit_bytes", len(body))
+            route.fulfill(status=meta["status"], headers=meta["headers"], body=body)
+            return
+
+        try:
+            response = route.fetch()
+            body = response.body()
+        except Exception:
+            route.continue_()
+            return
+        _count("misses", 1)
+        _count("network_bytes", len(body))
+        headers = response.headers
+        _store(request.url, response.status, headers, body)
+        route.fulfill(status=response.status, headers={k: v for k, v in headers.items() if k.lower() not in _DROP_HEADERS}, body=body)
+
+    context.route("**/*", _handle)
+    return stats
+
+
+def get_cache_metrics() -> dict:
+    return {
+        **CACHE_METRICS,
+        "dir": str(CACHE_DIR),
+        "size_bytes": cache_size_bytes(),
+        "max_bytes": CACHE_MAX_BYTES,
+    }
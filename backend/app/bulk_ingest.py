@@ -0,0 +1,106 @@
+"""
+Bulk Snapshot Ingest
+Writes QuarterSnapshot / LiveOddsSnapshot batches as plain tuples, skipping
+ORM instances and per-row INSERTs: COPY FROM STDIN on Postgres (psycopg2),
+a single executemany INSERT (insertmanyvalues) everywhere else.
+Rows bypass the flush hooks, so data_version bumps, NOTIFY and local
+dispatch are queued here through snapshot_events, and rollups updated through
+app/rollups.py. Repeats of a game's latest reading are folded into its run
+(app/snapshot_runs.py) rather than written.
+"""
+
+import io
+import logging
+import os
+from datetime import datetime
+from typing import Dict, List, Sequence, Tuple
+
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+
+from .models import QuarterSnapshot, LiveOddsSnapshot
+from .snapshot_events import SNAPSHOT_KINDS, queue_snapshot_events
+from .rollups import apply_samples, snapshot_samples
+from .snapshot_runs import RUN_COLUMNS, SNAPSHOT_CHANGE_ONLY, extend_runs, latest_runs, plan_runs
+
+logger = logging.getLogger(__name__)
+
+# Above this many rows, subscribers get one resync per game instead of one event per row
+BULK_NOTIFY_MAX_ROWS = int(os.getenv("BULK_NOTIFY_MAX_ROWS", "1000"))
+
+
+def snapshot_columns(model) -> List[str]:
+    """Tuple layout expected by bulk_insert_snapshots: every column but the id and run bookkeeping."""
+    return [col.key for col in model.__table__.columns if col.key != "id" and col.key not in RUN_COLUMNS]
+
+
+LIVE_COLUMNS = snapshot_columns(LiveOddsSnapshot)
+QUARTER_COLUMNS = snapshot_columns(QuarterSnapshot)
+
+
+def _copy_field(value) -> str:
+    if value is None:
+        return "\\N"
+    if isinstance(value, datetime):
+        value = value.isoformat()
+    return str(value).replace("\\", "\\\\").replace("\t", "\\t").replace("\n", "\\n").replace("\r", "\\r")
+
+
+def _copy_rows(session: Session, model, columns: List[str], rows: Sequence[Tuple]):
+    buf = io.StringIO()
+    for row in rows:
+        buf.write("\t".join(_copy_field(v) for v in row))
+        buf.write("\n")
+    buf.seek(0)
+
+    quoted = ", ".join(f'"{model.__table__.c[key].name}"' for key in columns)
+    raw = session.connection().connection.dbapi_connection
+    with raw.cursor() as cursor:
+        cursor.copy_expert(f"COPY {model.__tablename__} ({quoted}) FROM STDIN", buf)
+
+
+def _events(model, columns: List[str], rows: Sequence[Tuple]) -> List[Dict]:
+    kind = SNAPSHOT_KINDS[model]
+    game_col = columns.index("game_id")
+    if len(rows) > BULK_NOTIFY_MAX_ROWS:
+        return [{"kind": "resync", "game_id": gid} for gid in dict.fromkeys(row[game_col] for row in rows)]
+    return [
+        {
+            "kind": kind,
+            "game_id": row[game_col],
+            "row": {k: v.isoformat() if isinstance(v, datetime) else v for k, v in zip(columns, row)},
+        }
+        for row in rows
+    ]
+
+
+def bulk_insert_snapshots(session: Session, model, rows: Sequence[Tuple], change_only: bool = SNAPSHOT_CHANGE_ONLY) -> int:
+    """
+    Insert `rows` (tuples in snapshot_columns(model) order) into the session's
+    transaction; the caller commits. Returns the number of rows written.
+    """
+    if not rows:
+        return 0
+    columns = snapshot_columns(model)
+    bind = session.get_bind()
+
+    if change_only:
+        readings = [dict(zip(columns, row)) for row in rows]
+        latest = latest_runs(session, model, {r["game_id"] for r in readings})
+        keep, extend = plan_runs(model, readings, latest)
+        extend_runs(session, model, extend, latest)
+        rows = [tuple(rows[i]) + (readings[i]["valid_until"], readings[i]["repeat_count"]) for i in keep]
+    else:
+        rows = [tuple(row) + (None, 1) for row in rows]
+    columns = columns + list(RUN_COLUMNS)
+    if not rows:
+        return 0
+
+    if bind.dialect.name == "postgresql" and bind.dialect.driver == "psycopg2":
+        _copy_rows(session, model, columns, rows)
+    else:
+        session.execute(insert(model.__table__), [dict(zip(columns, row)) for row in rows])
+
+    apply_samples(session.connection(), [s for row in rows for s in snapshot_samples(model, dict(zip(columns, row)))])
+    queue_snapshot_events(session, _events(model, columns, rows))
+    return len(rows)
@@ -0,0 +1,89 @@
+"""
+Connection Pool Telemetry
+QueuePool variants that time every checkout, so pool exhaustion shows up as
+checkout wait before it shows up as request timeouts.
+"""
+
+import threading
+import time
+from typing import Dict
+
+from sqlalchemy import exc
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+_metrics: Dict[str, "PoolMetrics"] = {}
+
+
+class PoolMetrics:
+    def __init__(self, name: str):
+        self.name = name
+        self.pool = None
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.timeouts = 0
+        self.wait_ms_total = 0.0
+        self.wait_ms_max = 0.0
+
+    def record(self, wait_ms: float, timed_out: bool = False):
+        with self._lock:
+            if timed_out:
+                self.timeouts += 1
+                return
+            self.checkouts += 1
+            self.wait_ms_total += wait_ms
+            self.wait_ms_max = max(self.wait_ms_max, wait_ms)
+
+    def snapshot(self) -> Dict:
+        pool = self.pool
+        out = {
+            "checkouts": self.checkouts,
+            "timeouts": self.timeouts,
+            "avg_wait_ms": round(self.wait_ms_total / self.checkouts, 2) if self.checkouts else None,
+            "max_wait_ms": round(self.wait_ms_max, 2),
+        }
+        if pool is not None:
+            out.update({
+                "size": pool.size(),
+                "checked_out": pool.checkedout(),
+                "checked_in": pool.checkedin(),
+                "overflow": pool.overflow(),
+                "timeout_s": pool.timeout(),
+            })
+        return out
+
+
+class _TimedCheckout:
+    metrics: PoolMetrics
+
+    def connect(self):
+        self.metrics.pool = self
+        start = time.perf_counter()
+        try:
+            conn = super().connect()
+        except exc.TimeoutError:
+            self.metrics.record(0, timed_out=True)
+            raise
+        self.metrics.record((time.perf_counter() - start) * 1000)
+        return conn
+
+
+class TimedQueuePool(_TimedCheckout, QueuePool):
+    pass
+
+
+class TimedAsyncQueuePool(_TimedCheckout, AsyncAdaptedQueuePool):
+    pass
+
+
+def timed_pool_class(name: str, async_: bool = False):
+    """
+    A pool class bound to metrics `name`. Bound per class rather than per
+    instance because SQLAlchemy rebuilds pools via self.__class__ on recreate().
+    """
+    metrics = _metrics.setdefault(name, PoolMetrics(name))
+    base = TimedAsyncQueuePool if async_ else TimedQueuePool
+    return type(f"{base.__name__}_{name}", (base,), {"metrics": metrics})
+
+
+def pool_metrics() -> Dict[str, Dict]:
+    return {name: m.snapshot() for name, m in _metrics.items()}
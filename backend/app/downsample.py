@@ -0,0 +1,98 @@
+"""
+Series Downsampling
+Shape-preserving reduction of long odds series for charts (Largest-Triangle-
+Three-Buckets on the home implied probability). Points flagged by momentum
+detection are always kept so swings never disappear from a chart.
+"""
+
+from typing import Dict, List, Optional, Set
+
+from .insights import detect_momentum_events, implied_prob
+from .response_cache import series_cache
+
+
+def _x(point: Dict, i: int) -> float:
+    ts = point.get("timestamp")
+    return ts.timestamp() if ts is not None else float(i)
+
+
+def _ys(points: List[Dict]) -> List[float]:
+    ys = []
+    last = 0.5
+    for p in points:
+        prob = implied_prob(p.get("ml_home"))
+        if prob is not None:
+            last = prob
+        ys.append(last)
+    return ys
+
+
+def lttb(xs: List[float], ys: List[float], threshold: int) -> List[int]:
+    """Indices of the `threshold` points that best preserve the visual shape."""
+    n = len(xs)
+    if threshold >= n or threshold < 3:
+        return list(range(n))
+
+    keep = [0]
+    bucket = (n - 2) / (threshold - 2)
+    a = 0
+    for b in range(threshold - 2):
+        start = int(b * bucket) + 1
+        end = int((b + 1) * bucket) + 1
+
+        # average of the next bucket is the third triangle vertex
+        next_start, next_end = end, min(int((b + 2) * bucket) + 1, n)
+        if next_start >= next_end:
+            next_start, next_end = n - 1, n
+        avg_x = sum(xs[next_start:next_end]) / (next_end - next_start)
+        avg_y = sum(ys[next_start:next_end]) / (next_end - next_start)
+
+        best, best_area = start, -1.0
+        for i in range(start, end):
+            area = abs((xs[a] - avg_x) * (ys[i] - ys[a]) - (xs[a] - xs[i]) * (avg_y - ys[a]))
+            if area > best_area:
+                best, best_area = i, area
+        keep.append(best)
+        a = best
+    keep.append(n - 1)
+    return keep
+
+
+def momentum_indices(points: List[Dict]) -> Set[int]:
+    """Indices on both sides of every momentum event, so the jump stays visible."""
+    by_ts: Dict = {}
+    for i, p in enumerate(points):
+        by_ts.setdefault(p.get("timestamp"), []).append(i)
+
+    keep = set()
+    for ev in detect_momentum_events([p for p in points if p.get("timestamp") is not None]):
+        for i in by_ts.get(ev["timestamp"], ()):
+            keep.add(i)
+            if i > 0:
+                keep.add(i - 1)
+    return keep
+
+
+def downsample_indices(points: List[Dict], max_points: int) -> List[int]:
+    """
+    Sorted indices into `points` (dicts with timestamp, ml_home, ml_away) to
+    keep. May exceed max_points only when momentum points alone do.
+    """
+    if len(points) <= max_points:
+        return list(range(len(points)))
+    flagged = momentum_indices(points)
+    budget = max(max_points - len(flagged), 3)
+    xs = [_x(p, i) for i, p in enumerate(points)]
+    return sorted(flagged.union(lttb(xs, _ys(points), budget)))
+
+
+async def cached_downsample(game_id: int, version: Optional[int], variant: str, points: List[Dict], max_points: int) -> List[int]:
+    """downsample_indices, memoised per game data_version and request variant."""
+    if version is not None:
+        cached = await series_cache.get(game_id, version, variant)
+        if cached is not None:
+            return cached
+    keep = downsample_indices(points, max_points)
+    if version is not None:
+        await series_cache.put(game_id, version, keep, variant)
+    return keep
@@ -0,0 +1,62 @@
+"""
+Conditional GET support
+ETags derive from games.data_version, so a poll that matches the client's
+If-None-Match is answered from a primary-key lookup on games and never
+touches the snapshot tables.
+"""
+
+import hashlib
+from typing import Optional
+
+from fastapi import Request, Response
+from sqlalchemy import func, select
+
+from .models import Game
+
+
+async def game_version(db, game_id: int) -> Optional[int]:
+    return (await db.execute(select(Game.data_version).where(Game.id == game_id))).scalar()
+
+
+async def games_list_version(db) -> str:
+    count, version_sum, max_id = (await db.execute(
+        select(func.count(Game.id), func.coalesce(func.sum(Game.data_version), 0), func.coalesce(func.max(Game.id), 0))
+    )).one()
+    return f"{count}.{version_sum}.{max_id}"
+
+
+def make_etag(request: Request, version) -> str:
+    # The query string is part of the representation (filters, formats, cursors)
+    variant = hashlib.sha1(f"{request.url.path}?{request.url.query}".encode()).hexdigest()[:10]
+    return f'W/"{version}-{variant}"'
+
+
+def _matches(request: Request, etag: str) -> bool:
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    bare = etag[2:] if etag.startswith("W/") else etag
+    for candidate in header.split(","):
+        candidate = candidate.strip()
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == bare:
+            return True
+    return False
+
+
+def conditional_response(request: Request, response: Response, version) -> Optional[Response]:
+    """
+    Return a 304 if the client already holds this version, otherwise stamp the
+    ETag on `response` and return None so the handler builds the body.
+    """
+    if version is None:
+        return None
+    etag = make_etag(request, version)
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if _matches(request, etag):
+        return Response(status_code=304, headers=headers)
+    response.headers.update(headers)
+    return None
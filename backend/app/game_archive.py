@@ -0,0 +1,257 @@
+"""
+Game Archive
+Finished games' quarter and live snapshots exported to one zstd-compressed
+Parquet file per game and table under GAME_ARCHIVE_DIR, optionally pruned
+from the database afterwards. Replay, insights, snapshot pages and the
+summary read an archived game from its files plus whatever rows reached the
+database after the export, so historical games cost almost no database
+reads. The timeline (replay, insights) decodes the files a record batch at
+a time and never holds a whole game. Needs pyarrow; without it nothing is archived and
+every read goes to the database.
+"""
+
+import asyncio
+import logging
+import os
+import shutil
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+from sqlalchemy import delete, func, select
+from sqlalchemy.orm import Session
+
+from .models import Game, LiveOddsSnapshot, QuarterSnapshot
+from .replay import replay_queries
+
+logger = logging.getLogger(__name__)
+
+GAME_ARCHIVE_DIR = Path(os.getenv("GAME_ARCHIVE_DIR", Path(__file__).resolve().parent.parent / "archive"))
+GAME_ARCHIVE_COMPRESSION = os.getenv("GAME_ARCHIVE_COMPRESSION", "zstd")
+
+# The live file is written last: a game counts as archived once both exist
+ARCHIVED_MODELS = (QuarterSnapshot, LiveOddsSnapshot)
+# Rows decoded per Parquet record batch on streamed reads
+ARCHIVE_BATCH = 8192
+
+
+def _pyarrow():
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    return pa, pq
+
+
+def _arrow_type(pa, column):
+    python_type = column.type.python_type
+    if python_type is datetime:
+        return pa.timestamp("us")
+    if python_type is int:
+        return pa.int64()
+    if python_type is float:
+        return pa.float64()
+    return pa.string()
+
+
+def archive_path(game_id: int, model, archive_dir: Optional[Path] = None) -> Path:
+    return Path(archive_dir or GAME_ARCHIVE_DIR) / str(game_id) / f"{model.__tablename__}.parquet"
+
+
+def is_archived(game_id: int, archive_dir: Optional[Path] = None) -> bool:
+    return all(archive_path(game_id, model, archive_dir).exists() for model in ARCHIVED_MODELS)
+
+
+def _write_rows(path: Path, columns, rows: Sequence[Tuple]):
+    pa, pq = _pyarrow()
+    table = pa.table({
+        col.key: pa.array([row[i] for row in rows], type=_arrow_type(pa, col)) for i, col in enumerate(columns)
+    })
+    path.parent.mkdir(parents=True, exist_ok=True)
+    # write-then-rename so readers never see a half-written file
+    tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    pq.write_table(table, tmp, compression=GAME_ARCHIVE_COMPRESSION)
+    os.replace(tmp, path)
+
+
+def drop_archive(game_id: int, models: Sequence = ARCHIVED_MODELS, archive_dir: Optional[Path] = None) -> bool:
+    """
+    Forget a game's archived `models` when their database rows are deleted,
+    so cleared data isn't served (or merged back by the next export). Other
+    tables of an archived game are kept, with the dropped ones left empty.
+    Returns whether anything was archived.
+    """
+    game_dir = Path(archive_dir or GAME_ARCHIVE_DIR) / str(game_id)
+    if not game_dir.exists():
+        return False
+    if set(ARCHIVED_MODELS) <= set(models) or not is_archived(game_id, archive_dir):
+        shutil.rmtree(game_dir)
+    else:
+        for model in models:
+            _write_rows(archive_path(game_id, model, archive_dir), list(model.__table__.columns), [])
+    logger.info(f"Dropped archive of game {game_id} ({', '.join(m.__tablename__ for m in models)})")
+    return True
+
+
+def export_game(session: Session, game_id: int, prune: bool = False, archive_dir: Optional[Path] = None) -> Dict[str, int]:
+    """
+    Write a game's snapshots to Parquet (rows in timestamp order) and, with
+    prune, delete the exported rows once the files read back complete. Rows
+    already archived are kept: a re-export merges them with the database's
+    (the database wins on the same id), so late writes to a pruned game are
+    added, never swapped for. The caller commits. Returns rows archived per
+    table.
+    """
+    _, pq = _pyarrow()
+    fetched = {
+        model: session.execute(
+            select(*model.__table__.columns).where(model.game_id == game_id).order_by(model.timestamp, model.id)
+        ).all()
+        for model in ARCHIVED_MODELS
+    }
+    if is_archived(game_id, archive_dir) and not any(fetched.values()):
+        logger.info(f"Game {game_id} is already archived")
+        return {}
+
+    counts, max_ids = {}, {}
+    for model, rows in fetched.items():
+        columns = list(model.__table__.columns)
+        keys = [col.key for col in columns]
+        id_at, ts_at = keys.index("id"), keys.index("timestamp")
+        path = archive_path(game_id, model, archive_dir)
+        merged = {row.id: tuple(row) for row in rows}
+        if path.exists():
+            for row in read_rows(game_id, model, keys, archive_dir):
+                merged.setdefault(row[id_at], row)
+        # (timestamp, id) order like the query above, NULL timestamps last as on Postgres
+        ordered = sorted(merged.values(), key=lambda r: (r[ts_at] is None, r[ts_at] or datetime.min, r[id_at]))
+        _write_rows(path, columns, ordered)
+        counts[model.__tablename__] = len(ordered)
+        max_ids[model] = max((row.id for row in rows), default=None)
+
+    if prune:
+        for model in ARCHIVED_MODELS:
+            written = pq.read_metadata(archive_path(game_id, model, archive_dir)).num_rows
+            if written != counts[model.__tablename__]:
+                raise RuntimeError(f"Archive of game {game_id} {model.__tablename__} has {written} rows, expected {counts[model.__tablename__]}")
+        for model, max_id in max_ids.items():
+            if max_id is not None:
+                # rollups are kept: series charts still read them
+                session.execute(delete(model).where(model.game_id == game_id, model.id <= max_id))
+    return counts
+
+
+def archivable_games_query():
+    """Final games that still have snapshots in the database, with each archived table's highest id there."""
+    has_rows = select(QuarterSnapshot.id).where(QuarterSnapshot.game_id == Game.id).exists() \
+        | select(LiveOddsSnapshot.id).where(LiveOddsSnapshot.game_id == Game.id).exists()
+    max_ids = [select(func.max(model.id)).where(model.game_id == Game.id).scalar_subquery() for model in ARCHIVED_MODELS]
+    return select(Game.id, *max_ids).where(Game.status == "final", has_rows).order_by(Game.id)
+
+
+def is_current(game_id: int, db_max_ids: Sequence[Optional[int]], archive_dir: Optional[Path] = None) -> bool:
+    """Whether the archive already holds every row up to the database's highest ids (in ARCHIVED_MODELS order)."""
+    if not is_archived(game_id, archive_dir):
+        return False
+    try:
+        archived = archived_max_ids(game_id, archive_dir)
+    except Exception as e:
+        logger.warning(f"Reading archive of game {game_id} failed, re-exporting: {e}")
+        return False
+    return all(db_id is None or db_id <= archived[model] for model, db_id in zip(ARCHIVED_MODELS, db_max_ids))
+
+
+def _open(game_id: int, model, archive_dir: Optional[Path] = None):
+    _, pq = _pyarrow()
+    return pq.ParquetFile(archive_path(game_id, model, archive_dir), memory_map=True)
+
+
+def _iter_rows(parquet, columns: Sequence[str]) -> Iterator[Tuple]:
+    for batch in parquet.iter_batches(batch_size=ARCHIVE_BATCH, columns=list(columns)):
+        yield from zip(*(batch.column(name).to_pylist() for name in columns))
+
+
+def _max_id(parquet) -> int:
+    """Highest archived id, from the row groups' statistics (scanning only the id column without them)."""
+    at = parquet.schema_arrow.get_field_index("id")
+    stats = [parquet.metadata.row_group(i).column(at).statistics for i in range(parquet.num_row_groups)]
+    if all(s is not None and s.has_min_max for s in stats):
+        return max((s.max for s in stats), default=0)
+    return max((row[0] for row in _iter_rows(parquet, ["id"])), default=0)
+
+
+def read_rows(game_id: int, model, columns: Sequence[str], archive_dir: Optional[Path] = None) -> List[Tuple]:
+    """An archived table's rows as tuples of `columns`, in timestamp order."""
+    return list(_iter_rows(_open(game_id, model, archive_dir), columns))
+
+
+def archived_max_ids(game_id: int, archive_dir: Optional[Path] = None) -> Dict:
+    """Highest archived id per model: rows above it were written after the export."""
+    return {model: _max_id(_open(game_id, model, archive_dir)) for model in ARCHIVED_MODELS}
+
+
+def iter_replay_rows(game_id: int, archive_dir: Optional[Path] = None) -> Tuple[Iterator[Tuple], Iterator[Tuple], Dict]:
+    """
+    Lazy (quarter_rows, live_rows) laid out like replay_queries' results,
+    plus archived_max_ids. Both files are opened up front, so a missing or
+    unreadable archive fails here rather than part way through a read.
+    """
+    quarter_stmt, live_stmt = replay_queries(game_id)
+    out, max_ids = [], {}
+    for model, stmt in ((QuarterSnapshot, quarter_stmt), (LiveOddsSnapshot, live_stmt)):
+        parquet = _open(game_id, model, archive_dir)
+        max_ids[model] = _max_id(parquet)
+        # timestamp comes first; replay_queries skips rows without one
+        out.append(row for row in _iter_rows(parquet, [c.key for c in stmt.selected_columns]) if row[0])
+    return out[0], out[1], max_ids
+
+
+def read_snapshots(game_id: int, model, archive_dir: Optional[Path] = None) -> List:
+    """An archived table as transient `model` instances, in (timestamp, id) order."""
+    keys = [col.key for col in model.__table__.columns]
+    return [model(**dict(zip(keys, row))) for row in read_rows(game_id, model, keys, archive_dir)]
+
+
+async def _read_archive(game_id: int, reader, *args):
+    """reader off the event loop, or None if the game isn't archived (or can't be read)."""
+    if not is_archived(game_id):
+        return None
+    try:
+        return await asyncio.to_thread(reader, game_id, *args)
+    except Exception as e:
+        logger.warning(f"Reading archive of game {game_id} failed, using the database: {e}")
+        return None
+
+
+async def archived_replay_rows(game_id: int) -> Optional[Tuple[Iterator[Tuple], Iterator[Tuple], Dict]]:
+    return await _read_archive(game_id, iter_replay_rows)
+
+
+async def archived_snapshots(game_id: int, model) -> Optional[List]:
+    return await _read_archive(game_id, read_snapshots, model)
+
+
+def archive_final_games(session: Session, prune: bool = False, limit: Optional[int] = None,
+                        game_ids: Optional[Sequence[int]] = None) -> Dict[int, Dict[str, int]]:
+    """
+    Archive (and optionally prune) final games, committing one game at a time.
+    Without game_ids, games whose archive is already current are skipped (and
+    don't count towards limit), so repeated runs only export what changed.
+    """
+    if game_ids:
+        ids = list(game_ids)
+    else:
+        ids = []
+        for game_id, *db_max_ids in session.execute(archivable_games_query()).all():
+            if limit and len(ids) >= limit:
+                break
+            if not is_current(game_id, db_max_ids):
+                ids.append(game_id)
+    out = {}
+    for game_id in ids:
+        try:
+            out[game_id] = export_game(session, game_id, prune=prune)
+            session.commit()
+            logger.info(f"Archived game {game_id}: {out[game_id]}{' (pruned)' if prune else ''}")
+        except Exception:
+            session.rollback()
+            logger.exception(f"Archiving game {game_id} failed")
+    return out
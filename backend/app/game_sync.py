@@ -0,0 +1,104 @@
+"""
+Game Sync Upsert
+Writes a scraped slate (app/sync_games.py) in a fixed number of statements
+whatever its size: one INSERT ... ON CONFLICT (oddsportal_url) DO UPDATE for
+every game, then one DELETE and one bulk INSERT for the pregame snapshots
+whose odds changed. Shared by /games/sync and the scheduler.
+"""
+
+import logging
+from datetime import datetime, timezone
+from typing import Dict, List
+
+from sqlalchemy import delete, or_, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session
+
+from .bulk_ingest import QUARTER_COLUMNS, bulk_insert_snapshots
+from .hot_state import hot_state
+from .models import Game, QuarterSnapshot
+
+logger = logging.getLogger(__name__)
+
+# games column <- scraped dict key
+GAME_FIELDS = {
+    "home_team": "home_team",
+    "away_team": "away_team",
+    "status": "status",
+    "start_time": "start_time",
+    "pregame_ml_home": "ml_home",
+    "pregame_ml_away": "ml_away",
+    "pregame_spread": "spread",
+    "pregame_total": "total",
+}
+
+
+def _insert(session: Session):
+    # Postgres and SQLite (the embedded profile) are the supported databases
+    return pg_insert(Game) if session.get_bind().dialect.name == "postgresql" else sqlite_insert(Game)
+
+
+def _pregame(game: Dict):
+    """(ml_home, ml_away, spread) of a game's pregame snapshot, or None if it has no moneyline."""
+    if game.get("ml_home") is None or game.get("ml_away") is None:
+        return None
+    return (game["ml_home"], game["ml_away"], game.get("spread") or 0.0)
+
+
+def upsert_games(session: Session, games: List[Dict]) -> Dict[str, int]:
+    """
+    Insert or update `games` by URL and refresh changed pregame snapshots in
+    the session's transaction; the caller commits. Only games whose fields
+    changed are written (and get their data_version bumped).
+    """
+    # the same URL twice would make ON CONFLICT touch a row twice; the last listing wins
+    slate = {g["url"]: g for g in games if g.get("url")}
+    if not slate:
+        return {"inserted": 0, "updated": 0, "total": 0}
+
+    existing = dict(session.execute(
+        select(Game.oddsportal_url, Game.id).where(Game.oddsportal_url.in_(list(slate)))
+    ).all())
+
+    rows = [{"oddsportal_url": url, **{col: g.get(key) for col, key in GAME_FIELDS.items()}} for url, g in slate.items()]
+    stmt = _insert(session).values(rows)
+    changed = or_(*(getattr(Game, col).is_distinct_from(stmt.excluded[col]) for col in GAME_FIELDS))
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["oddsportal_url"],
+        set_={**{col: stmt.excluded[col] for col in GAME_FIELDS}, "data_version": Game.data_version + 1},
+        where=changed,
+    ).returning(Game.oddsportal_url, Game.id)
+    # RETURNING lists inserted and changed rows; unchanged ones keep their known ids
+    ids = {**existing, **dict(session.execute(stmt).all())}
+
+    pregames = {ids[url]: _pregame(g) for url, g in slate.items() if _pregame(g) is not None}
+    refreshed = _refresh_pregames(session, pregames)
+    logger.info(f"Game sync: {len(slate) - len(existing)} new, {len(existing)} existing, {refreshed} pregame snapshots refreshed")
+    return {"inserted": len(slate) - len(existing), "updated": len(existing), "total": len(games)}
+
+
+def _refresh_pregames(session: Session, pregames: Dict[int, tuple]) -> int:
+    if not pregames:
+        return 0
+    stored = {}
+    for game_id, *odds in session.execute(
+        select(QuarterSnapshot.game_id, QuarterSnapshot.ml_home, QuarterSnapshot.ml_away, QuarterSnapshot.spread)
+        .where(QuarterSnapshot.game_id.in_(list(pregames)), QuarterSnapshot.stage == "pregame")
+    ).all():
+        stored.setdefault(game_id, set()).add(tuple(odds))
+    changed = [gid for gid, odds in pregames.items() if stored.get(gid) != {odds}]
+    if not changed:
+        return 0
+
+    session.execute(delete(QuarterSnapshot).where(QuarterSnapshot.game_id.in_(changed), QuarterSnapshot.stage == "pregame"))
+    for game_id in changed:
+        hot_state.forget(game_id)
+    now = datetime.now(timezone.utc)
+    snapshots = [
+        {"game_id": gid, "stage": "pregame", "score_home": 0, "score_away": 0, "score_diff": 0, "timestamp": now,
+         **dict(zip(("ml_home", "ml_away", "spread"), pregames[gid]))}
+        for gid in changed
+    ]
+    bulk_insert_snapshots(session, QuarterSnapshot, [tuple(s[c] for c in QUARTER_COLUMNS) for s in snapshots], change_only=False)
+    return len(changed)
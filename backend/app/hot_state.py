@@ -0,0 +1,293 @@
+"""
+Hot State
+Latest snapshot of every active game held in memory: score, odds, stage and
+implied probabilities, plus the last few momentum points per game. Fed by
+committed snapshot events (stream hub in the API, local listeners in the
+scheduler) and rebuilt from the database on startup, so summary and list
+reads don't touch the snapshot tables.
+"""
+
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict, deque
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional
+
+from sqlalchemy import and_, func, select
+
+from .game_archive import archived_snapshots
+from .insights import implied_prob
+from .models import Game, LiveOddsSnapshot, QuarterSnapshot
+from .replay import naive_utc, run_timestamps
+from .snapshot_events import row_to_dict
+
+logger = logging.getLogger(__name__)
+
+HOT_STATE_MAX_GAMES = int(os.getenv("HOT_STATE_MAX_GAMES", "5000"))
+# momentum points kept per game (the scheduler looks at the last 10 polls)
+HOT_STATE_HISTORY = int(os.getenv("HOT_STATE_HISTORY", "10"))
+# live_odds_snapshots games older than this are not loaded at startup
+HOT_STATE_LIVE_WINDOW_HOURS = float(os.getenv("HOT_STATE_LIVE_WINDOW_HOURS", "24"))
+# Without Postgres NOTIFY, writes from other processes are invisible; reload live games this often
+HOT_STATE_REFRESH_SECONDS = float(os.getenv("HOT_STATE_REFRESH_SECONDS", "30"))
+
+_MISSING = object()
+
+
+def _parse(value):
+    return naive_utc(datetime.fromisoformat(value) if isinstance(value, str) else value)
+
+
+def quarter_point(row: Dict, ts=None) -> Dict:
+    """Momentum point in the shape detect_momentum_events expects."""
+    ts = _parse(ts or row.get("timestamp"))
+    return {"timestamp": ts.isoformat() if ts else None, "ml_home": row.get("ml_home"),
+            "ml_away": row.get("ml_away"), "stage": row.get("stage")}
+
+
+def _normalized(row: Dict) -> Dict:
+    """Event rows carry the writer's timestamps; store them as naive UTC like rows loaded from the database."""
+    out = dict(row)
+    for key in ("timestamp", "valid_until"):
+        ts = _parse(out.get(key))
+        out[key] = ts.isoformat() if ts else None
+    return out
+
+
+def run_points(row: Dict) -> List[Dict]:
+    start = _parse(row.get("timestamp"))
+    if start is None:
+        return [quarter_point(row)]
+    return [quarter_point(row, ts) for ts in run_timestamps(start, _parse(row.get("valid_until")), row.get("repeat_count"))]
+
+
+def implied_probabilities(home_ml, away_ml) -> Dict:
+    return {"home": implied_prob(home_ml), "away": implied_prob(away_ml)}
+
+
+class HotState:
+    def __init__(self, max_games: int = HOT_STATE_MAX_GAMES, history: int = HOT_STATE_HISTORY):
+        self.max_games = max_games
+        self.history = history
+        self._lock = threading.Lock()
+        # game_id -> {"row": dict | None, "probs": dict, "version": int | None, "points": deque, "loaded": True}
+        # ("loaded" is only set once the entry was seeded from the database)
+        self._quarter: "OrderedDict[str, Dict]" = OrderedDict()
+        # game_id -> latest live_odds_snapshots row dict
+        self._live: Dict[str, Dict] = {}
+        self.live_loaded_at: Optional[float] = None
+        self._stats = {"hits": 0, "misses": 0, "events": 0, "resyncs": 0}
+
+    # ---------- event ingestion ----------
+
+    def apply_event(self, ev: Dict):
+        """Fold one committed snapshot event (see snapshot_events) into the store."""
+        kind, key, row = ev.get("kind"), str(ev.get("game_id")), _normalized(ev.get("row") or {})
+        with self._lock:
+            self._stats["events"] += 1
+            if kind == "quarter_snapshot":
+                entry = self._quarter_entry(key)
+                entry["row"], entry["version"] = row, None
+                entry["probs"] = implied_probabilities(row.get("ml_home"), row.get("ml_away"))
+                entry["points"].extend(run_points(row))
+            elif kind == "live_snapshot":
+                self._live[key] = self._live_row(row)
+            elif kind == "run_extended":
+                # a repeat poll: the game's latest row now runs until valid_until
+                latest = self._quarter.get(key, {}).get("row") if ev.get("source") == "quarter_snapshot" else self._live.get(key)
+                if latest is not None:
+                    latest.update(valid_until=row.get("valid_until"), repeat_count=row.get("repeat_count"))
+                    if ev.get("source") == "quarter_snapshot":
+                        self._quarter[key]["points"].append(quarter_point(latest, row.get("valid_until")))
+            elif kind == "resync":
+                # too many rows to announce one by one: reload the game on next read
+                self._stats["resyncs"] += 1
+                self._forget(key)
+
+    def forget(self, game_id):
+        """Drop a game whose snapshots were deleted or rewritten outside the event path."""
+        with self._lock:
+            self._forget(str(game_id))
+
+    def _forget(self, key: str):
+        self._quarter.pop(key, None)
+        if self._live.pop(key, None) is not None:
+            self.live_loaded_at = None
+
+    def apply_events(self, events: List[Dict]):
+        for ev in events:
+            self.apply_event(ev)
+
+    # ---------- quarter snapshots (summary, scheduler) ----------
+
+    def _quarter_entry(self, key: str) -> Dict:
+        entry = self._quarter.get(key)
+        if entry is None:
+            entry = self._quarter[key] = {"row": None, "probs": implied_probabilities(None, None), "version": None,
+                                          "points": deque(maxlen=self.history)}
+            while len(self._quarter) > self.max_games:
+                self._quarter.popitem(last=False)
+        self._quarter.move_to_end(key)
+        return entry
+
+    def latest_quarter(self, game_id, version: Optional[int] = None):
+        """
+        (latest quarter snapshot dict or None, implied probabilities), or _MISSING
+        when the store can't vouch for it. Entries loaded at a known
+        data_version are only trusted at that version; event-fed entries are
+        stamped with the first version they are read at.
+        """
+        key = str(game_id)
+        with self._lock:
+            entry = self._vouched(key, version)
+            if entry is None:
+                return _MISSING
+            return entry["row"], entry["probs"]
+
+    def recent_points(self, game_id, version: Optional[int] = None) -> Optional[List[Dict]]:
+        """
+        Last HOT_STATE_HISTORY momentum points, oldest first, or None if not
+        loaded or not current at `version` (same rules as latest_quarter).
+        """
+        with self._lock:
+            entry = self._vouched(str(game_id), version)
+            if entry is None:
+                return None
+            return list(entry["points"])
+
+    def _vouched(self, key: str, version: Optional[int]) -> Optional[Dict]:
+        entry = self._quarter.get(key)
+        if entry is None or "loaded" not in entry:
+            self._stats["misses"] += 1
+            return None
+        if version is not None:
+            if entry["version"] is None:
+                entry["version"] = version
+            elif entry["version"] != version:
+                self._stats["misses"] += 1
+                return None
+        self._stats["hits"] += 1
+        self._quarter.move_to_end(key)
+        return entry
+
+    def load_quarter(self, game_id, rows: List, version: Optional[int] = None):
+        """Seed a game from its newest stored rows (ORM objects, newest first)."""
+        points = [p for snap in reversed(rows) for p in run_points(row_to_dict(snap))]
+        latest = row_to_dict(rows[0]) if rows else {}
+        with self._lock:
+            entry = self._quarter_entry(str(game_id))
+            entry["row"] = latest or None
+            entry["probs"] = implied_probabilities(latest.get("ml_home"), latest.get("ml_away"))
+            entry["version"] = version
+            entry["points"].clear()
+            entry["points"].extend(points[-self.history:])
+            entry["loaded"] = True
+
+    # ---------- live odds (pinnacle list) ----------
+
+    @staticmethod
+    def _live_row(row: Dict) -> Dict:
+        probs = implied_probabilities(row.get("teamA_ml"), row.get("teamB_ml"))
+        return {**row, "implied_probabilities": {"teamA": probs["home"], "teamB": probs["away"]}}
+
+    def live_games(self, limit: int) -> Optional[List[Dict]]:
+        """Latest live row per game, newest first, or None when a reload is due."""
+        with self._lock:
+            if self.live_loaded_at is None:
+                return None
+            rows = sorted(self._live.values(), key=lambda r: r.get("timestamp") or "", reverse=True)
+            return [dict(r) for r in rows[:limit]]
+
+    def live_stale(self, pg_listening: bool) -> bool:
+        if self.live_loaded_at is None:
+            return True
+        return not pg_listening and time.monotonic() - self.live_loaded_at > HOT_STATE_REFRESH_SECONDS
+
+    def load_live(self, rows: List):
+        with self._lock:
+            self._live = {str(r.game_id): self._live_row(row_to_dict(r)) for r in rows}
+            self.live_loaded_at = time.monotonic()
+
+    def stats(self) -> Dict:
+        return {**self._stats, "quarter_games": len(self._quarter), "live_games": len(self._live)}
+
+
+# ---------- loaders (statements work on sync and async sessions) ----------
+
+def recent_quarter_query(game_id, limit: int = HOT_STATE_HISTORY):
+    return select(QuarterSnapshot).where(QuarterSnapshot.game_id == game_id) \
+        .order_by(QuarterSnapshot.timestamp.desc(), QuarterSnapshot.id.desc()).limit(limit)
+
+
+def active_games_query():
+    return select(Game.id, Game.data_version).where(Game.status.in_(["scheduled", "live"]))
+
+
+def latest_live_query(window_hours: float = HOT_STATE_LIVE_WINDOW_HOURS):
+    """Latest live_odds_snapshots row per game seen within the window."""
+    cutoff = datetime.now(timezone.utc).replace(tzinfo=None) - timedelta(hours=window_hours)
+    newest = (
+        select(LiveOddsSnapshot.game_id, func.max(LiveOddsSnapshot.timestamp).label("timestamp"))
+        .where(LiveOddsSnapshot.timestamp >= cutoff)
+        .group_by(LiveOddsSnapshot.game_id)
+        .subquery()
+    )
+    return select(LiveOddsSnapshot).join(
+        newest, and_(LiveOddsSnapshot.game_id == newest.c.game_id, LiveOddsSnapshot.timestamp == newest.c.timestamp)
+    )
+
+
+def _latest_per_game(rows) -> List:
+    out = {}
+    for row in rows:
+        # same-timestamp ties: the later insert wins
+        if row.game_id not in out or row.id > out[row.game_id].id:
+            out[row.game_id] = row
+    return list(out.values())
+
+
+async def rebuild(session, store: "HotState"):
+    """Load every active game's recent quarter snapshots and recent live games."""
+    start = time.perf_counter()
+    games = (await session.execute(active_games_query())).all()
+    for game_id, version in games:
+        rows = (await session.execute(recent_quarter_query(game_id))).scalars().all()
+        store.load_quarter(game_id, rows, version)
+    await refresh_live(session, store)
+    logger.info(f"Hot state rebuilt: {len(games)} active games in {(time.perf_counter() - start) * 1000:.0f} ms")
+
+
+async def refresh_live(session, store: "HotState"):
+    rows = (await session.execute(latest_live_query())).scalars().all()
+    store.load_live(_latest_per_game(rows))
+
+
+async def latest_quarter(session, store: "HotState", game_id: int, version: Optional[int]):
+    """(latest quarter snapshot dict, implied probabilities) for a game, loading it into the store on a miss."""
+    hit = store.latest_quarter(game_id, version)
+    if hit is _MISSING:
+        rows = (await session.execute(recent_quarter_query(game_id))).scalars().all()
+        if not rows:
+            # a pruned game's snapshots only exist in its archive
+            archived = await archived_snapshots(game_id, QuarterSnapshot)
+            rows = list(reversed(archived or []))[:HOT_STATE_HISTORY]
+        store.load_quarter(game_id, rows, version)
+        hit = store.latest_quarter(game_id, version)
+    return hit
+
+
+def recent_points(db, store: "HotState", game_id: int, version: Optional[int] = None) -> List[Dict]:
+    """
+    Sync variant for the scheduler: last momentum points, reloading when the
+    game's data_version shows another process wrote or deleted snapshots.
+    """
+    points = store.recent_points(game_id, version)
+    if points is None:
+        store.load_quarter(game_id, db.execute(recent_quarter_query(game_id)).scalars().all(), version)
+        points = store.recent_points(game_id, version)
+    return points
+
+
+hot_state = HotState()
@@ -0,0 +1,197 @@
+"""
+Scrape Job Queue
+Postgres-backed queue of scrape jobs. API endpoints enqueue, a pool of
+worker threads claims jobs with SELECT ... FOR UPDATE SKIP LOCKED.
+Duplicate jobs for the same game and kind coalesce onto the active one,
+or onto one that finished within SCRAPE_RESULT_TTL_SECONDS.
+"""
+
+import logging
+import os
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Optional, Tuple
+
+from sqlalchemy import select, update
+from sqlalchemy.exc import IntegrityError
+
+from .models import ScrapeJob
+from .scrape_tasks import SCRAPE_RESULT_TTL_SECONDS, run_task
+
+logger = logging.getLogger(__name__)
+
+WORKER_COUNT = int(os.getenv("SCRAPE_WORKERS", "2"))
+IDLE_POLL_SECONDS = float(os.getenv("SCRAPE_JOB_POLL_SECONDS", "1.0"))
+STALE_JOB_SECONDS = int(os.getenv("SCRAPE_JOB_STALE_SECONDS", "180"))
+MAX_ATTEMPTS = 3
+
+ACTIVE_STATUSES = ("queued", "running")
+
+_workers = []
+_stop = threading.Event()
+
+
+def job_to_dict(job: ScrapeJob) -> dict:
+    return {
+        "job_id": job.id,
+        "game_id": job.game_id,
+        "kind": job.kind,
+        "status": job.status,
+        "result": job.result,
+        "error": job.error,
+        "attempts": job.attempts,
+        "created_at": job.created_at.isoformat() if job.created_at else None,
+        "started_at": job.started_at.isoformat() if job.started_at else None,
+        "finished_at": job.finished_at.isoformat() if job.finished_at else None,
+    }
+
+
+def _active_job_stmt(game_id: int, kind: str):
+    return (
+        select(ScrapeJob)
+        .where(ScrapeJob.game_id == game_id, ScrapeJob.kind == kind, ScrapeJob.status.in_(ACTIVE_STATUSES))
+        .limit(1)
+    )
+
+
+async def enqueue_job(db, game_id: int, kind: str) -> Tuple[ScrapeJob, bool]:
+    """
+    Queue a scrape job unless one is already active (or just finished) for this
+    game and kind. Returns (job, coalesced).
+    """
+    existing = (await db.execute(_active_job_stmt(game_id, kind))).scalars().first()
+    if existing:
+        return existing, True
+
+    if SCRAPE_RESULT_TTL_SECONDS > 0:
+        # Another caller's scrape just finished: reuse it rather than scrape again
+        recent = (await db.execute(
+            select(ScrapeJob)
+            .where(
+                ScrapeJob.game_id == game_id, ScrapeJob.kind == kind, ScrapeJob.status == "done",
+                ScrapeJob.finished_at >= datetime.utcnow() - timedelta(seconds=SCRAPE_RESULT_TTL_SECONDS),
+            )
+            .order_by(ScrapeJob.id.desc())
+            .limit(1)
+        )).scalars().first()
+        if recent:
+            return recent, True
+
+    job = ScrapeJob(game_id=game_id, kind=kind, status="queued", attempts=0, created_at=datetime.utcnow())
+    db.add(job)
+    try:
+        await db.commit()
+        return job, False
+    except IntegrityError:
+        # Lost the race against a concurrent enqueue; the unique index kept one job
+        await db.rollback()
+        existing = (await db.execute(_active_job_stmt(game_id, kind))).scalars().first()
+        return existing, True
+
+
+def claim_next_job(db) -> Optional[ScrapeJob]:
+    """Claim the oldest queued job, skipping rows other workers have locked."""
+    job = (
+        db.query(ScrapeJob)
+        .filter(ScrapeJob.status == "queued")
+        .order_by(ScrapeJob.id)
+        .with_for_update(skip_locked=True)
+        .first()
+    )
+    if not job:
+        db.rollback()
+        return None
+
+    # Conditional update keeps claiming safe on backends without SKIP LOCKED
+    claimed = db.execute(
+        update(ScrapeJob)
+        .where(ScrapeJob.id == job.id, ScrapeJob.status == "queued")
+        .values(status="running", started_at=datetime.utcnow(), attempts=ScrapeJob.attempts + 1)
+    ).rowcount
+    db.commit()
+    if not claimed:
+        return None
+    db.refresh(job)
+    return job
+
+
+def requeue_stale_jobs(db) -> int:
+    """Return jobs orphaned by a crashed worker to the queue, or fail them after MAX_ATTEMPTS."""
+    cutoff = datetime.utcnow() - timedelta(seconds=STALE_JOB_SECONDS)
+    stale = ScrapeJob.status == "running", ScrapeJob.started_at < cutoff
+    failed = db.execute(
+        update(ScrapeJob)
+        .where(*stale, ScrapeJob.attempts >= MAX_ATTEMPTS)
+        .values(status="failed", error="worker timed out", finished_at=datetime.utcnow())
+    ).rowcount
+    requeued = db.execute(
+        update(ScrapeJob).where(*stale).values(status="queued")
+    ).rowcount
+    db.commit()
+    if failed or requeued:
+        logger.warning(f"Stale scrape jobs: {requeued} requeued, {failed} failed")
+    return requeued
+
+
+def run_job(db, job: ScrapeJob):
+    try:
+        result = run_task(db, job.kind, job.game_id)
+        job.result = result
+        if result.get("status") == "error":
+            job.status = "failed"
+            job.error = result.get("message")
+        else:
+            job.status = "done"
+    except Exception as e:
+        db.rollback()
+        logger.exception(f"Scrape job {job.id} failed")
+        job.status = "failed"
+        job.error = str(e)
+    job.finished_at = datetime.utcnow()
+    db.commit()
+
+
+def _worker_loop(worker_no: int):
+    from .db import SessionLocal
+
+    logger.info(f"Scrape worker {worker_no} started")
+    last_stale_check = 0.0
+    while not _stop.is_set():
+        db = SessionLocal()
+        try:
+            if worker_no == 0 and time.time() - last_stale_check > STALE_JOB_SECONDS / 2:
+                requeue_stale_jobs(db)
+                last_stale_check = time.time()
+
+            job = claim_next_job(db)
+            if job is None:
+                db.close()
+                _stop.wait(IDLE_POLL_SECONDS)
+                continue
+            logger.info(f"Worker {worker_no} running {job.kind} job {job.id} for game {job.game_id}")
+            run_job(db, job)
+        except Exception:
+            logger.exception(f"Scrape worker {worker_no} error")
+            db.rollback()
+            _stop.wait(IDLE_POLL_SECONDS)
+        finally:
+            db.close()
+
+
+def start_workers(count: int = WORKER_COUNT):
+    """Start the in-process worker pool (idempotent)."""
+    if _workers or count <= 0:
+        return
+    _stop.clear()
+    for i in range(count):
+        t = threading.Thread(target=_worker_loop, args=(i,), name=f"scrape-worker-{i}", daemon=True)
+        t.start()
+        _workers.append(t)
+
+
+def stop_workers(timeout: float = 5.0):
+    _stop.set()
+    for t in _workers:
+        t.join(timeout)
+    _workers.clear()
@@ -1,23 +1,49 @@
-from fastapi import FastAPI, Depends
+from fastapi import FastAPI, Depends, Query, Request, Response
+from fastapi.responses import StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.encoders import jsonable_encoder
+from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from datetime import datetime, timezone
+from typing import Optional
+import asyncio
 import logging
-from dotenv import load_dotenv
-load_dotenv()
-from .scraper import scrape_oddsportal_quarter, scrape_completed_games, get_scraper_health
-from .pinnacle import fetch_odds_by_sport
-from .db import SessionLocal, init_db
-from .models import Game, OddsSnapshot, QuarterSnapshot, LiveOddsSnapshot, Alert
+import orjson
+from .env import load_env, env_flag
+load_env()
+from .db import SessionLocal, AsyncSessionLocal, DATABASE_URL, REPLICA_STATUS, init_db, read_sessionmaker
+from .models import Game, OddsSnapshot, QuarterSnapshot, LiveOddsSnapshot, Alert, ScrapeJob
 from .insights import detect_momentum_events, get_insights_summary
-from .replay import detect_gaps
-from .sync_games import sync_games_from_oddsportal
+from .replay import REPLAY_FIELDS, detect_gaps, page_snapshots, run_end, snapshot_page_query
+from .game_archive import archived_snapshots, drop_archive
+from .timeline import stream_timeline, timeline_rows
+from .scrape_costs import browser_cpu_ms, game_cost_summary, cycle_cost_summary
+from .scrape_tasks import run_task, scrape_flight
+from .jobs import enqueue_job, job_to_dict, start_workers, stop_workers, ACTIVE_STATUSES
+from .stream_hub import hub, format_sse
+from .etag import game_version, games_list_version, conditional_response
+from .snapshot_events import bump_data_version
+from .game_sync import upsert_games
+from .rollups import BUCKETS, ROLLUP_FIELDS, rebuild_rollups, series_query
+from . import hot_state as hot
+from .db_pool import pool_metrics
+from .response_cache import insights_cache, series_cache
+from .downsample import cached_downsample
+from .wire_format import OrjsonResponse, UnknownFormat, negotiate, etag_version, to_columns, json_response, columns_response
 from .test_data import generate_fake_odds
 
 logger = logging.getLogger(__name__)
 
-app = FastAPI()
+JOB_MAX_WAIT_SECONDS = 60
+STREAM_KEEPALIVE_SECONDS = 15
+MAX_PAGE_SIZE = 5000
+# Read-only workers serve GETs only: no scraping, no job workers, no schema setup,
+# and the Playwright/BeautifulSoup scraper stack is never imported
+READ_ONLY_API = env_flag("READ_ONLY_API")
+
+app = FastAPI(default_response_class=OrjsonResponse)
 
 # CORS
 app.add_middleware(
@@ -26,16 +52,56 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["ETag", "X-Next-Since-Id", "X-Next-After-Ts", "X-Next-Changed-Since", "X-Has-More", "X-Downsampled-From"],
 )
 
+if READ_ONLY_API:
+    @app.middleware("http")
+    async def reject_writes(request: Request, call_next):
+        if request.method not in ("GET", "HEAD", "OPTIONS"):
+            return OrjsonResponse({"error": "This API instance is read-only"}, status_code=405)
+        return await call_next(request)
+
+@app.exception_handler(UnknownFormat)
+async def unknown_format(request: Request, exc: UnknownFormat):
+    return OrjsonResponse({"error": str(exc)}, status_code=400)
+
 @app.on_event("startup")
 def on_startup():
+    if READ_ONLY_API:
+        return
     try:
         init_db()
         print("Database initialized successfully")
     except Exception as e:
         print(f"Database initialization failed: {e}")
         raise
+    start_workers()
+
+@app.on_event("startup")
+async def start_stream_hub():
+    dsn = None
+    if DATABASE_URL.startswith("postgresql"):
+        dsn = DATABASE_URL.replace("postgresql+psycopg2://", "postgresql://")
+    # Versioned keys already make stale entries unreachable; this frees their memory early
+    hub.add_handler(lambda ev: insights_cache.invalidate(ev.get("game_id")))
+    hub.add_handler(lambda ev: series_cache.invalidate(ev.get("game_id")))
+    hub.add_handler(hot.hot_state.apply_event)
+    await hub.start(dsn)
+    try:
+        async with AsyncSessionLocal() as db:
+            await hot.rebuild(db, hot.hot_state)
+    except Exception as e:
+        # Not fatal: summary reads load their game on a miss, the Pinnacle list reloads
+        logger.warning(f"Hot state rebuild failed: {e}")
+
+@app.on_event("shutdown")
+def on_shutdown():
+    stop_workers()
+
+@app.on_event("shutdown")
+async def stop_stream_hub():
+    await hub.stop()
 
 def get_db():
     db = SessionLocal()
@@ -44,23 +110,42 @@ def get_db():
     finally:
         db.close()
 
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
+
+async def get_read_db():
+    """Session for read-only handlers; served by the replica when one is configured and caught up."""
+    async with (await read_sessionmaker())() as db:
+        yield db
+
 @app.get("/health")
 def health():
     return {"status": "ok"}
 
 @app.get("/scraper/health")
 def scraper_health():
-    return get_scraper_health()
+    if READ_ONLY_API:
+        return {"status": "read_only", "singleflight": scrape_flight.stats()}
+    from .scraper import get_scraper_health
+    return {**get_scraper_health(), "singleflight": scrape_flight.stats(), "browser_cpu_ms": browser_cpu_ms()}
+
+@app.get("/costs/games/{game_id}")
+def game_costs(game_id: int, db: Session = Depends(get_db)):
+    """Browser-seconds, bytes and retries spent on one game, per scrape kind."""
+    return game_cost_summary(db, game_id)
+
+@app.get("/costs/cycles")
+def cycle_costs(limit: int = 20, db: Session = Depends(get_db)):
+    """Scrape cost totals for the most recent scheduler cycles."""
+    return cycle_cost_summary(db, limit)
 
 # ---------- Games & odds (existing) ----------
 @app.post("/games/{game_id}/scrape-live-quarter")
 def scrape_live_quarter(game_id: int, db: Session = Depends(get_db)):
-    snapshots = scrape_oddsportal_quarter(game_id)
-    if not snapshots:
-        return {"status": "no live odds found"}
-    db.add_all(snapshots)
-    db.commit()
-    return {"status": "scraped", "count": len(snapshots)}
+    # shares a scrape the scheduler (or another request) has in flight for this game
+    result = run_task(db, "quarter", game_id)
+    return {k: v for k, v in result.items() if k != "snapshots"}
 
 from pydantic import BaseModel
 
@@ -77,6 +162,13 @@ def create_game(payload: GameCreateRequest, db: Session = Depends(get_db)):
         db.commit()
         db.refresh(game)
         return {"game_id": game.id}
+    except IntegrityError:
+        # oddsportal_url is unique: hand back the game already tracking it
+        db.rollback()
+        existing = db.query(Game).filter(Game.oddsportal_url == payload.oddsportal_url).first()
+        if existing is None:
+            raise
+        return {"game_id": existing.id, "existing": True}
     except Exception as e:
         db.rollback()
         raise e
@@ -98,74 +190,30 @@ def update_game(game_id: int, home_team: str = None, away_team: str = None, odds
     return {"status": "updated"}
 
 @app.get("/games")
-def list_games(status: str = None, db: Session = Depends(get_db)):
-    q = db.query(Game)
+async def list_games(request: Request, response: Response, status: str = None, db: AsyncSession = Depends(get_read_db)):
+    not_modified = conditional_response(request, response, await games_list_version(db))
+    if not_modified:
+        return not_modified
+    stmt = select(Game)
     if status:
-        q = q.filter(Game.status == status)
-    games = q.all()
+        stmt = stmt.where(Game.status == status)
+    games = (await db.execute(stmt)).scalars().all()
     return jsonable_encoder(games)
 
 @app.post("/games/sync")
 def sync_games(db: Session = Depends(get_db)):
-    games = sync_games_from_oddsportal()
-    inserted = 0
-    updated = 0
-
-    for g in games:
-        existing = db.query(Game).filter(Game.oddsportal_url == g["url"]).first()
-        if existing:
-            existing.home_team = g["home_team"]
-            existing.away_team = g["away_team"]
-            existing.status = g["status"]
-            existing.start_time = g.get("start_time")
-            existing.pregame_ml_home = g.get("ml_home")
-            existing.pregame_ml_away = g.get("ml_away")
-            existing.pregame_spread = g.get("spread")
-            existing.pregame_total = g.get("total")
-            updated += 1
-            game_id = existing.id
-        else:
-            new_game = Game(
-                home_team=g["home_team"],
-                away_team=g["away_team"],
-                oddsportal_url=g["url"],
-                status=g["status"],
-                start_time=g.get("start_time"),
-                pregame_ml_home=g.get("ml_home"),
-                pregame_ml_away=g.get("ml_away"),
-                pregame_spread=g.get("spread"),
-                pregame_total=g.get("total")
-            )
-            db.add(new_game)
-            db.flush()
-            game_id = new_game.id
-            inserted += 1
-
-        # create/refresh pregame snapshot for detail view
-        if g.get("ml_home") is not None and g.get("ml_away") is not None:
-            db.query(QuarterSnapshot).filter(
-                QuarterSnapshot.game_id == game_id,
-                QuarterSnapshot.stage == "pregame"
-            ).delete()
-            db.add(QuarterSnapshot(
-                game_id=game_id,
-                stage="pregame",
-                score_home=0,
-                score_away=0,
-                score_diff=0,
-                ml_home=g.get("ml_home"),
-                ml_away=g.get("ml_away"),
-                spread=g.get("spread") or 0.0,
-                timestamp=datetime.now(timezone.utc)
-            ))
+    from .sync_games import sync_games_from_oddsportal
 
+    games = sync_games_from_oddsportal()
+    # One upsert for the whole slate plus a batch refresh of changed pregame snapshots
+    result = upsert_games(db, games)
     db.commit()
-    return {"inserted": inserted, "updated": updated, "total": len(games)}
+    return result
 
 @app.get("/games/{game_id}")
-def get_game_info(game_id: int, db: Session = Depends(get_db)):
+async def get_game_info(game_id: int, db: AsyncSession = Depends(get_read_db)):
     """Get game info including team names and OddsPortal URL"""
-    game = db.query(Game).filter(Game.id == game_id).first()
+    game = await db.get(Game, game_id)
     if not game:
         return {"error": "Game not found"}
     return {
@@ -176,13 +224,14 @@ def get_game_info(game_id: int, db: Session = Depends(get_db)):
     }
 
 @app.get("/games/{game_id}/summary")
-def game_summary(game_id: int, db: Session = Depends(get_db)):
-    game = db.query(Game).filter(Game.id == game_id).first()
+async def game_summary(game_id: int, db: AsyncSession = Depends(get_read_db)):
+    game = await db.get(Game, game_id)
     if not game:
         return {"error": "Game not found"}
-    
-    latest = db.query(QuarterSnapshot).filter(QuarterSnapshot.game_id == game_id).order_by(QuarterSnapshot.timestamp.desc()).first()
-    
+
+    # Served from the hot state; data_version tells it when another process wrote
+    latest, probabilities = await hot.latest_quarter(db, hot.hot_state, game_id, game.data_version)
+
     return {
         "game": {
             "id": game.id,
@@ -192,25 +241,29 @@ def game_summary(game_id: int, db: Session = Depends(get_db)):
             "start_time": game.start_time.isoformat() if game.start_time else None,
             "last_polled_at": game.last_polled_at.isoformat() if game.last_polled_at else None
         },
-        "latest": latest
+        "latest": latest,
+        "implied_probabilities": probabilities
     }
 
 @app.delete("/games/{game_id}/clear")
 def clear_game_data(game_id: int, db: Session = Depends(get_db)):
     db.query(QuarterSnapshot).filter(QuarterSnapshot.game_id == game_id).delete()
     db.query(LiveOddsSnapshot).filter(LiveOddsSnapshot.game_id == game_id).delete()
+    rebuild_rollups(db, [game_id])
+    bump_data_version(db.connection(), [game_id])
+    hot.hot_state.forget(game_id)
     db.commit()
+    drop_archive(game_id)
     return {"status": "cleared"}
 
 @app.get("/games/{game_id}/odds")
-def get_odds(game_id: int, db: Session = Depends(get_db)):
-    snapshots = (
-        db.query(OddsSnapshot)
-        .filter(OddsSnapshot.game_id == game_id)
+async def get_odds(game_id: int, db: AsyncSession = Depends(get_read_db)):
+    snapshots = (await db.execute(
+        select(OddsSnapshot)
+        .where(OddsSnapshot.game_id == game_id)
         .order_by(OddsSnapshot.timestamp)
-        .all()
-    )
-    return snapshots
+    )).scalars().all()
+    return jsonable_encoder(snapshots)
 
 @app.post("/games/{game_id}/inject-fake-odds")
 def inject_fake_odds(game_id: int, db: Session = Depends(get_db)):
@@ -221,120 +274,255 @@ def inject_fake_odds(game_id: int, db: Session = Depends(get_db)):
 
 # ---------- Quarter snapshots (new) ----------
 
+async def _snapshot_page(
+    db, model, game_id: int, version, response: Response, since_id, after_ts, limit, by_timestamp: bool,
+    fmt: str = "json", max_points: Optional[int] = None, odds_fields=("ml_home", "ml_away"), changed_since=None,
+):
+    """Run snapshot_page_query and stamp the cursor headers for the next poll."""
+    archived = await archived_snapshots(game_id, model)
+    if archived is None:
+        query = snapshot_page_query(model, game_id, since_id, after_ts, limit, by_timestamp, changed_since=changed_since)
+        rows = (await db.execute(query)).scalars().all()
+    else:
+        # exported rows come from the archive (they may be pruned), later ones from the database
+        above_id = max((r.id for r in archived), default=0)
+        query = snapshot_page_query(model, game_id, since_id, after_ts, limit, by_timestamp,
+                                    above_id=above_id, changed_since=changed_since)
+        late = (await db.execute(query)).scalars().all()
+        rows = page_snapshots(archived + late, since_id, after_ts, limit, by_timestamp, changed_since)
+    has_more = limit is not None and len(rows) > limit
+    if has_more:
+        rows = rows[:limit]
+    if rows:
+        # extended older rows can come back with changed_since; the id cursor never moves back
+        response.headers["X-Next-Since-Id"] = str(max(rows[-1].id, since_id or 0))
+        if rows[-1].timestamp is not None:
+            response.headers["X-Next-After-Ts"] = rows[-1].timestamp.isoformat()
+        run_ends = [run_end(r) for r in rows if run_end(r) is not None]
+        if run_ends:
+            response.headers["X-Next-Changed-Since"] = max(run_ends).isoformat()
+    response.headers["X-Has-More"] = "true" if has_more else "false"
+
+    if max_points is not None and len(rows) > max_points:
+        home, away = odds_fields
+        points = [{"timestamp": r.timestamp, "ml_home": getattr(r, home), "ml_away": getattr(r, away)} for r in rows]
+        variant = f"{model.__tablename__}:{since_id}:{after_ts}:{changed_since}:{limit}:{max_points}"
+        response.headers["X-Downsampled-From"] = str(len(rows))
+        rows = [rows[i] for i in await cached_downsample(game_id, version, variant, points, max_points)]
+
+    if fmt != "json":
+        fields = [c.key for c in model.__table__.columns]
+        columns = to_columns([tuple(getattr(r, f) for f in fields) for r in rows], fields)
+        return columns_response(columns, fmt, response, meta={"count": len(rows)})
+    return jsonable_encoder(rows)
+
 @app.get("/games/{game_id}/quarters")
-def get_quarter_snapshots(game_id: int, db: Session = Depends(get_db)):
-    snapshots = (
-        db.query(QuarterSnapshot)
-        .filter(QuarterSnapshot.game_id == game_id)
-        .order_by(QuarterSnapshot.id)
-        .all()
+async def get_quarter_snapshots(
+    game_id: int,
+    request: Request,
+    response: Response,
+    since_id: Optional[int] = None,
+    after_ts: Optional[datetime] = None,
+    changed_since: Optional[datetime] = None,
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    max_points: Optional[int] = Query(None, ge=3, le=MAX_PAGE_SIZE),
+    fmt: Optional[str] = Query(None, alias="format"),
+    db: AsyncSession = Depends(get_read_db),
+):
+    fmt = negotiate(request, fmt)
+    version = await game_version(db, game_id)
+    not_modified = conditional_response(request, response, etag_version(version, fmt))
+    if not_modified:
+        return not_modified
+    return await _snapshot_page(
+        db, QuarterSnapshot, game_id, version, response, since_id, after_ts, limit,
+        by_timestamp=False, fmt=fmt, max_points=max_points, changed_since=changed_since,
     )
-    return jsonable_encoder(snapshots)
 
 @app.get("/games/{game_id}/insights")
-def get_insights(game_id: int, db: Session = Depends(get_db)):
-    # Get all snapshots (both quarter and live)
-    quarter_snaps = (
-        db.query(QuarterSnapshot)
-        .filter(QuarterSnapshot.game_id == game_id)
-        .order_by(QuarterSnapshot.timestamp)
-        .all()
-    )
-    live_snaps = (
-        db.query(LiveOddsSnapshot)
-        .filter(LiveOddsSnapshot.game_id == game_id)
-        .order_by(LiveOddsSnapshot.timestamp)
-        .all()
-    )
-
-    # Convert to dicts for processing
-    all_snaps = []
-    for snap in quarter_snaps:
-        all_snaps.append({
-            'timestamp': snap.timestamp.isoformat(),
-            'ml_home': snap.ml_home,
-            'ml_away': snap.ml_away,
-            'stage': snap.stage
-        })
-    for snap in live_snaps:
-        all_snaps.append({
-            'timestamp': snap.timestamp.isoformat(),
-            'ml_home': snap.teamA_ml if snap.teamA_ml else None,
-            'ml_away': snap.teamB_ml if snap.teamB_ml else None,
-            'stage': f"Q{snap.quarter}" if snap.quarter else "live"
-        })
+async def get_insights(game_id: int, request: Request, response: Response, db: AsyncSession = Depends(get_read_db)):
+    version = await game_version(db, game_id)
+    not_modified = conditional_response(request, response, version)
+    if not_modified:
+        return not_modified
+    if version is not None:
+        cached = await insights_cache.get(game_id, version)
+        if cached is not None:
+            return cached
+
+    # Quarter and live snapshots as one time-ordered timeline, one point per poll
+    all_snaps = [
+        {
+            'timestamp': ts.isoformat(),
+            'ml_home': ml_home,
+            'ml_away': ml_away,
+            'stage': stage
+        }
+        async for ts, ml_home, ml_away, stage, *_ in stream_timeline(db, game_id)
+    ]
 
     # Generate insights
     events = detect_momentum_events(all_snaps)
     summary = get_insights_summary(all_snaps)
 
-    return {
+    payload = jsonable_encoder({
         "summary": summary,
         "events": events
-    }
+    })
+    if version is not None:
+        await insights_cache.put(game_id, version, payload)
+    return payload
+
+@app.get("/games/{game_id}/series")
+async def get_series(
+    game_id: int,
+    request: Request,
+    response: Response,
+    bucket: str = Query("1m", pattern=f"^({'|'.join(BUCKETS)})$"),
+    since: Optional[datetime] = None,
+    fmt: Optional[str] = Query(None, alias="format"),
+    db: AsyncSession = Depends(get_read_db),
+):
+    """
+    Open/high/low/close of implied probability, spread and total per minute
+    (bucket=1m) or per quarter (bucket=quarter), served from odds_rollups.
+    since returns buckets starting at or after it; pass the last bucket_start
+    seen to pick up that bucket's later updates along with new ones.
+    """
+    fmt = negotiate(request, fmt)
+    version = await game_version(db, game_id)
+    not_modified = conditional_response(request, response, etag_version(version, fmt))
+    if not_modified:
+        return not_modified
+
+    rollups = (await db.execute(series_query(game_id, bucket, since))).scalars().all()
+    rows = [tuple(getattr(r, f) for f in ROLLUP_FIELDS) for r in rollups]
+    if fmt != "json":
+        return columns_response(to_columns(rows, ROLLUP_FIELDS), fmt, response, meta={"bucket": bucket, "count": len(rows)})
+    return json_response({
+        "bucket": bucket,
+        "count": len(rows),
+        "series": [dict(zip(ROLLUP_FIELDS, row)) for row in rows]
+    }, response)
 
 @app.get("/games/{game_id}/replay")
-def replay_game(game_id: int, speed: int = 2, db: Session = Depends(get_db)):
-    # Get all snapshots (both quarter and live)
-    quarter_snaps = (
-        db.query(QuarterSnapshot)
-        .filter(QuarterSnapshot.game_id == game_id)
-        .order_by(QuarterSnapshot.timestamp)
-        .all()
+async def replay_game(
+    game_id: int,
+    request: Request,
+    response: Response,
+    speed: int = 2,
+    max_points: Optional[int] = Query(None, ge=3, le=MAX_PAGE_SIZE),
+    fmt: Optional[str] = Query(None, alias="format"),
+    db: AsyncSession = Depends(get_read_db),
+):
+    fmt = negotiate(request, fmt)
+    version = await game_version(db, game_id)
+    not_modified = conditional_response(request, response, etag_version(version, fmt))
+    if not_modified:
+        return not_modified
+
+    # Plain REPLAY_FIELDS tuples (no ORM objects) off the unified timeline, already in time order
+    rows = [row async for row in stream_timeline(db, game_id)]
+    if max_points is not None and len(rows) > max_points:
+        points = [{"timestamp": r[0], "ml_home": r[1], "ml_away": r[2]} for r in rows]
+        response.headers["X-Downsampled-From"] = str(len(rows))
+        rows = [rows[i] for i in await cached_downsample(game_id, version, f"replay:{max_points}", points, max_points)]
+
+    # speed = seconds per step
+    if fmt != "json":
+        return columns_response(to_columns(rows, REPLAY_FIELDS), fmt, response, meta={"speed": speed, "count": len(rows)})
+    return json_response({
+        "speed": speed,
+        "count": len(rows),
+        "snapshots": [dict(zip(REPLAY_FIELDS, row)) for row in rows]
+    }, response)
+
+@app.get("/games/{game_id}/replay/stream")
+async def replay_stream(
+    game_id: int,
+    request: Request,
+    speed: float = 2,
+    start_ts: Optional[datetime] = None,
+    end_ts: Optional[datetime] = None,
+    fmt: Optional[str] = Query(None, alias="format"),
+):
+    """
+    Paced replay streamed straight off server-side cursors, as NDJSON (one
+    snapshot per line) or SSE. speed = seconds between rows (0 = unpaced);
+    start_ts seeks, end_ts stops early.
+    """
+    use_sse = fmt == "sse" or (fmt is None and "text/event-stream" in request.headers.get("accept", ""))
+
+    async def rows():
+        # Own session: the request's dependency session must not outlive the handler
+        async with (await read_sessionmaker())() as session:
+            first = True
+            async for row in stream_timeline(session, game_id, start_ts, end_ts):
+                if not first and speed > 0:
+                    await asyncio.sleep(speed)
+                first = False
+                body = orjson.dumps(dict(zip(REPLAY_FIELDS, row))).decode()
+                yield f"event: snapshot\ndata: {body}\n\n" if use_sse else body + "\n"
+        if use_sse:
+            yield "event: end\ndata: {}\n\n"
+
+    return StreamingResponse(
+        rows(),
+        media_type="text/event-stream" if use_sse else "application/x-ndjson",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
     )
-    live_snaps = (
-        db.query(LiveOddsSnapshot)
-        .filter(LiveOddsSnapshot.game_id == str(game_id))
-        .order_by(LiveOddsSnapshot.timestamp)
-        .all()
+
+@app.get("/games/{game_id}/stream")
+async def stream_game(game_id: int):
+    """
+    Server-Sent Events stream of new quarter/live snapshots and insight events
+    for a game, pushed as they are committed.
+    """
+    queue = hub.subscribe(game_id)
+
+    async def events():
+        try:
+            yield ": connected\n\n"
+            while True:
+                try:
+                    ev = await asyncio.wait_for(queue.get(), timeout=STREAM_KEEPALIVE_SECONDS)
+                except asyncio.TimeoutError:
+                    yield ": keepalive\n\n"
+                    continue
+                yield format_sse(ev)
+        finally:
+            hub.unsubscribe(game_id, queue)
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
     )
 
-    # Convert to dicts for processing
-    all_snaps = []
-    for snap in quarter_snaps:
-        all_snaps.append({
-            'timestamp': snap.timestamp.isoformat(),
-            'ml_home': snap.ml_home,
-            'ml_away': snap.ml_away,
-            'stage': snap.stage,
-            'score_home': snap.score_home,
-            'score_away': snap.score_away,
-            'score_diff': snap.score_diff,
-            'spread': snap.spread
-        })
-    for snap in live_snaps:
-        all_snaps.append({
-            'timestamp': snap.timestamp.isoformat(),
-            'ml_home': snap.teamA_ml if snap.teamA_ml else None,
-            'ml_away': snap.teamB_ml if snap.teamB_ml else None,
-            'stage': f"Q{snap.quarter}" if snap.quarter else "live",
-            'score_home': snap.teamA_score,
-            'score_away': snap.teamB_score,
-            'score_diff': snap.teamA_score - snap.teamB_score if snap.teamA_score is not None and snap.teamB_score is not None else None,
-            'spread': snap.spread_line
-        })
-
-    # Sort by timestamp
-    all_snaps.sort(key=lambda x: x['timestamp'])
+@app.get("/stream/stats")
+def stream_stats():
+    return hub.stats()
 
-    # speed = seconds per step
-    return {
-        "speed": speed,
-        "count": len(all_snaps),
-        "snapshots": jsonable_encoder(all_snaps)
-    }
+@app.get("/metrics/db-pool")
+def db_pool_metrics():
+    return {**pool_metrics(), "replica": REPLICA_STATUS}
+
+@app.get("/metrics/insights-cache")
+def insights_cache_metrics():
+    return {"insights": insights_cache.stats(), "series": series_cache.stats()}
+
+@app.get("/metrics/hot-state")
+def hot_state_metrics():
+    return hot.hot_state.stats()
 
 @app.get("/games/{game_id}/health")
-def game_health(game_id: int, db: Session = Depends(get_db)):
-    snaps = (
-        db.query(QuarterSnapshot)
-        .filter(QuarterSnapshot.game_id == game_id)
-        .order_by(QuarterSnapshot.timestamp)
-        .all()
-    )
+async def game_health(game_id: int, db: AsyncSession = Depends(get_read_db)):
+    # Stored rows of both sources, runs unexpanded: a gap is time no poll of either covered
+    snaps = [row async for row in timeline_rows(db, game_id)]
     gaps = detect_gaps(snaps, max_gap_seconds=120)
     return {
-        "count": len(snaps),
+        "count": sum(s.repeat_count or 1 for s in snaps),
+        "rows": len(snaps),
         "gaps": gaps,
         "ok": len(gaps) == 0
     }
@@ -347,6 +535,8 @@ def load_demo_quarters(game_id: int, db: Session = Depends(get_db)):
 
     # Clear existing for that game (optional)
     db.query(QuarterSnapshot).filter(QuarterSnapshot.game_id == game_id).delete()
+    rebuild_rollups(db, [game_id])
+    hot.hot_state.forget(game_id)
 
     base_time = datetime.now(timezone.utc)
 
@@ -420,6 +610,7 @@ def load_demo_quarters(game_id: int, db: Session = Depends(get_db)):
 
     db.add_all(snapshots)
     db.commit()
+    drop_archive(game_id, [QuarterSnapshot])
 
     return {"status": "demo_loaded", "count": len(snapshots)}
 
@@ -432,6 +623,8 @@ def scrape_completed(game_id: int, db: Session = Depends(get_db)):
     Scrapes OddsPortal for COMPLETED games with quarter-by-quarter odds.
     Also updates game info with team names.
     """
+    from .scraper import scrape_completed_games
+
     snapshots, game_info = scrape_completed_games(game_id)
     if not snapshots:
         return {"status": "no completed games found"}
@@ -462,261 +655,134 @@ def scrape_completed(game_id: int, db: Session = Depends(get_db)):
     }
 
 
+async def _enqueue_scrape(game_id: int, kind: str, wait: float, db: AsyncSession):
+    """Queue a scrape job; optionally wait up to `wait` seconds for its result."""
+    job, coalesced = await enqueue_job(db, game_id, kind)
+    deadline = asyncio.get_running_loop().time() + min(wait, JOB_MAX_WAIT_SECONDS)
+    while wait > 0 and job.status in ACTIVE_STATUSES and asyncio.get_running_loop().time() < deadline:
+        await asyncio.sleep(0.5)
+        await db.refresh(job)
+
+    if job.status in ("done", "failed") and job.result:
+        return {**job.result, "job_id": job.id, "coalesced": coalesced}
+    return {"status": job.status, "job_id": job.id, "coalesced": coalesced}
+
+
 @app.post("/games/{game_id}/scrape-live")
-def scrape_live_game_endpoint(game_id: int, db: Session = Depends(get_db)):
+async def scrape_live_game_endpoint(game_id: int, wait: float = 0, db: AsyncSession = Depends(get_async_db)):
     """
-    Scrape a live game once. Should be called repeatedly to poll for updates.
-    Returns current score and in-play odds.
+    Queue a live scrape of the game. Should be called repeatedly to poll for updates.
+    Returns a job id immediately; pass ?wait=<seconds> to block for the result.
     """
-    import time
-    import concurrent.futures
-    from app.scraper import scrape_live_game, find_live_nba_game
-    
-    # Get the game and its URL from database
-    game = db.query(Game).filter(Game.id == game_id).first()
-    if not game:
+    if not await db.get(Game, game_id):
         return {"status": "error", "message": "Game not found"}
-    
-    game_url = game.oddsportal_url
-    
-    # If no URL configured or if we want to find live games dynamically
-    if not game_url:
-        logger.info(f"No URL configured for game {game_id}, finding live NBA game...")
-        game_url = find_live_nba_game()
-        if game_url:
-            game.oddsportal_url = game_url
-            db.commit()
-            logger.info(f"Updated game {game_id} with live game URL: {game_url}")
-        else:
-            return {"status": "error", "message": "No live NBA games found"}
-    
-    logger.info(f"Scraping live game {game_id} from: {game_url}")
-    
-    # Scrape the game with a timeout to avoid hanging requests
-    result = None
-    with concurrent.futures.ThreadPoolExecutor(max_workers=1) as executor:
-        future = executor.submit(scrape_live_game, game_url, game_id)
-        try:
-            result = future.result(timeout=25)
-        except concurrent.futures.TimeoutError:
-            logger.warning(f"Live scrape timed out for {game_url}")
-            return {"status": "error", "message": "Live scrape timed out"}
-    
-    if not result:
-        # If scraping failed, try to find a new live game
-        logger.warning(f"Failed to scrape {game_url}, looking for new live game...")
-        new_url = find_live_nba_game()
-        if new_url and new_url != game_url:
-            game.oddsportal_url = new_url
-            db.commit()
-            logger.info(f"Switched to new live game: {new_url}")
-            with concurrent.futures.ThreadPoolExecutor(max_workers=1) as executor:
-                future = executor.submit(scrape_live_game, new_url, game_id)
-                try:
-                    result = future.result(timeout=25)
-                except concurrent.futures.TimeoutError:
-                    logger.warning(f"Live scrape timed out for {new_url}")
-                    return {"status": "error", "message": "Live scrape timed out"}
-    
-    if result and result.get("quarter") == "final":
-        logger.info("Current game is final, searching for a new live game...")
-        new_url = find_live_nba_game()
-        if new_url and new_url != game_url:
-            game.oddsportal_url = new_url
-            db.commit()
-            with concurrent.futures.ThreadPoolExecutor(max_workers=1) as executor:
-                future = executor.submit(scrape_live_game, new_url, game_id)
-                try:
-                    result = future.result(timeout=25)
-                except concurrent.futures.TimeoutError:
-                    logger.warning(f"Live scrape timed out for {new_url}")
-                    return {"status": "error", "message": "Live scrape timed out"}
-
-    if not result:
-        return {"status": "error", "message": "Could not scrape game"}
-    
-    # Update game info if teams were extracted
-    if result.get('home_team') and result.get('away_team'):
-        game.home_team = result['home_team']
-        game.away_team = result['away_team']
-        db.commit()
-    
-    # Normalize quarter label to avoid leading zeros (e.g., Q004 -> Q4)
-    import re
-    stage = result.get('quarter', 'Unknown')
-    if isinstance(stage, str):
-        stage = re.sub(r'^Q0+(\d+)$', r'Q\1', stage)
-
-    # Create a quarter snapshot for the current state
-    snapshot = QuarterSnapshot(
-        game_id=game_id,
-        stage=stage,
-        score_home=result.get('score_home', 0),
-        score_away=result.get('score_away', 0),
-        score_diff=result.get('score_home', 0) - result.get('score_away', 0),
-        ml_home=result.get('ml_home', 0.0),
-        ml_away=result.get('ml_away', 0.0),
-        spread=0.0,
-        timestamp=datetime.now(timezone.utc)
-    )
-    
-    db.add(snapshot)
-    db.commit()
-    
-    logger.info(f"Saved live snapshot for game {game_id}")
-    
-    return {
-        "status": "live_scraped",
-        "timestamp": result.get('timestamp'),
-        "score": f"{result.get('away_team')} {result.get('score_away')} - {result.get('score_home')} {result.get('home_team')}",
-        "quarter": stage,
-        "odds": {
-            "home": result.get('ml_home'),
-            "away": result.get('ml_away')
-        },
-        "game": {
-            "home_team": game.home_team,
-            "away_team": game.away_team
-        }
-    }
+    return await _enqueue_scrape(game_id, "live", wait, db)
 
 
 @app.post("/games/{game_id}/scrape-pregame")
-async def scrape_pregame_game_endpoint(game_id: int, db: Session = Depends(get_db)):
+async def scrape_pregame_game_endpoint(game_id: int, wait: float = 0, db: AsyncSession = Depends(get_async_db)):
     """
-    Scrape pre-game odds for a game before it starts.
-    Returns pre-game moneyline odds.
+    Queue a pre-game odds scrape for a game before it starts.
+    Returns a job id immediately; pass ?wait=<seconds> to block for the result.
     """
-    import time
-    from app.scraper import scrape_pregame_game
-    
-    # Get the game and its URL from database
-    game = db.query(Game).filter(Game.id == game_id).first()
+    game = await db.get(Game, game_id)
     if not game:
         return {"status": "error", "message": "Game not found"}
-    
     if not game.oddsportal_url:
         return {"status": "error", "message": "No OddsPortal URL configured for this game"}
-    
-    game_url = game.oddsportal_url
-    
-    logger.info(f"Scraping pre-game odds for {game_id} from: {game_url}")
-    
-    # Scrape the game
-    result = await scrape_pregame_game(game_url, game_id)
-    
-    if not result:
-        return {"status": "error", "message": "Could not scrape game"}
-    
-    # Update game info if teams were extracted
-    if result.get('home_team') and result.get('away_team'):
-        game.home_team = result['home_team']
-        game.away_team = result['away_team']
-        db.commit()
-    
-    # Create a quarter snapshot for the pre-game state
-    snapshot = QuarterSnapshot(
-        game_id=game_id,
-        stage="pregame",
-        score_home=0,
-        score_away=0,
-        score_diff=0,
-        ml_home=result.get('ml_home', 0.0),
-        ml_away=result.get('ml_away', 0.0),
-        spread=0.0,
-        timestamp=datetime.now(timezone.utc)
-    )
-    
-    db.add(snapshot)
-    db.commit()
-    
-    logger.info(f"Saved pre-game snapshot for game {game_id}")
-    
-    return {
-        "status": "pregame_scraped",
-        "timestamp": result.get('timestamp'),
-        "score": f"{result.get('away_team')} 0 - 0 {result.get('home_team')}",
-        "quarter": "pregame",
-        "odds": {
-            "home": result.get('ml_home'),
-            "away": result.get('ml_away')
-        },
-        "game": {
-            "home_team": game.home_team,
-            "away_team": game.away_team
-        }
-    }
+    return await _enqueue_scrape(game_id, "pregame", wait, db)
+
+
+@app.get("/jobs/{job_id}")
+async def get_job(job_id: int, db: AsyncSession = Depends(get_async_db)):
+    job = await db.get(ScrapeJob, job_id)
+    if not job:
+        return {"error": "Job not found"}
+    return job_to_dict(job)
 
 
 # ---------- Pinnacle integration endpoints ----------
 @app.post("/pinnacle/poll-once")
 def pinnacle_poll_once(db: Session = Depends(get_db)):
     """Fetch current Pinnacle odds for NBA (sport_id=29) and store snapshots in `live_odds_snapshots`."""
+    from .pinnacle import fetch_odds_by_sport
+    from .bulk_ingest import bulk_insert_snapshots
+
     results = fetch_odds_by_sport(sport_id=29)
     if not results:
         return {"status": "no_data"}
 
-    rows = []
-    for r in results:
-        snap = LiveOddsSnapshot(
-            game_id=str(r.get('event_id') or f"{r.get('home')} vs {r.get('away')}"),
-            timestamp=r.get('timestamp'),
-            quarter=None,
-            game_clock=None,
-            teamA_score=None,
-            teamB_score=None,
-            teamA_ml=r.get('ml_home'),
-            teamB_ml=r.get('ml_away'),
-            spread_line=r.get('spread'),
-            total_line=r.get('total')
+    # LIVE_COLUMNS order; no scores from this source
+    rows = [
+        (
+            str(r.get('event_id') or f"{r.get('home')} vs {r.get('away')}"),
+            r.get('timestamp'),
+            None,
+            None,
+            None,
+            None,
+            r.get('ml_home'),
+            r.get('ml_away'),
+            r.get('spread'),
+            r.get('total'),
         )
-        rows.append(snap)
+        for r in results
+    ]
 
-    db.add_all(rows)
+    bulk_insert_snapshots(db, LiveOddsSnapshot, rows)
     db.commit()
     return {"status": "stored", "count": len(rows)}
 
 
 @app.get("/games/{game_id}/live-snapshots")
-def get_live_snapshots(game_id: str, db: Session = Depends(get_db)):
-    snaps = (
-        db.query(LiveOddsSnapshot)
-        .filter(LiveOddsSnapshot.game_id == str(game_id))
-        .order_by(LiveOddsSnapshot.timestamp)
-        .all()
+async def get_live_snapshots(
+    game_id: str,
+    request: Request,
+    response: Response,
+    since_id: Optional[int] = None,
+    after_ts: Optional[datetime] = None,
+    changed_since: Optional[datetime] = None,
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    max_points: Optional[int] = Query(None, ge=3, le=MAX_PAGE_SIZE),
+    fmt: Optional[str] = Query(None, alias="format"),
+    db: AsyncSession = Depends(get_read_db),
+):
+    # game_id is an integer column; asyncpg will not coerce string binds
+    if not game_id.isdigit():
+        return []
+    fmt = negotiate(request, fmt)
+    version = await game_version(db, int(game_id))
+    not_modified = conditional_response(request, response, etag_version(version, fmt))
+    if not_modified:
+        return not_modified
+    return await _snapshot_page(
+        db, LiveOddsSnapshot, int(game_id), version, response, since_id, after_ts, limit,
+        by_timestamp=True, fmt=fmt, max_points=max_points, odds_fields=("teamA_ml", "teamB_ml"),
+        changed_since=changed_since,
     )
-    return jsonable_encoder(snaps)
 
 
 @app.get("/pinnacle/games")
-def list_pinnacle_games(limit: int = 50, db: Session = Depends(get_db)):
+async def list_pinnacle_games(limit: int = 50, db: AsyncSession = Depends(get_read_db)):
     """Return distinct recent Pinnacle game ids with latest timestamp and basic info."""
-    # Query recent snapshots and group by game_id using simple approach
-    snaps = (
-        db.query(LiveOddsSnapshot)
-        .order_by(LiveOddsSnapshot.timestamp.desc())
-        .limit(limit)
-        .all()
-    )
-
-    seen = {}
-    out = []
-    for s in snaps:
-        gid = s.game_id
-        if gid in seen:
-            continue
-        seen[gid] = True
-        out.append({
-            "game_id": gid,
-            "timestamp": s.timestamp,
-            "teamA_score": s.teamA_score,
-            "teamB_score": s.teamB_score,
-            "teamA_ml": s.teamA_ml,
-            "teamB_ml": s.teamB_ml,
-            "spread": s.spread_line,
-        })
-
-    return out
+    # Latest row per game comes from the hot state; without NOTIFY, other
+    # processes' writes are picked up by a periodic reload
+    if hot.hot_state.live_stale(hub.pg_listening):
+        await hot.refresh_live(db, hot.hot_state)
+
+    return [
+        {
+            "game_id": s["game_id"],
+            "timestamp": s["timestamp"],
+            "teamA_score": s["teamA_score"],
+            "teamB_score": s["teamB_score"],
+            "teamA_ml": s["teamA_ml"],
+            "teamB_ml": s["teamB_ml"],
+            "spread": s["spread_line"],
+            "implied_probabilities": s["implied_probabilities"],
+        }
+        for s in hot.hot_state.live_games(limit) or []
+    ]
 
 
 @app.post("/pinnacle/demo-poll")
@@ -728,7 +794,9 @@ def demo_poll(db: Session = Depends(get_db)):
     
     # Clear old demo data
     db.query(LiveOddsSnapshot).filter(LiveOddsSnapshot.game_id == game_id).delete()
+    rebuild_rollups(db, [game_id])
     db.commit()
+    hot.hot_state.forget(game_id)
     
     # Create 10 sample snapshots showing live odds movement
     snapshots = []
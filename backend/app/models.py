@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, Float, String, DateTime, ForeignKey
+from sqlalchemy import Column, Integer, Float, String, DateTime, ForeignKey, JSON, Index, text
 from .base import Base
 
 class Game(Base):
@@ -15,6 +15,19 @@ class Game(Base):
     pregame_ml_away = Column(Float, nullable=True)
     pregame_spread = Column(Float, nullable=True)
     pregame_total = Column(Float, nullable=True)
+    # bumped whenever the game or its snapshots change; drives HTTP ETags
+    data_version = Column(Integer, nullable=False, default=0, server_default="0")
+
+    __table_args__ = (
+        # Scheduler polls only the few active games among seasons of finals
+        Index(
+            "ix_games_active", "status",
+            postgresql_where=text("status IN ('scheduled', 'live')"),
+            sqlite_where=text("status IN ('scheduled', 'live')"),
+        ),
+        # Game sync upserts on the URL (INSERT ... ON CONFLICT)
+        Index("uq_games_oddsportal_url", "oddsportal_url", unique=True),
+    )
 
 class OddsSnapshot(Base):
     __tablename__ = "odds_snapshots"
@@ -26,6 +39,10 @@ class OddsSnapshot(Base):
     moneyline_away = Column(Float)
     bookmaker = Column(String)
 
+    __table_args__ = (
+        Index("ix_odds_snapshots_game_id_timestamp", "game_id", "timestamp"),
+    )
+
 class QuarterSnapshot(Base):
     __tablename__ = "quarter_snapshots"
 
@@ -47,7 +64,21 @@ class QuarterSnapshot(Base):
     # full-game spread (from favorite perspective)
     spread = Column(Float)
 
+    # Postgres partitions this table by month on timestamp (see app/partitions.py);
+    # there the primary key is (id, timestamp) and timestamp is NOT NULL
     timestamp = Column(DateTime)
+    # change-only storage: one row stands for repeat_count identical polls,
+    # the last at valid_until (see app/snapshot_runs.py)
+    valid_until = Column(DateTime, nullable=True)
+    repeat_count = Column(Integer, nullable=False, default=1, server_default="1")
+
+    __table_args__ = (
+        # keyset cursors for since_id / after_ts polling
+        Index("ix_quarter_snapshots_game_id_id", "game_id", "id"),
+        Index("ix_quarter_snapshots_game_id_timestamp", "game_id", "timestamp"),
+        # never reuse ids of pruned rows: archived reads take rows above the archive's max id
+        {"sqlite_autoincrement": True},
+    )
 
 
 class LiveOddsSnapshot(Base):
@@ -55,6 +86,7 @@ class LiveOddsSnapshot(Base):
 
     id = Column(Integer, primary_key=True, index=True)
     game_id = Column(Integer, index=True)
+    # monthly partition key on Postgres, like QuarterSnapshot.timestamp
     timestamp = Column(DateTime)
     quarter = Column(Integer, nullable=True)
     game_clock = Column(String, nullable=True)
@@ -64,6 +96,16 @@ class LiveOddsSnapshot(Base):
     teamB_ml = Column(Float, nullable=True)
     spread_line = Column(Float, nullable=True)
     total_line = Column(Float, nullable=True)
+    valid_until = Column(DateTime, nullable=True)
+    repeat_count = Column(Integer, nullable=False, default=1, server_default="1")
+
+    __table_args__ = (
+        Index("ix_live_odds_snapshots_game_id_id", "game_id", "id"),
+        Index("ix_live_odds_snapshots_game_id_timestamp", "game_id", "timestamp"),
+        # /pinnacle/games: most recent rows across all games
+        Index("ix_live_odds_snapshots_timestamp", "timestamp"),
+        {"sqlite_autoincrement": True},
+    )
 
 
 class Alert(Base):
@@ -75,3 +117,86 @@ class Alert(Base):
     message = Column(String)
     timestamp = Column(DateTime)
     sent_to = Column(String)  # telegram, webhook, etc.
+
+    __table_args__ = (
+        # alert cooldown: latest alert per game
+        Index("ix_alerts_game_id_timestamp", "game_id", "timestamp"),
+    )
+
+
+class ScrapeCost(Base):
+    __tablename__ = "scrape_costs"
+
+    id = Column(Integer, primary_key=True, index=True)
+    game_id = Column(Integer, index=True, nullable=True)  # null for slate-wide syncs
+    cycle_id = Column(Integer, index=True, nullable=True)  # scheduler cycle start (epoch seconds)
+    kind = Column(String)  # live, pregame, quarter, sync
+    wall_ms = Column(Integer)
+    python_cpu_ms = Column(Integer)  # the scraping thread's own CPU, not the browser's
+    bytes_in = Column(Integer)
+    pages_opened = Column(Integer)
+    retries = Column(Integer)
+    timestamp = Column(DateTime)
+
+
+class ScrapeJob(Base):
+    __tablename__ = "scrape_jobs"
+
+    id = Column(Integer, primary_key=True, index=True)
+    game_id = Column(Integer, index=True)
+    kind = Column(String)  # live, pregame, quarter
+    status = Column(String, default="queued")  # queued | running | done | failed
+    result = Column(JSON, nullable=True)  # response payload of the scrape
+    error = Column(String, nullable=True)
+    attempts = Column(Integer, default=0)
+    created_at = Column(DateTime)
+    started_at = Column(DateTime, nullable=True)
+    finished_at = Column(DateTime, nullable=True)
+
+    __table_args__ = (
+        # At most one active job per game and kind; duplicates coalesce onto it
+        Index(
+            "uq_scrape_jobs_active", "game_id", "kind", unique=True,
+            postgresql_where=text("status IN ('queued', 'running')"),
+            sqlite_where=text("status IN ('queued', 'running')"),
+        ),
+        Index("ix_scrape_jobs_queued", "status", "id"),
+    )
+
+
+class OddsRollup(Base):
+    __tablename__ = "odds_rollups"
+
+    id = Column(Integer, primary_key=True, index=True)
+    game_id = Column(Integer, nullable=False)
+    bucket = Column(String, nullable=False)  # 1m | quarter
+    bucket_key = Column(String, nullable=False)  # minute start (ISO) or stage label
+    bucket_start = Column(DateTime, nullable=False)
+    first_ts = Column(DateTime)
+    last_ts = Column(DateTime)
+    samples = Column(Integer, nullable=False, default=0)
+
+    # implied probabilities (0-1) of the home / away moneyline
+    home_open = Column(Float, nullable=True)
+    home_high = Column(Float, nullable=True)
+    home_low = Column(Float, nullable=True)
+    home_close = Column(Float, nullable=True)
+    away_open = Column(Float, nullable=True)
+    away_high = Column(Float, nullable=True)
+    away_low = Column(Float, nullable=True)
+    away_close = Column(Float, nullable=True)
+    spread_open = Column(Float, nullable=True)
+    spread_high = Column(Float, nullable=True)
+    spread_low = Column(Float, nullable=True)
+    spread_close = Column(Float, nullable=True)
+    total_open = Column(Float, nullable=True)
+    total_high = Column(Float, nullable=True)
+    total_low = Column(Float, nullable=True)
+    total_close = Column(Float, nullable=True)
+
+    __table_args__ = (
+        # upsert target for incremental updates (app/rollups.py)
+        Index("uq_odds_rollups_bucket", "game_id", "bucket", "bucket_key", unique=True),
+        # /games/{id}/series
+        Index("ix_odds_rollups_game_id_bucket_start", "game_id", "bucket", "bucket_start"),
+    )
@@ -0,0 +1,171 @@
+"""
+Snapshot Partitions
+Monthly range partitions on `timestamp` for quarter_snapshots and
+live_odds_snapshots (Postgres only; other backends are left alone).
+Keeps partitions created ahead of time and detaches months past retention,
+archiving them to a separate schema or to gzipped CSV.
+"""
+
+import csv
+import gzip
+import logging
+import os
+import re
+from datetime import date, datetime, timezone
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from sqlalchemy import text
+
+logger = logging.getLogger(__name__)
+
+PARTITIONED_TABLES = ("quarter_snapshots", "live_odds_snapshots")
+PARTITION_PREMAKE_MONTHS = int(os.getenv("PARTITION_PREMAKE_MONTHS", "3"))
+# 0 keeps every month forever
+SNAPSHOT_RETENTION_MONTHS = int(os.getenv("SNAPSHOT_RETENTION_MONTHS", "0"))
+# Detached months are written here as gzipped CSV and dropped; unset, they move to ARCHIVE_SCHEMA
+SNAPSHOT_ARCHIVE_DIR = os.getenv("SNAPSHOT_ARCHIVE_DIR")
+ARCHIVE_SCHEMA = os.getenv("SNAPSHOT_ARCHIVE_SCHEMA", "archive")
+# Rows fetched per round trip when a partition is exported without COPY
+ARCHIVE_FETCH_ROWS = 10000
+
+_MONTH_SUFFIX = re.compile(r"_p(\d{4})(\d{2})$")
+
+
+def add_months(month: date, n: int) -> date:
+    index = month.year * 12 + month.month - 1 + n
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def month_start(ts) -> date:
+    return date(ts.year, ts.month, 1)
+
+
+def partition_name(table: str, month: date) -> str:
+    return f"{table}_p{month:%Y%m}"
+
+
+def create_partition_sql(table: str, month: date) -> str:
+    return (
+        f"CREATE TABLE IF NOT EXISTS {partition_name(table, month)} PARTITION OF {table} "
+        f"FOR VALUES FROM ('{month.isoformat()}') TO ('{add_months(month, 1).isoformat()}')"
+    )
+
+
+def list_partitions(conn, table: str) -> Dict[date, str]:
+    """Monthly partitions currently attached to `table`, keyed by month."""
+    names = conn.execute(text(
+        "SELECT c.relname FROM pg_inherits i "
+        "JOIN pg_class c ON c.oid = i.inhrelid JOIN pg_class p ON p.oid = i.inhparent "
+        "WHERE p.relname = :table"
+    ), {"table": table}).scalars().all()
+    out = {}
+    for name in names:
+        m = _MONTH_SUFFIX.search(name)
+        if m:
+            out[date(int(m.group(1)), int(m.group(2)), 1)] = name
+    return out
+
+
+def _create_month(conn, table: str, month: date):
+    """
+    Create one month. Rows already sitting in the DEFAULT partition for that
+    range would block CREATE ... PARTITION OF, so they are moved in first.
+    """
+    default = f"{table}_default"
+    lo, hi = month.isoformat(), add_months(month, 1).isoformat()
+    stranded = conn.execute(text(
+        f"SELECT EXISTS (SELECT 1 FROM {default} WHERE timestamp >= :lo AND timestamp < :hi)"
+    ), {"lo": lo, "hi": hi}).scalar()
+    if not stranded:
+        conn.execute(text(create_partition_sql(table, month)))
+        return
+
+    logger.warning(f"Moving {table} rows for {month:%Y-%m} out of the default partition")
+    conn.execute(text(f"ALTER TABLE {table} DETACH PARTITION {default}"))
+    conn.execute(text(create_partition_sql(table, month)))
+    conn.execute(text(f"INSERT INTO {table} SELECT * FROM {default} WHERE timestamp >= :lo AND timestamp < :hi"), {"lo": lo, "hi": hi})
+    conn.execute(text(f"DELETE FROM {default} WHERE timestamp >= :lo AND timestamp < :hi"), {"lo": lo, "hi": hi})
+    conn.execute(text(f"ALTER TABLE {table} ATTACH PARTITION {default} DEFAULT"))
+
+
+def ensure_partitions(conn, months_ahead: int = PARTITION_PREMAKE_MONTHS, today: Optional[date] = None) -> List[str]:
+    """Create this month's and the next `months_ahead` months' partitions if missing."""
+    current = month_start(today or datetime.now(timezone.utc))
+    created = []
+    for table in PARTITIONED_TABLES:
+        existing = list_partitions(conn, table)
+        for n in range(months_ahead + 1):
+            month = add_months(current, n)
+            if month not in existing:
+                _create_month(conn, table, month)
+                created.append(partition_name(table, month))
+    if created:
+        logger.info(f"Created partitions: {', '.join(created)}")
+    return created
+
+
+def _archive_to_file(conn, name: str, archive_dir: Path) -> Path:
+    """
+    Write a partition to gzipped CSV with a header row: COPY on psycopg2,
+    a streamed SELECT on drivers without copy_expert (psycopg 3 and others).
+    """
+    archive_dir.mkdir(parents=True, exist_ok=True)
+    path = archive_dir / f"{name}.csv.gz"
+    with gzip.open(path, "wt", newline="") as fh:
+        if conn.dialect.driver == "psycopg2":
+            raw = conn.connection.dbapi_connection
+            raw.cursor().copy_expert(f"COPY {name} TO STDOUT WITH (FORMAT csv, HEADER true)", fh)
+        else:
+            result = conn.execution_options(yield_per=ARCHIVE_FETCH_ROWS).execute(text(f"SELECT * FROM {name}"))
+            writer = csv.writer(fh)
+            writer.writerow(result.keys())
+            for rows in result.partitions():
+                writer.writerows(rows)
+    return path
+
+
+def apply_retention(conn, keep_months: int = SNAPSHOT_RETENTION_MONTHS, today: Optional[date] = None,
+                    archive_dir: Optional[str] = SNAPSHOT_ARCHIVE_DIR) -> List[str]:
+    """Detach and archive monthly partitions older than `keep_months` (0 disables)."""
+    if keep_months <= 0:
+        return []
+    cutoff = add_months(month_start(today or datetime.now(timezone.utc)), -keep_months)
+    archived = []
+    for table in PARTITIONED_TABLES:
+        for month, name in sorted(list_partitions(conn, table).items()):
+            if month >= cutoff:
+                continue
+            if archive_dir:
+                # exported before DETACH: a failed export leaves the month attached
+                path = _archive_to_file(conn, name, Path(archive_dir))
+                conn.execute(text(f"ALTER TABLE {table} DETACH PARTITION {name}"))
+                conn.execute(text(f"DROP TABLE {name}"))
+                logger.info(f"Archived {name} to {path}")
+            else:
+                conn.execute(text(f"ALTER TABLE {table} DETACH PARTITION {name}"))
+                conn.execute(text(f"CREATE SCHEMA IF NOT EXISTS {ARCHIVE_SCHEMA}"))
+                conn.execute(text(f"ALTER TABLE {name} SET SCHEMA {ARCHIVE_SCHEMA}"))
+                logger.info(f"Detached {name} into schema {ARCHIVE_SCHEMA}")
+            archived.append(name)
+    return archived
+
+
+def run_maintenance(engine=None) -> Dict:
+    """Premake upcoming partitions and apply retention. No-op off Postgres."""
+    if engine is None:
+        from .db import engine
+    if engine.dialect.name != "postgresql":
+        return {"skipped": f"partitioning needs postgresql, not {engine.dialect.name}"}
+
+    with engine.begin() as conn:
+        # Partitioning is installed by migration; don't act on an unmigrated database
+        is_partitioned = conn.execute(text(
+            "SELECT count(*) FROM pg_partitioned_table pt JOIN pg_class c ON c.oid = pt.partrelid "
+            "WHERE c.relname = ANY(:tables)"
+        ), {"tables": list(PARTITIONED_TABLES)}).scalar()
+        if is_partitioned != len(PARTITIONED_TABLES):
+            return {"skipped": "snapshot tables are not partitioned; run alembic upgrade"}
+        created = ensure_partitions(conn)
+        archived = apply_retention(conn)
+    return {"created": created, "archived": archived}
@@ -1,14 +1,134 @@
-from datetime import timedelta
+from datetime import datetime, timedelta, timezone
 from typing import List
 
+from sqlalchemy import and_, func, or_, select
+
+from .models import QuarterSnapshot, LiveOddsSnapshot
+
+REPLAY_FIELDS = ("timestamp", "ml_home", "ml_away", "stage", "score_home", "score_away", "score_diff", "spread")
+
 def detect_gaps(snaps, max_gap_seconds=120):
     gaps = []
+    prev_end = None
     for i in range(1, len(snaps)):
-        delta = (snaps[i].timestamp - snaps[i-1].timestamp).total_seconds()
+        # a run of repeated polls covers everything up to its valid_until; with both
+        # snapshot sources interleaved, an earlier run may reach past the row before this one
+        prev_end = max(prev_end, run_end(snaps[i-1])) if prev_end else run_end(snaps[i-1])
+        delta = (snaps[i].timestamp - prev_end).total_seconds()
         if delta > max_gap_seconds:
             gaps.append({
-                "from": snaps[i-1].timestamp.isoformat(),
+                "from": prev_end.isoformat(),
                 "to": snaps[i].timestamp.isoformat(),
                 "gap_seconds": int(delta)
             })
-    return gaps
\ No newline at end of file
+    return gaps
+
+def naive_utc(ts):
+    """Snapshot timestamps are stored as naive UTC."""
+    if ts is not None and ts.tzinfo is not None:
+        ts = ts.astimezone(timezone.utc).replace(tzinfo=None)
+    return ts
+
+def run_timestamps(start, valid_until, repeat_count) -> List:
+    """The poll times a run stands for, spread evenly from start to valid_until."""
+    if valid_until is None or not repeat_count or repeat_count <= 1:
+        return [start]
+    step = (valid_until - start) / (repeat_count - 1)
+    return [start + step * i for i in range(repeat_count - 1)] + [valid_until]
+
+def run_end(row):
+    """Timestamp of the last poll a stored row stands for."""
+    return row.valid_until or row.timestamp
+
+def window_filter(stmt, model, start_ts, end_ts):
+    stmt = stmt.where(model.timestamp.isnot(None))
+    if start_ts is not None:
+        # keep runs that started earlier but were still repeating at start_ts
+        stmt = stmt.where(func.coalesce(model.valid_until, model.timestamp) >= naive_utc(start_ts))
+    if end_ts is not None:
+        stmt = stmt.where(model.timestamp <= naive_utc(end_ts))
+    return stmt
+
+def _window(stmt, model, start_ts, end_ts):
+    return window_filter(stmt, model, start_ts, end_ts).order_by(model.timestamp)
+
+def replay_queries(game_id: int, start_ts=None, end_ts=None):
+    """
+    Time-ordered selects of both snapshot sources' replay columns, each row
+    ending in (valid_until, repeat_count). The database is read through
+    timeline.timeline_query; these column layouts are what
+    game_archive.iter_replay_rows reads back from Parquet.
+    """
+    quarter = select(
+        QuarterSnapshot.timestamp, QuarterSnapshot.ml_home, QuarterSnapshot.ml_away, QuarterSnapshot.stage,
+        QuarterSnapshot.score_home, QuarterSnapshot.score_away, QuarterSnapshot.score_diff, QuarterSnapshot.spread,
+        QuarterSnapshot.valid_until, QuarterSnapshot.repeat_count,
+    ).where(QuarterSnapshot.game_id == game_id)
+    live = select(
+        LiveOddsSnapshot.timestamp, LiveOddsSnapshot.teamA_ml, LiveOddsSnapshot.teamB_ml, LiveOddsSnapshot.quarter,
+        LiveOddsSnapshot.teamA_score, LiveOddsSnapshot.teamB_score, LiveOddsSnapshot.spread_line,
+        LiveOddsSnapshot.valid_until, LiveOddsSnapshot.repeat_count,
+    ).where(LiveOddsSnapshot.game_id == game_id)
+    return _window(quarter, QuarterSnapshot, start_ts, end_ts), _window(live, LiveOddsSnapshot, start_ts, end_ts)
+
+def snapshot_page_query(model, game_id: int, since_id=None, after_ts=None, limit=None, by_timestamp: bool = False,
+                        above_id=None, changed_since=None):
+    """
+    Keyset page of a game's snapshots.
+    since_id alone returns rows inserted after that id, in id order. after_ts
+    returns rows newer than that time in (timestamp, id) order; pass both to
+    continue such a page exactly, with since_id breaking timestamp ties.
+    changed_since (with since_id) also returns older rows whose run was
+    extended past that time: change-only storage updates valid_until in
+    place instead of inserting a row.
+    A limit fetches one extra row so callers can tell whether more remain.
+    above_id skips rows up to that id (an archived game's exported rows).
+    """
+    query = select(model).where(model.game_id == game_id)
+    if above_id is not None:
+        query = query.where(model.id > above_id)
+    if after_ts is not None:
+        after_ts = naive_utc(after_ts)
+        if since_id is not None:
+            query = query.where(or_(model.timestamp > after_ts, and_(model.timestamp == after_ts, model.id > since_id)))
+        else:
+            query = query.where(model.timestamp > after_ts)
+        by_timestamp = True
+    elif since_id is not None:
+        newer = model.id > since_id
+        if changed_since is not None:
+            newer = or_(newer, func.coalesce(model.valid_until, model.timestamp) > naive_utc(changed_since))
+        query = query.where(newer)
+        by_timestamp = False
+    query = query.order_by(model.timestamp, model.id) if by_timestamp else query.order_by(model.id)
+    if limit is not None:
+        query = query.limit(limit + 1)
+    return query
+
+def page_snapshots(rows, since_id=None, after_ts=None, limit=None, by_timestamp: bool = False, changed_since=None):
+    """snapshot_page_query applied to rows already in memory (an archived game's)."""
+    if after_ts is not None:
+        after_ts = naive_utc(after_ts)
+        rows = [r for r in rows if r.timestamp is not None and (
+            r.timestamp > after_ts or (since_id is not None and r.timestamp == after_ts and r.id > since_id))]
+        by_timestamp = True
+    elif since_id is not None:
+        changed_since = naive_utc(changed_since)
+        rows = [r for r in rows if r.id > since_id or (
+            changed_since is not None and run_end(r) is not None and run_end(r) > changed_since)]
+        by_timestamp = False
+    if by_timestamp:
+        # NULL timestamps sort last, as on Postgres
+        rows = sorted(rows, key=lambda r: (r.timestamp is None, r.timestamp or datetime.min, r.id))
+    else:
+        rows = sorted(rows, key=lambda r: r.id)
+    return rows[:limit + 1] if limit is not None else rows
+
+def live_replay_row(row):
+    """Map a live snapshot row onto REPLAY_FIELDS, keeping its run columns."""
+    ts, a_ml, b_ml, quarter, a_score, b_score, spread, valid_until, repeat_count = row
+    return (
+        ts, a_ml or None, b_ml or None, f"Q{quarter}" if quarter else "live",
+        a_score, b_score, a_score - b_score if a_score is not None and b_score is not None else None, spread,
+        valid_until, repeat_count,
+    )
@@ -0,0 +1,135 @@
+"""
+Response Cache
+Bounded in-process LRU for computed per-game payloads, keyed by game,
+games.data_version and a request variant. A new version makes old entries
+unreachable; write events also evict them eagerly to free memory.
+
+Set RESPONSE_CACHE_REDIS_URL to share entries across uvicorn workers
+(requires the optional `redis` package).
+"""
+
+import json
+import logging
+import os
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+REDIS_URL = os.getenv("RESPONSE_CACHE_REDIS_URL")
+REDIS_TTL_SECONDS = int(os.getenv("RESPONSE_CACHE_REDIS_TTL", "3600"))
+
+
+def _shared_client():
+    if not REDIS_URL:
+        return None
+    try:
+        import redis.asyncio as redis_async
+    except ImportError:
+        logger.warning("RESPONSE_CACHE_REDIS_URL set but redis is not installed; using local cache only")
+        return None
+    return redis_async.from_url(REDIS_URL)
+
+
+class VersionedLRUCache:
+    def __init__(self, name: str, max_entries: int = 512, max_bytes: int = 64 * 1024 * 1024):
+        self.name = name
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[Tuple[int, int, str], Tuple[Any, int]]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._shared = _shared_client()
+        self._stats = {"hits": 0, "shared_hits": 0, "misses": 0, "evictions": 0, "invalidations": 0}
+
+    def _shared_key(self, key) -> str:
+        return f"{self.name}:{key[0]}:{key[1]}:{key[2]}"
+
+    def _get_local(self, key):
+        with self._lock:
+            item = self._entries.get(key)
+            if item is None:
+                return None
+            self._entries.move_to_end(key)
+            return item[0]
+
+    def _put_local(self, key, value, size: int):
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old:
+                self._bytes -= old[1]
+            self._entries[key] = (value, size)
+            self._bytes += size
+            while self._entries and (len(self._entries) > self.max_entries or self._bytes > self.max_bytes):
+                _, (_, evicted_size) = self._entries.popitem(last=False)
+                self._bytes -= evicted_size
+                self._stats["evictions"] += 1
+
+    async def get(self, game_id: int, version: int, variant: str = "") -> Optional[Any]:
+        key = (game_id, version, variant)
+        value = self._get_local(key)
+        if value is not None:
+            self._stats["hits"] += 1
+            return value
+
+        if self._shared is not None:
+            try:
+                raw = await self._shared.get(self._shared_key(key))
+            except Exception as e:
+                logger.warning(f"{self.name} shared cache read failed: {e}")
+                raw = None
+            if raw is not None:
+                value = json.loads(raw)
+                self._put_local(key, value, len(raw))
+                self._stats["shared_hits"] += 1
+                return value
+
+        self._stats["misses"] += 1
+        return None
+
+    async def put(self, game_id: int, version: int, value: Any, variant: str = ""):
+        key = (game_id, version, variant)
+        raw = json.dumps(value, default=str)
+        self._put_local(key, value, len(raw))
+        if self._shared is not None:
+            try:
+                await self._shared.set(self._shared_key(key), raw, ex=REDIS_TTL_SECONDS)
+            except Exception as e:
+                logger.warning(f"{self.name} shared cache write failed: {e}")
+
+    def invalidate(self, game_id: int):
+        with self._lock:
+            stale = [k for k in self._entries if k[0] == game_id]
+            for k in stale:
+                self._bytes -= self._entries.pop(k)[1]
+            if stale:
+                self._stats["invalidations"] += len(stale)
+
+    def stats(self) -> Dict:
+        lookups = self._stats["hits"] + self._stats["shared_hits"] + self._stats["misses"]
+        return {
+            **self._stats,
+            "hit_rate": round((self._stats["hits"] + self._stats["shared_hits"]) / lookups, 3) if lookups else None,
+            "entries": len(self._entries),
+            "bytes": self._bytes,
+            "max_entries": self.max_entries,
+            "max_bytes": self.max_bytes,
+            "shared": self._shared is not None,
+        }
+
+
+insights_cache = VersionedLRUCache(
+    "insights",
+    max_entries=int(os.getenv("INSIGHTS_CACHE_MAX_ENTRIES", "512")),
+    max_bytes=int(os.getenv("INSIGHTS_CACHE_MAX_MB", "32")) * 1024 * 1024,
+)
+
+# downsampled chart series: kept row indices per game version and query
+series_cache = VersionedLRUCache(
+    "series",
+    max_entries=int(os.getenv("SERIES_CACHE_MAX_ENTRIES", "1024")),
+    max_bytes=int(os.getenv("SERIES_CACHE_MAX_MB", "16")) * 1024 * 1024,
+)
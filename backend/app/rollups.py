@@ -0,0 +1,202 @@
+"""
+Odds Rollups
+Per-game OHLC of home/away implied probability, spread and total, per minute
+and per quarter, kept in odds_rollups and updated in the same transaction as
+the snapshot writes that feed it, so charts read one row per bucket instead
+of scanning raw snapshots.
+"""
+
+import logging
+from datetime import timedelta
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from sqlalchemy import and_, case, delete, event, func, or_, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session
+
+from .insights import implied_prob
+from .models import LiveOddsSnapshot, OddsRollup, QuarterSnapshot
+from .replay import naive_utc, run_timestamps
+
+logger = logging.getLogger(__name__)
+
+BUCKETS = ("1m", "quarter")
+METRICS = ("home", "away", "spread", "total")
+ROLLUP_FIELDS = ("bucket_start", "bucket_key", "samples") + tuple(
+    f"{metric}_{part}" for metric in METRICS for part in ("open", "high", "low", "close")
+)
+
+# (game_id, timestamp, stage, home prob, away prob, spread, total)
+Sample = Tuple
+
+
+def snapshot_samples(model, values: Dict) -> List[Sample]:
+    """One sample per poll a snapshot row stands for (runs are expanded)."""
+    ts = naive_utc(values.get("timestamp"))
+    if ts is None:
+        return []
+    if model is QuarterSnapshot:
+        stage = values.get("stage")
+        reading = (implied_prob(values.get("ml_home")), implied_prob(values.get("ml_away")), values.get("spread"), None)
+    else:
+        quarter = values.get("quarter")
+        stage = f"Q{quarter}" if quarter else "live"
+        reading = (implied_prob(values.get("teamA_ml")), implied_prob(values.get("teamB_ml")),
+                   values.get("spread_line"), values.get("total_line"))
+    valid_until = naive_utc(values.get("valid_until"))
+    return [(values.get("game_id"), at, stage or "unknown", *reading)
+            for at in run_timestamps(ts, valid_until, values.get("repeat_count"))]
+
+
+def _minute(ts):
+    return ts.replace(second=0, microsecond=0)
+
+
+def _bucket_keys(ts, stage) -> List[Tuple[str, str, object]]:
+    minute = _minute(ts)
+    return [("1m", minute.isoformat(), minute), ("quarter", stage, ts)]
+
+
+def aggregate(samples: Iterable[Sample], buckets: Sequence[str] = BUCKETS) -> Dict[Tuple, Dict]:
+    """Fold samples into partial rollup rows keyed by (game_id, bucket, bucket_key)."""
+    out: Dict[Tuple, Dict] = {}
+    for game_id, ts, stage, *values in sorted(samples, key=lambda s: s[1]):
+        for bucket, key, start in _bucket_keys(ts, stage):
+            if bucket not in buckets:
+                continue
+            row = out.get((game_id, bucket, key))
+            if row is None:
+                row = out[(game_id, bucket, key)] = {
+                    "game_id": game_id, "bucket": bucket, "bucket_key": key, "bucket_start": start,
+                    "first_ts": ts, "samples": 0,
+                    **{f"{m}_{p}": None for m in METRICS for p in ("open", "high", "low", "close")},
+                }
+            row["last_ts"] = ts
+            row["samples"] += 1
+            for metric, value in zip(METRICS, values):
+                if value is None:
+                    continue
+                if row[f"{metric}_open"] is None:
+                    row[f"{metric}_open"] = value
+                row[f"{metric}_high"] = value if row[f"{metric}_high"] is None else max(row[f"{metric}_high"], value)
+                row[f"{metric}_low"] = value if row[f"{metric}_low"] is None else min(row[f"{metric}_low"], value)
+                row[f"{metric}_close"] = value
+    return out
+
+
+def _upsert_statement(dialect: str):
+    if dialect == "postgresql":
+        stmt, greatest, least = pg_insert(OddsRollup), func.greatest, func.least
+    elif dialect == "sqlite":
+        # SQLite's multi-argument max()/min() are its greatest()/least()
+        stmt, greatest, least = sqlite_insert(OddsRollup), func.max, func.min
+    else:
+        return None
+
+    cur, new = OddsRollup.__table__.c, stmt.excluded
+    earlier, later = new.first_ts < cur.first_ts, new.last_ts >= cur.last_ts
+    merged = {
+        "bucket_start": least(cur.bucket_start, new.bucket_start),
+        "first_ts": least(cur.first_ts, new.first_ts),
+        "last_ts": greatest(cur.last_ts, new.last_ts),
+        "samples": cur.samples + new.samples,
+    }
+    for metric in METRICS:
+        o, h, l, c = (f"{metric}_{p}" for p in ("open", "high", "low", "close"))
+        merged[o] = case((earlier, func.coalesce(new[o], cur[o])), else_=func.coalesce(cur[o], new[o]))
+        merged[c] = case((later, func.coalesce(new[c], cur[c])), else_=func.coalesce(cur[c], new[c]))
+        # coalesce both ways: SQLite's max()/min() return NULL if any argument is NULL
+        merged[h] = greatest(func.coalesce(cur[h], new[h]), func.coalesce(new[h], cur[h]))
+        merged[l] = least(func.coalesce(cur[l], new[l]), func.coalesce(new[l], cur[l]))
+    return stmt.on_conflict_do_update(index_elements=["game_id", "bucket", "bucket_key"], set_=merged)
+
+
+# Built once per dialect: the statement is the same for every write, only the rows change
+_UPSERTS: Dict[str, object] = {}
+
+
+def _upsert(conn, rows: List[Dict]):
+    dialect = conn.dialect.name
+    if dialect not in _UPSERTS:
+        _UPSERTS[dialect] = _upsert_statement(dialect)
+    if _UPSERTS[dialect] is None:
+        logger.warning(f"Odds rollups need INSERT ... ON CONFLICT; skipping on {dialect}")
+        return
+    conn.execute(_UPSERTS[dialect], rows)
+
+
+def apply_samples(conn, samples: Iterable[Sample], buckets: Sequence[str] = BUCKETS):
+    """Merge samples into odds_rollups on `conn` (inside the caller's transaction)."""
+    rows = list(aggregate(samples, buckets).values())
+    if rows:
+        _upsert(conn, rows)
+
+
+def extend_rollups(conn, model, runs: Iterable[Tuple[Dict, object, int]]):
+    """
+    Roll up runs extended in place, given (stored row as it was, new
+    valid_until, new repeat_count), so the result matches rebuild_rollups.
+    A longer run re-spaces all its polls (run_timestamps), so its minutes
+    are recomputed from the stored rows, which must already be updated; its
+    quarter bucket only gains the added polls, the last at valid_until.
+    """
+    # game_id -> [first minute, end of last minute) of its extended run
+    windows, added = {}, []
+    for row, valid_until, repeat_count in runs:
+        start, end = naive_utc(row["timestamp"]), naive_utc(valid_until)
+        if start is None or end is None:
+            continue
+        windows[row["game_id"]] = (_minute(start), _minute(end) + timedelta(minutes=1))
+        last = snapshot_samples(model, {**row, "timestamp": end, "valid_until": None, "repeat_count": 1})
+        added.extend(last * (repeat_count - (row["repeat_count"] or 1)))
+    if windows:
+        samples = []
+        for source in (QuarterSnapshot, LiveOddsSnapshot):
+            overlapping = or_(*(
+                and_(source.game_id == gid, source.timestamp < hi, func.coalesce(source.valid_until, source.timestamp) >= lo)
+                for gid, (lo, hi) in windows.items()
+            ))
+            for stored in conn.execute(select(*source.__table__.columns).where(overlapping)).mappings():
+                lo, hi = windows[stored["game_id"]]
+                samples.extend(sample for sample in snapshot_samples(source, stored) if lo <= sample[1] < hi)
+        conn.execute(delete(OddsRollup).where(OddsRollup.bucket == "1m", or_(*(
+            and_(OddsRollup.game_id == gid, OddsRollup.bucket_start >= lo, OddsRollup.bucket_start < hi)
+            for gid, (lo, hi) in windows.items()
+        ))))
+        apply_samples(conn, samples, buckets=("1m",))
+    apply_samples(conn, added, buckets=("quarter",))
+
+
+def rebuild_rollups(session: Session, game_ids: Iterable) -> int:
+    """Recompute the rollups of `game_ids` from raw snapshots, e.g. after snapshots were deleted."""
+    ids = sorted({gid for gid in game_ids if gid is not None}, key=str)
+    if not ids:
+        return 0
+    conn = session.connection()
+    conn.execute(delete(OddsRollup).where(OddsRollup.game_id.in_(ids)))
+    samples = []
+    for model in (QuarterSnapshot, LiveOddsSnapshot):
+        for row in conn.execute(select(*model.__table__.columns).where(model.game_id.in_(ids))).mappings():
+            samples.extend(snapshot_samples(model, row))
+    apply_samples(conn, samples)
+    return len(samples)
+
+
+def series_query(game_id: int, bucket: str, since: Optional[object] = None):
+    query = select(OddsRollup).where(OddsRollup.game_id == game_id, OddsRollup.bucket == bucket)
+    if since is not None:
+        # >=: the newest bucket keeps changing until its minute/quarter is over
+        query = query.where(OddsRollup.bucket_start >= naive_utc(since))
+    return query.order_by(OddsRollup.bucket_start)
+
+
+@event.listens_for(Session, "after_flush")
+def _rollup_new_snapshots(session, flush_context):
+    samples = []
+    for obj in session.new:
+        model = type(obj)
+        if model in (QuarterSnapshot, LiveOddsSnapshot):
+            samples.extend(snapshot_samples(model, {c.key: getattr(obj, c.key) for c in model.__table__.columns}))
+    if samples:
+        apply_samples(session.connection(), samples)
@@ -0,0 +1,148 @@
+"""
+Scrape Cost Accounting
+Records wall time, Python CPU time, bytes in, pages opened and retries for
+every scrape call, tagged with the game and scheduler cycle it belongs to.
+python_cpu_ms is the scraping thread's own CPU (parsing, callbacks), not the
+page work: that happens in the browser processes, which are only accounted
+process-wide (browser_cpu_ms), since concurrent scrapes' browsers are
+reaped into one shared counter.
+"""
+
+import functools
+import inspect
+import logging
+import os
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
+
+from sqlalchemy import func
+
+from .models import ScrapeCost
+
+logger = logging.getLogger(__name__)
+
+# Playwright's sync API dispatches events on greenlets of the calling thread,
+# so a thread-local (not a ContextVar) is what those callbacks can see.
+_local = threading.local()
+_cycle_id: Optional[int] = None
+
+
+def set_cycle(cycle_id: Optional[int]):
+    """Tag every scrape recorded from now on with a scheduler cycle id."""
+    global _cycle_id
+    _cycle_id = cycle_id
+
+
+def add_cost(field: str, amount: int = 1):
+    """Add to a counter on the scrape currently running in this thread, if any."""
+    record = getattr(_local, "record", None)
+    if record is not None:
+        record[field] += amount
+
+
+def browser_cpu_ms() -> int:
+    """CPU used by this process's reaped child processes (the browsers) since it started."""
+    t = os.times()
+    return int((t.children_user + t.children_system) * 1000)
+
+
+def _persist(record: Dict):
+    from .db import SessionLocal
+
+    db = SessionLocal()
+    try:
+        db.add(ScrapeCost(**record))
+        db.commit()
+    except Exception as e:
+        db.rollback()
+        logger.warning(f"Failed to record scrape cost: {e}")
+    finally:
+        db.close()
+
+
+def track_scrape_cost(kind: str):
+    """Decorator that records one ScrapeCost row per call of a scrape function."""
+    def decorator(fn):
+        sig = inspect.signature(fn)
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            try:
+                game_id = sig.bind_partial(*args, **kwargs).arguments.get("game_id")
+            except TypeError:
+                game_id = None
+
+            record = {"bytes_in": 0, "pages_opened": 0, "retries": 0}
+            outer = getattr(_local, "record", None)
+            _local.record = record
+            wall_start = time.perf_counter()
+            cpu_start = time.thread_time()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                _local.record = outer
+                record.update(
+                    game_id=game_id,
+                    cycle_id=_cycle_id,
+                    kind=kind,
+                    wall_ms=int((time.perf_counter() - wall_start) * 1000),
+                    python_cpu_ms=int((time.thread_time() - cpu_start) * 1000),
+                    timestamp=datetime.now(timezone.utc),
+                )
+                _persist(record)
+        return wrapper
+    return decorator
+
+
+def _aggregate_columns():
+    return [
+        func.count(ScrapeCost.id).label("calls"),
+        func.coalesce(func.sum(ScrapeCost.wall_ms), 0).label("wall_ms"),
+        func.coalesce(func.sum(ScrapeCost.python_cpu_ms), 0).label("python_cpu_ms"),
+        func.coalesce(func.sum(ScrapeCost.bytes_in), 0).label("bytes_in"),
+        func.coalesce(func.sum(ScrapeCost.pages_opened), 0).label("pages_opened"),
+        func.coalesce(func.sum(ScrapeCost.retries), 0).label("retries"),
+    ]
+
+
+def game_cost_summary(db, game_id: int) -> Dict:
+    """Totals per scrape kind for one game."""
+    rows = (
+        db.query(ScrapeCost.kind, *_aggregate_columns())
+        .filter(ScrapeCost.game_id == game_id)
+        .group_by(ScrapeCost.kind)
+        .all()
+    )
+    by_kind = {r.kind: dict(r._mapping) for r in rows}
+    for v in by_kind.values():
+        v.pop("kind", None)
+    return {
+        "game_id": game_id,
+        "by_kind": by_kind,
+        "wall_ms": sum(v["wall_ms"] for v in by_kind.values()),
+        "bytes_in": sum(v["bytes_in"] for v in by_kind.values()),
+    }
+
+
+def cycle_cost_summary(db, limit: int = 20) -> List[Dict]:
+    """Totals for the most recent scheduler cycles, newest first."""
+    rows = (
+        db.query(
+            ScrapeCost.cycle_id,
+            func.count(func.distinct(ScrapeCost.game_id)).label("games"),
+            *_aggregate_columns(),
+        )
+        .filter(ScrapeCost.cycle_id.isnot(None))
+        .group_by(ScrapeCost.cycle_id)
+        .order_by(ScrapeCost.cycle_id.desc())
+        .limit(limit)
+        .all()
+    )
+    out = []
+    for r in rows:
+        item = dict(r._mapping)
+        item["started_at"] = datetime.fromtimestamp(r.cycle_id, timezone.utc).isoformat()
+        out.append(item)
+    return out
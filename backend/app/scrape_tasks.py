@@ -0,0 +1,187 @@
+"""
+Scrape Tasks
+The work behind the scrape endpoints, run by job queue workers (live,
+pregame) or inline by the quarter endpoint and the scheduler (quarter).
+Each task takes a sync session and returns the response payload; run_task
+shares one in-flight or just-finished run per game and kind between them.
+"""
+
+import logging
+import os
+import re
+from datetime import datetime, timezone
+
+from .models import Game, QuarterSnapshot
+from .snapshot_runs import record_snapshots
+from .singleflight import SingleFlight
+
+logger = logging.getLogger(__name__)
+
+# A scrape that finished this recently is handed back instead of scraping again
+SCRAPE_RESULT_TTL_SECONDS = float(os.getenv("SCRAPE_RESULT_TTL_SECONDS", "10"))
+
+scrape_flight = SingleFlight(
+    "scrape",
+    ttl_seconds=SCRAPE_RESULT_TTL_SECONDS,
+    remember=lambda result: result.get("status") != "error",
+)
+
+
+def scrape_live_task(db, game_id: int) -> dict:
+    """Scrape a live game once and store a QuarterSnapshot for its current state."""
+    from .scraper import scrape_live_game, find_live_nba_game
+
+    game = db.query(Game).filter(Game.id == game_id).first()
+    if not game:
+        return {"status": "error", "message": "Game not found"}
+
+    game_url = game.oddsportal_url
+
+    # If no URL configured, find a live game dynamically
+    if not game_url:
+        logger.info(f"No URL configured for game {game_id}, finding live NBA game...")
+        game_url = find_live_nba_game()
+        if not game_url:
+            return {"status": "error", "message": "No live NBA games found"}
+        game.oddsportal_url = game_url
+        db.commit()
+        logger.info(f"Updated game {game_id} with live game URL: {game_url}")
+
+    logger.info(f"Scraping live game {game_id} from: {game_url}")
+    result = scrape_live_game(game_url, game_id)
+
+    if not result or result.get("quarter") == "final":
+        # If scraping failed or the game is over, try to find a new live game
+        logger.warning(f"No live data from {game_url}, looking for new live game...")
+        new_url = find_live_nba_game()
+        if new_url and new_url != game_url:
+            game.oddsportal_url = new_url
+            db.commit()
+            logger.info(f"Switched to new live game: {new_url}")
+            result = scrape_live_game(new_url, game_id)
+
+    if not result:
+        return {"status": "error", "message": "Could not scrape game"}
+
+    # Update game info if teams were extracted
+    if result.get('home_team') and result.get('away_team'):
+        game.home_team = result['home_team']
+        game.away_team = result['away_team']
+
+    # Normalize quarter label to avoid leading zeros (e.g., Q004 -> Q4)
+    stage = result.get('quarter', 'Unknown')
+    if isinstance(stage, str):
+        stage = re.sub(r'^Q0+(\d+)$', r'Q\1', stage)
+
+    snapshot = QuarterSnapshot(
+        game_id=game_id,
+        stage=stage,
+        score_home=result.get('score_home', 0),
+        score_away=result.get('score_away', 0),
+        score_diff=result.get('score_home', 0) - result.get('score_away', 0),
+        ml_home=result.get('ml_home', 0.0),
+        ml_away=result.get('ml_away', 0.0),
+        spread=0.0,
+        timestamp=datetime.now(timezone.utc)
+    )
+    record_snapshots(db, [snapshot])
+    db.commit()
+
+    logger.info(f"Saved live snapshot for game {game_id}")
+
+    return {
+        "status": "live_scraped",
+        "timestamp": result.get('timestamp'),
+        "score": f"{result.get('away_team')} {result.get('score_away')} - {result.get('score_home')} {result.get('home_team')}",
+        "quarter": stage,
+        "odds": {
+            "home": result.get('ml_home'),
+            "away": result.get('ml_away')
+        },
+        "game": {
+            "home_team": game.home_team,
+            "away_team": game.away_team
+        }
+    }
+
+
+def scrape_pregame_task(db, game_id: int) -> dict:
+    """Scrape pre-game odds and store a pregame QuarterSnapshot."""
+    from .scraper import scrape_pregame_game
+
+    game = db.query(Game).filter(Game.id == game_id).first()
+    if not game:
+        return {"status": "error", "message": "Game not found"}
+    if not game.oddsportal_url:
+        return {"status": "error", "message": "No OddsPortal URL configured for this game"}
+
+    logger.info(f"Scraping pre-game odds for {game_id} from: {game.oddsportal_url}")
+    result = scrape_pregame_game(game.oddsportal_url, game_id)
+
+    if not result:
+        return {"status": "error", "message": "Could not scrape game"}
+
+    if result.get('home_team') and result.get('away_team'):
+        game.home_team = result['home_team']
+        game.away_team = result['away_team']
+
+    snapshot = QuarterSnapshot(
+        game_id=game_id,
+        stage="pregame",
+        score_home=0,
+        score_away=0,
+        score_diff=0,
+        ml_home=result.get('ml_home', 0.0),
+        ml_away=result.get('ml_away', 0.0),
+        spread=0.0,
+        timestamp=datetime.now(timezone.utc)
+    )
+    record_snapshots(db, [snapshot])
+    db.commit()
+
+    logger.info(f"Saved pre-game snapshot for game {game_id}")
+
+    return {
+        "status": "pregame_scraped",
+        "timestamp": result.get('timestamp'),
+        "score": f"{result.get('away_team')} 0 - 0 {result.get('home_team')}",
+        "quarter": "pregame",
+        "odds": {
+            "home": result.get('ml_home'),
+            "away": result.get('ml_away')
+        },
+        "game": {
+            "home_team": game.home_team,
+            "away_team": game.away_team
+        }
+    }
+
+
+def scrape_quarter_task(db, game_id: int) -> dict:
+    """Scrape the NBA listing's live odds for a game and store them change-only."""
+    from .scraper import scrape_oddsportal_quarter
+
+    snapshots = scrape_oddsportal_quarter(game_id)
+    if not snapshots:
+        return {"status": "no live odds found"}
+    stored = record_snapshots(db, snapshots)
+    # plain values: the result is shared with callers on other sessions and threads
+    readings = [{c.key: getattr(s, c.key) for c in QuarterSnapshot.__table__.columns if c.key != "id"} for s in snapshots]
+    db.commit()
+    return {"status": "scraped", "count": len(snapshots), "stored": stored, "snapshots": readings}
+
+
+TASKS = {
+    "live": scrape_live_task,
+    "pregame": scrape_pregame_task,
+    "quarter": scrape_quarter_task,
+}
+
+
+def run_task(db, kind: str, game_id: int) -> dict:
+    """Run a scrape task, sharing one in-flight or just-finished scrape per game and kind."""
+    task = TASKS.get(kind)
+    if task is None:
+        raise ValueError(f"Unknown job kind: {kind}")
+    result, shared = scrape_flight.do((kind, game_id), task, db, game_id)
+    return {**result, "shared": True} if shared else result
@@ -2,6 +2,8 @@ from playwright.sync_api import sync_playwright
 from bs4 import BeautifulSoup
 from datetime import datetime, timezone
 from .models import QuarterSnapshot
+from .browser_cache import attach_cache, get_cache_metrics
+from .scrape_costs import track_scrape_cost, add_cost
 import logging
 import re
 import time
@@ -13,8 +15,8 @@ import random
 logger = logging.getLogger(__name__)
 
 SCRAPER_HEALTH = {
-    "live": {"attempts": 0, "success": 0, "last_success": None, "last_error": None, "last_duration_ms": None},
-    "pregame": {"attempts": 0, "success": 0, "last_success": None, "last_error": None, "last_duration_ms": None},
+    "live": {"attempts": 0, "success": 0, "last_success": None, "last_error": None, "last_duration_ms": None, "last_cache": None},
+    "pregame": {"attempts": 0, "success": 0, "last_success": None, "last_error": None, "last_duration_ms": None, "last_cache": None},
 }
 
 def _log_event(event: str, **fields):
@@ -36,6 +38,17 @@ def _random_user_agent():
 def _jitter(min_s: float = 0.3, max_s: float = 1.2) -> float:
     return random.uniform(min_s, max_s)
 
+def _new_context(browser):
+    """Create a browser context with the standard fingerprint, routed through the asset cache."""
+    context = browser.new_context(
+        user_agent=_random_user_agent(),
+        locale="en-US",
+        timezone_id="America/New_York",
+        viewport={"width": 1280, "height": 720}
+    )
+    context.on("page", lambda _page: add_cost("pages_opened"))
+    return context, attach_cache(context)
+
 def _goto_with_retries(page, url: str, attempts: int = 3):
     last_err = None
     for i in range(attempts):
@@ -45,6 +58,7 @@ def _goto_with_retries(page, url: str, attempts: int = 3):
             return True
         except Exception as e:
             last_err = e
+            add_cost("retries")
             time.sleep(1.0 + i * 1.2 + _jitter(0.2, 0.8))
     logger.warning(f"Navigation failed after {attempts} attempts: {last_err}")
     return False
@@ -172,12 +186,7 @@ def find_live_nba_game():
     try:
         with sync_playwright() as p:
             browser = p.chromium.launch(headless=True, args=["--disable-blink-features=AutomationControlled"])
-            context = browser.new_context(
-                user_agent=_random_user_agent(),
-                locale="en-US",
-                timezone_id="America/New_York",
-                viewport={"width": 1280, "height": 720}
-            )
+            context, _ = _new_context(browser)
             page = context.new_page()
             _goto_with_retries(page, "https://www.oddsportal.com/basketball/usa/nba/")
             page.wait_for_timeout(int(_jitter(2500, 4500)))
@@ -231,6 +240,7 @@ def find_live_nba_game():
         logger.error(f"Error finding live NBA game: {e}")
         return None
 
+@track_scrape_cost("quarter")
 def scrape_oddsportal_quarter(game_id: int):
     """
     Scrapes OddsPortal for live NBA game odds.
@@ -239,12 +249,7 @@ def scrape_oddsportal_quarter(game_id: int):
     try:
         with sync_playwright() as p:
             browser = p.chromium.launch(headless=True, args=["--disable-blink-features=AutomationControlled"])
-            context = browser.new_context(
-                user_agent=_random_user_agent(),
-                locale="en-US",
-                timezone_id="America/New_York",
-                viewport={"width": 1280, "height": 720}
-            )
+            context, _ = _new_context(browser)
             page = context.new_page()
             _goto_with_retries(page, "https://www.oddsportal.com/basketball/usa/nba/")
 
@@ -350,12 +355,7 @@ def scrape_completed_games(game_id: int):
     try:
         with sync_playwright() as p:
             browser = p.chromium.launch(headless=True, args=["--disable-blink-features=AutomationControlled"])
-            context = browser.new_context(
-                user_agent=_random_user_agent(),
-                locale="en-US",
-                timezone_id="America/New_York",
-                viewport={"width": 1280, "height": 720}
-            )
+            context, _ = _new_context(browser)
             page = context.new_page()
             _goto_with_retries(page, "https://www.oddsportal.com/basketball/usa/nba/results/")
             time.sleep(_jitter(1.5, 3.0))
@@ -436,6 +436,7 @@ def scrape_completed_games(game_id: int):
         logger.error(f"Completed games scraper error: {e}")
         return [], {}
 
+@track_scrape_cost("live")
 def scrape_live_game(game_url: str, game_id: int):
     SCRAPER_HEALTH["live"]["attempts"] += 1
     start_ts = time.time()
@@ -453,6 +454,7 @@ def scrape_live_game(game_url: str, game_id: int):
     browser = None
     page = None
     p = None
+    cache_stats = None
     
     try:
         p = sync_playwright().start()
@@ -462,12 +464,7 @@ def scrape_live_game(game_url: str, game_id: int):
         browser = p.chromium.launch(headless=True, args=["--disable-blink-features=AutomationControlled"])
         logger.info("Browser launched")
 
-        context = browser.new_context(
-            user_agent=_random_user_agent(),
-            locale="en-US",
-            timezone_id="America/New_York",
-            viewport={"width": 1280, "height": 720}
-        )
+        context, cache_stats = _new_context(browser)
         page = context.new_page()
         logger.info("Page created")
 
@@ -763,6 +760,7 @@ def scrape_live_game(game_url: str, game_id: int):
         return None
     
     finally:
+        SCRAPER_HEALTH["live"]["last_cache"] = cache_stats
         # Ensure browser is closed properly
         try:
             if page:
@@ -775,6 +773,7 @@ def scrape_live_game(game_url: str, game_id: int):
             pass
 
 
+@track_scrape_cost("pregame")
 def scrape_pregame_game(game_url: str, game_id: int):
     SCRAPER_HEALTH["pregame"]["attempts"] += 1
     start_ts = time.time()
@@ -792,6 +791,7 @@ def scrape_pregame_game(game_url: str, game_id: int):
     browser = None
     page = None
     p = None
+    cache_stats = None
     
     try:
         p = sync_playwright().start()
@@ -801,12 +801,7 @@ def scrape_pregame_game(game_url: str, game_id: int):
         browser = p.chromium.launch(headless=True, args=["--disable-blink-features=AutomationControlled"])
         logger.info("Browser launched")
 
-        context = browser.new_context(
-            user_agent=_random_user_agent(),
-            locale="en-US",
-            timezone_id="America/New_York",
-            viewport={"width": 1280, "height": 720}
-        )
+        context, cache_stats = _new_context(browser)
         page = context.new_page()
         logger.info("Page created")
 
@@ -972,6 +967,7 @@ def scrape_pregame_game(game_url: str, game_id: int):
         return None
     
     finally:
+        SCRAPER_HEALTH["pregame"]["last_cache"] = cache_stats
         # Ensure browser is closed properly
         try:
             if page:
@@ -995,4 +991,4 @@ def american_to_decimal(american_odds: int) -> float:
         return 0.0
 
 def get_scraper_health():
-    return SCRAPER_HEALTH
+    return {**SCRAPER_HEALTH, "cache": get_cache_metrics()}
@@ -0,0 +1,82 @@
+"""
+Single Flight
+Coalesces concurrent calls for the same key onto one execution and shares
+its result; a successful result is also reused for a short TTL so callers
+arriving just after it finished don't repeat the work.
+Thread-based, since scrapes run on worker threads and the sync scheduler.
+"""
+
+import logging
+import threading
+import time
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+
+
+class SingleFlight:
+    def __init__(self, name: str, ttl_seconds: float = 0, remember: Optional[Callable[[Any], bool]] = None):
+        self.name = name
+        self.ttl_seconds = ttl_seconds
+        # results failing this check are shared with waiters but not kept for the TTL
+        self.remember = remember or (lambda result: True)
+        self._lock = threading.Lock()
+        self._calls: Dict[Hashable, _Call] = {}
+        self._recent: Dict[Hashable, Tuple[float, Any]] = {}
+        self._stats = {"executions": 0, "shared": 0, "ttl_hits": 0}
+
+    def do(self, key: Hashable, fn: Callable, *args, **kwargs) -> Tuple[Any, bool]:
+        """Run fn(*args, **kwargs) unless it is in flight or fresh for `key`. Returns (result, shared)."""
+        with self._lock:
+            recent = self._recent.get(key)
+            if recent and time.monotonic() - recent[0] < self.ttl_seconds:
+                self._stats["ttl_hits"] += 1
+                return recent[1], True
+
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+                self._stats["executions"] += 1
+            else:
+                self._stats["shared"] += 1
+
+        if not leader:
+            logger.info(f"{self.name}: joining in-flight call for {key}")
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result, True
+
+        try:
+            call.result = fn(*args, **kwargs)
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+                if call.error is None and self.ttl_seconds > 0 and self.remember(call.result):
+                    self._recent[key] = (time.monotonic(), call.result)
+                self._prune()
+            call.done.set()
+        return call.result, False
+
+    def forget(self, key: Hashable):
+        with self._lock:
+            self._recent.pop(key, None)
+
+    def _prune(self):
+        cutoff = time.monotonic() - self.ttl_seconds
+        for key in [k for k, (at, _) in self._recent.items() if at < cutoff]:
+            del self._recent[key]
+
+    def stats(self) -> Dict:
+        return {**self._stats, "in_flight": len(self._calls), "ttl_seconds": self.ttl_seconds}
@@ -0,0 +1,116 @@
+"""
+Snapshot Events
+Captures QuarterSnapshot / LiveOddsSnapshot rows as sessions write them and
+announces them once per commit: through Postgres NOTIFY so every API
+process hears about writes from pollers and workers, and to in-process
+listeners when no NOTIFY channel is available.
+Also bumps games.data_version for every game whose data changed.
+"""
+
+import json
+import logging
+from datetime import datetime
+from typing import Callable, Dict, List
+
+from sqlalchemy import event, text, update
+from sqlalchemy.orm import Session
+
+from .models import Game, QuarterSnapshot, LiveOddsSnapshot
+
+logger = logging.getLogger(__name__)
+
+NOTIFY_CHANNEL = "snapshot_events"
+# Postgres caps NOTIFY payloads at 8000 bytes; snapshot rows are far below this
+MAX_NOTIFY_BYTES = 7900
+
+SNAPSHOT_KINDS = {
+    QuarterSnapshot: "quarter_snapshot",
+    LiveOddsSnapshot: "live_snapshot",
+}
+
+_local_listeners: List[Callable[[List[Dict]], None]] = []
+
+
+def add_local_listener(fn: Callable[[List[Dict]], None]):
+    """Receive committed snapshot events from sessions in this process."""
+    _local_listeners.append(fn)
+
+
+def remove_local_listener(fn: Callable[[List[Dict]], None]):
+    if fn in _local_listeners:
+        _local_listeners.remove(fn)
+
+
+def row_to_dict(obj) -> Dict:
+    out = {}
+    for col in obj.__table__.columns:
+        value = getattr(obj, col.key)
+        out[col.key] = value.isoformat() if isinstance(value, datetime) else value
+    return out
+
+
+def snapshot_event(obj) -> Dict:
+    return {"kind": SNAPSHOT_KINDS[type(obj)], "game_id": obj.game_id, "row": row_to_dict(obj)}
+
+
+def _dispatch(events: List[Dict]):
+    for fn in list(_local_listeners):
+        try:
+            fn(events)
+        except Exception:
+            logger.exception("Snapshot listener failed")
+
+
+def bump_data_version(conn, game_ids):
+    """Invalidate ETags/caches for games whose snapshots changed outside the ORM (bulk deletes, COPY)."""
+    ids = sorted({gid for gid in game_ids if gid is not None})
+    if ids:
+        conn.execute(update(Game).where(Game.id.in_(ids)).values(data_version=Game.data_version + 1))
+
+
+@event.listens_for(Session, "before_flush")
+def _version_dirty_games(session, flush_context, instances):
+    for obj in session.dirty:
+        if isinstance(obj, Game) and session.is_modified(obj, include_collections=False):
+            # SQL-side increment so a stale in-memory value can never win
+            obj.data_version = Game.data_version + 1
+
+
+def queue_snapshot_events(session: Session, events: List[Dict]):
+    """
+    Version, NOTIFY and (after commit) dispatch events for snapshot rows written
+    in `session`'s transaction. Called by the flush hook and by writers that
+    bypass the ORM (app/bulk_ingest.py).
+    """
+    if not events:
+        return
+    session.info.setdefault("snapshot_events", []).extend(events)
+    bump_data_version(session.connection(), [ev["game_id"] for ev in events])
+
+    bind = session.get_bind()
+    if bind.dialect.name == "postgresql":
+        # NOTIFY is transactional: listeners only hear it if this commit lands
+        conn = session.connection()
+        for ev in events:
+            payload = json.dumps(ev, default=str)
+            if len(payload) > MAX_NOTIFY_BYTES:
+                logger.warning(f"Snapshot event for game {ev['game_id']} too large to NOTIFY")
+                continue
+            conn.execute(text("SELECT pg_notify(:channel, :payload)"), {"channel": NOTIFY_CHANNEL, "payload": payload})
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_snapshots(session, flush_context):
+    queue_snapshot_events(session, [snapshot_event(obj) for obj in session.new if type(obj) in SNAPSHOT_KINDS])
+
+
+@event.listens_for(Session, "after_commit")
+def _publish_snapshots(session):
+    events = session.info.pop("snapshot_events", None)
+    if events:
+        _dispatch(events)
+
+
+@event.listens_for(Session, "after_rollback")
+def _drop_snapshots(session):
+    session.info.pop("snapshot_events", None)
@@ -0,0 +1,160 @@
+"""
+Snapshot Runs
+Change-only snapshot storage. A poll whose odds/score match the latest stored
+row for its game extends that row (valid_until, repeat_count) instead of
+inserting a new one, so timeouts and breaks cost one row rather than one per
+poll. Readers expand a run back into evenly spaced readings (app/replay.py).
+"""
+
+import logging
+import os
+from datetime import datetime, timedelta
+from typing import Dict, List, Sequence, Tuple
+
+from sqlalchemy import and_, bindparam, func, select, update
+from sqlalchemy.orm import Session
+
+from .env import env_flag
+from .models import QuarterSnapshot, LiveOddsSnapshot
+from .replay import naive_utc
+from .rollups import extend_rollups
+from .snapshot_events import SNAPSHOT_KINDS, queue_snapshot_events
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_CHANGE_ONLY = env_flag("SNAPSHOT_CHANGE_ONLY", True)
+# A repeat arriving later than this after the run's last poll starts a new row,
+# so polling outages still show up as gaps (matches detect_gaps' default)
+SNAPSHOT_RUN_MAX_GAP_SECONDS = float(os.getenv("SNAPSHOT_RUN_MAX_GAP_SECONDS", "120"))
+
+RUN_COLUMNS = ("valid_until", "repeat_count")
+
+# Columns that must all match for a poll to count as a repeat
+STATE_FIELDS = {
+    QuarterSnapshot: ("stage", "score_home", "score_away", "score_diff", "ml_home", "ml_away", "spread"),
+    LiveOddsSnapshot: ("quarter", "game_clock", "teamA_score", "teamB_score", "teamA_ml", "teamB_ml", "spread_line", "total_line"),
+}
+
+
+def latest_runs_query(model, game_ids):
+    """Newest stored row(s) per game, via the (game_id, timestamp) index."""
+    newest = (
+        select(model.game_id, func.max(model.timestamp).label("timestamp"))
+        .where(model.game_id.in_(game_ids))
+        .group_by(model.game_id)
+        .subquery()
+    )
+    return select(*model.__table__.columns).join(
+        newest, and_(model.game_id == newest.c.game_id, model.timestamp == newest.c.timestamp)
+    )
+
+
+def latest_runs(session: Session, model, game_ids) -> Dict:
+    """Latest stored row per game as plain column rows."""
+    ids = {gid for gid in game_ids if gid is not None}
+    if not ids:
+        return {}
+    out = {}
+    for row in session.execute(latest_runs_query(model, ids)).all():
+        # same-timestamp ties: the later insert wins
+        if row.game_id not in out or row.id > out[row.game_id].id:
+            out[row.game_id] = row
+    return out
+
+
+def plan_runs(model, readings: List[Dict], latest: Dict) -> Tuple[List[int], Dict[int, Dict]]:
+    """
+    Fold each reading into the run it repeats, if any.
+    `latest` maps game_id to the newest stored row. Returns the indexes of
+    readings to insert (with valid_until / repeat_count filled in) and the
+    stored rows to extend, as {id: {"valid_until", "repeat_count"}}.
+    """
+    fields = STATE_FIELDS[model]
+    max_gap = timedelta(seconds=SNAPSHOT_RUN_MAX_GAP_SECONDS)
+    # str(game_id) -> (("stored", row id) | ("new", reading index), state, start, valid_until, count);
+    # str because pollers pass ids as strings into the integer column
+    heads: Dict = {}
+    for gid, row in latest.items():
+        heads[str(gid)] = (("stored", row.id), tuple(getattr(row, f) for f in fields), row.timestamp, row.valid_until, row.repeat_count)
+
+    keep, extend = [], {}
+    order = sorted(range(len(readings)), key=lambda i: naive_utc(readings[i]["timestamp"]) or datetime.min)
+    for i in order:
+        reading = readings[i]
+        reading["valid_until"], reading["repeat_count"] = None, 1
+        ts = naive_utc(reading["timestamp"])
+        state = tuple(reading[f] for f in fields)
+        head = heads.get(str(reading["game_id"]))
+        if head is not None and ts is not None:
+            ref, head_state, start, valid_until, count = head
+            end = naive_utc(valid_until or start)
+            if state == head_state and end <= ts <= end + max_gap:
+                count += 1
+                heads[str(reading["game_id"])] = (ref, head_state, start, ts, count)
+                kind, key = ref
+                if kind == "stored":
+                    extend[key] = {"valid_until": ts, "repeat_count": count}
+                else:
+                    readings[key]["valid_until"], readings[key]["repeat_count"] = ts, count
+                continue
+        keep.append(i)
+        heads[str(reading["game_id"])] = (("new", i), state, ts, None, 1)
+    return sorted(keep), extend
+
+
+def extend_runs(session: Session, model, extend: Dict[int, Dict], latest: Dict):
+    """
+    Apply plan_runs' extensions, roll up the repeated polls and queue a
+    run_extended event per row (which also bumps the games' data_version).
+    """
+    if not extend:
+        return
+    table = model.__table__
+    session.execute(
+        update(table).where(table.c.id == bindparam("_id")).values(
+            valid_until=bindparam("valid_until"), repeat_count=bindparam("repeat_count"),
+        ),
+        [{"_id": key, **values} for key, values in extend.items()],
+    )
+    extended = [row for row in latest.values() if row.id in extend]
+    extend_rollups(session.connection(), model, [
+        (row._mapping, extend[row.id]["valid_until"], extend[row.id]["repeat_count"]) for row in extended
+    ])
+    queue_snapshot_events(session, [
+        {
+            "kind": "run_extended",
+            "source": SNAPSHOT_KINDS[model],
+            "game_id": row.game_id,
+            "row": {"id": row.id, "valid_until": naive_utc(extend[row.id]["valid_until"]).isoformat(),
+                    "repeat_count": extend[row.id]["repeat_count"]},
+        }
+        for row in extended
+    ])
+
+
+def record_snapshots(session: Session, snapshots: Sequence) -> int:
+    """
+    Add ORM snapshot instances change-only: repeats extend the latest stored
+    row instead of being added. The caller commits. Returns rows added.
+    """
+    if not SNAPSHOT_CHANGE_ONLY:
+        session.add_all(snapshots)
+        return len(snapshots)
+
+    added = 0
+    for model in (QuarterSnapshot, LiveOddsSnapshot):
+        batch = [s for s in snapshots if type(s) is model]
+        if not batch:
+            continue
+        readings = [{c.key: getattr(s, c.key) for c in model.__table__.columns if c.key != "id"} for s in batch]
+        latest = latest_runs(session, model, {r["game_id"] for r in readings})
+        keep, extend = plan_runs(model, readings, latest)
+        for i in keep:
+            batch[i].valid_until = readings[i]["valid_until"]
+            batch[i].repeat_count = readings[i]["repeat_count"]
+            session.add(batch[i])
+        extend_runs(session, model, extend, latest)
+        added += len(keep)
+        if extend:
+            logger.info(f"{model.__tablename__}: {len(batch) - len(keep)} repeat polls folded into existing rows")
+    return added
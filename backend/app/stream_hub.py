@@ -0,0 +1,158 @@
+"""
+Stream Hub
+In-process fan-out of snapshot and insight events to streaming clients.
+One LISTEN connection (or in-process commit hook) feeds every subscriber,
+so viewer count no longer multiplies database reads.
+"""
+
+import asyncio
+import json
+import logging
+from collections import defaultdict
+from typing import Callable, Dict, List, Optional, Set
+
+from .insights import detect_momentum_events
+from .snapshot_events import NOTIFY_CHANNEL, add_local_listener, remove_local_listener
+
+logger = logging.getLogger(__name__)
+
+QUEUE_SIZE = 256
+RECONNECT_SECONDS = 5
+
+
+def snapshot_point(ev: Dict) -> Optional[Dict]:
+    """Normalise a snapshot event row into the dict shape the insights code expects."""
+    row = ev.get("row") or {}
+    if ev.get("kind") == "quarter_snapshot":
+        return {"timestamp": row.get("timestamp"), "ml_home": row.get("ml_home"), "ml_away": row.get("ml_away"), "stage": row.get("stage")}
+    if ev.get("kind") == "live_snapshot":
+        quarter = row.get("quarter")
+        return {"timestamp": row.get("timestamp"), "ml_home": row.get("teamA_ml"), "ml_away": row.get("teamB_ml"), "stage": f"Q{quarter}" if quarter else "live"}
+    return None
+
+
+def format_sse(ev: Dict) -> str:
+    return f"event: {ev['kind']}\ndata: {json.dumps(ev, default=str)}\n\n"
+
+
+class StreamHub:
+    def __init__(self):
+        self._subscribers: Dict[int, Set[asyncio.Queue]] = defaultdict(set)
+        self._last_point: Dict[int, Dict] = {}
+        self._handlers: List[Callable[[Dict], None]] = []
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._listen_task: Optional[asyncio.Task] = None
+        self.pg_listening = False
+
+    # ---------- lifecycle ----------
+
+    async def start(self, dsn: Optional[str] = None):
+        """Start receiving events. `dsn` is a plain postgresql:// URL to LISTEN on."""
+        self._loop = asyncio.get_running_loop()
+        add_local_listener(self._on_local_events)
+        if dsn:
+            self._listen_task = asyncio.create_task(self._listen_pg(dsn))
+
+    async def stop(self):
+        remove_local_listener(self._on_local_events)
+        if self._listen_task:
+            self._listen_task.cancel()
+            try:
+                await self._listen_task
+            except asyncio.CancelledError:
+                pass
+            self._listen_task = None
+
+    async def _listen_pg(self, dsn: str):
+        import asyncpg
+
+        while True:
+            conn = None
+            try:
+                conn = await asyncpg.connect(dsn)
+                await conn.add_listener(NOTIFY_CHANNEL, self._on_notify)
+                self.pg_listening = True
+                logger.info(f"Stream hub listening on {NOTIFY_CHANNEL}")
+                while not conn.is_closed():
+                    await asyncio.sleep(RECONNECT_SECONDS)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"Stream hub LISTEN connection failed: {e}")
+            finally:
+                self.pg_listening = False
+                if conn is not None and not conn.is_closed():
+                    await conn.close()
+            await asyncio.sleep(RECONNECT_SECONDS)
+
+    # ---------- inbound ----------
+
+    def _on_notify(self, conn, pid, channel, payload):
+        try:
+            self.publish(json.loads(payload))
+        except ValueError:
+            logger.warning("Dropped malformed snapshot notification")
+
+    def _on_local_events(self, events: List[Dict]):
+        # With LISTEN active our own commits come back through NOTIFY
+        if self.pg_listening or self._loop is None or self._loop.is_closed():
+            return
+        for ev in events:
+            self._loop.call_soon_threadsafe(self.publish, ev)
+
+    def add_handler(self, fn: Callable[[Dict], None]):
+        """Run `fn` on the event loop for every snapshot event, subscribed or not."""
+        self._handlers.append(fn)
+
+    def publish(self, ev: Dict):
+        """Fan one snapshot event (and any insights it triggers) out to subscribers."""
+        game_id = ev.get("game_id")
+        for fn in self._handlers:
+            try:
+                fn(ev)
+            except Exception:
+                logger.exception("Stream hub handler failed")
+
+        outgoing = [ev]
+        point = snapshot_point(ev)
+        if point is not None:
+            prev = self._last_point.get(game_id)
+            self._last_point[game_id] = point
+            if prev is not None:
+                for insight in detect_momentum_events([prev, point]):
+                    outgoing.append({"kind": "insight", "game_id": game_id, "event": insight})
+
+        for queue in list(self._subscribers.get(game_id, ())):
+            for item in outgoing:
+                try:
+                    queue.put_nowait(item)
+                except asyncio.QueueFull:
+                    # Slow consumer: drop its backlog and tell it to refetch
+                    while not queue.empty():
+                        queue.get_nowait()
+                    queue.put_nowait({"kind": "resync", "game_id": game_id})
+                    break
+
+    # ---------- subscribers ----------
+
+    def subscribe(self, game_id: int) -> asyncio.Queue:
+        queue = asyncio.Queue(maxsize=QUEUE_SIZE)
+        self._subscribers[game_id].add(queue)
+        return queue
+
+    def unsubscribe(self, game_id: int, queue: asyncio.Queue):
+        subs = self._subscribers.get(game_id)
+        if subs:
+            subs.discard(queue)
+            if not subs:
+                del self._subscribers[game_id]
+
+    def stats(self) -> Dict:
+        return {
+            "pg_listening": self.pg_listening,
+            "games": len(self._subscribers),
+            "subscribers": sum(len(s) for s in self._subscribers.values()),
+        }
+
+
+hub = StreamHub()
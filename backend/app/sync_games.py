@@ -3,9 +3,11 @@ from bs4 import BeautifulSoup
 import re
 import time
 from datetime import datetime
-from .scraper import extract_event_header_data, _goto_with_retries, _jitter
+from .scraper import extract_event_header_data, _goto_with_retries, _jitter, _new_context
+from .scrape_costs import track_scrape_cost
 
 
+@track_scrape_cost("sync")
 def sync_games_from_oddsportal():
     """
     Scrape scheduled + live NBA games from OddsPortal NBA page.
@@ -16,7 +18,8 @@ def sync_games_from_oddsportal():
 
     with sync_playwright() as p:
         browser = p.chromium.launch(headless=True)
-        page = browser.new_page()
+        context, _ = _new_context(browser)
+        page = context.new_page()
         _goto_with_retries(page, url, attempts=3)
         time.sleep(2 + _jitter(1.0, 2.5))
 
@@ -52,7 +55,7 @@ def sync_games_from_oddsportal():
             # If not present in row, fetch game detail page once to read header JSON
             if not header_data:
                 try:
-                    detail_page = browser.new_page()
+                    detail_page = context.new_page()
                     detail_page.goto(full_url)
                     time.sleep(2)
                     detail_html = detail_page.content()
@@ -0,0 +1,127 @@
+"""
+Snapshot Timeline
+A game's quarter and live snapshots as one time-ordered sequence: a UNION ALL
+of both tables normalised onto REPLAY_FIELDS, ordered in SQL and read through
+a server-side cursor (or from the game's Parquet archive). Insights, replay
+and health all read this instead of querying and merging each table.
+"""
+
+import asyncio
+import heapq
+import itertools
+import logging
+from collections import namedtuple
+from typing import AsyncIterator, Iterator, List, Tuple
+
+from sqlalchemy import String, case, cast, func, literal, select, union_all
+
+from .game_archive import archived_replay_rows
+from .models import LiveOddsSnapshot, QuarterSnapshot
+from .replay import REPLAY_FIELDS, live_replay_row, naive_utc, run_timestamps, window_filter
+
+logger = logging.getLogger(__name__)
+
+TIMELINE_BATCH = 500
+TIMELINE_COLUMNS = REPLAY_FIELDS + ("valid_until", "repeat_count", "source")
+# ORDER BY (timestamp, source): quarter rows win timestamp ties
+QUARTER_SOURCE, LIVE_SOURCE = 0, 1
+
+TimelineRow = namedtuple("TimelineRow", TIMELINE_COLUMNS)
+
+
+def timeline_query(game_id: int, start_ts=None, end_ts=None, after_ids=None):
+    """
+    Both snapshot tables as TIMELINE_COLUMNS rows, one per stored row (runs
+    unexpanded), in time order. after_ids ({model: id}) keeps only rows above
+    those ids: the ones written after the game was archived.
+    """
+    q, l = QuarterSnapshot, LiveOddsSnapshot
+    quarter = select(
+        q.timestamp, q.ml_home, q.ml_away, q.stage, q.score_home, q.score_away, q.score_diff, q.spread,
+        q.valid_until, q.repeat_count, literal(QUARTER_SOURCE).label("source"),
+    ).where(q.game_id == game_id)
+    live = select(
+        l.timestamp,
+        # live rows use 0 for a missing price
+        func.nullif(l.teamA_ml, 0).label("ml_home"),
+        func.nullif(l.teamB_ml, 0).label("ml_away"),
+        case((func.coalesce(l.quarter, 0) != 0, literal("Q").concat(cast(l.quarter, String))), else_=literal("live")).label("stage"),
+        l.teamA_score.label("score_home"),
+        l.teamB_score.label("score_away"),
+        (l.teamA_score - l.teamB_score).label("score_diff"),
+        l.spread_line.label("spread"),
+        l.valid_until, l.repeat_count, literal(LIVE_SOURCE).label("source"),
+    ).where(l.game_id == game_id)
+    if after_ids:
+        quarter, live = quarter.where(q.id > after_ids[q]), live.where(l.id > after_ids[l])
+    timeline = union_all(window_filter(quarter, q, start_ts, end_ts), window_filter(live, l, start_ts, end_ts))
+    return timeline.order_by(timeline.selected_columns.timestamp, timeline.selected_columns.source)
+
+
+def archived_timeline(quarter_rows, live_rows) -> Iterator[TimelineRow]:
+    """Archived replay_queries rows (see app/game_archive.py) as timeline rows, in timeline order."""
+    return heapq.merge(
+        (TimelineRow(*row, QUARTER_SOURCE) for row in quarter_rows),
+        (TimelineRow(*live_replay_row(row), LIVE_SOURCE) for row in live_rows),
+        key=lambda row: (row.timestamp, row.source),
+    )
+
+
+class RunExpander:
+    """
+    Turns timeline rows (ordered by run start) into one REPLAY_FIELDS tuple per
+    poll, in poll order, clipped to [start_ts, end_ts]. A run's later polls can
+    fall after rows that start inside it, so expanded polls wait in a heap
+    until no row still to come can precede them; the heap holds at most the
+    polls of the runs currently open.
+    """
+
+    def __init__(self, start_ts=None, end_ts=None):
+        self.start_ts, self.end_ts = naive_utc(start_ts), naive_utc(end_ts)
+        self._pending: List[Tuple] = []
+        self._seq = itertools.count()
+
+    def push(self, row) -> Iterator[Tuple]:
+        *reading, valid_until, repeat_count, source = row
+        while self._pending and self._pending[0][:2] <= (reading[0], source):
+            yield heapq.heappop(self._pending)[-1]
+        for ts in run_timestamps(reading[0], valid_until, repeat_count):
+            if (self.start_ts is None or ts >= self.start_ts) and (self.end_ts is None or ts <= self.end_ts):
+                heapq.heappush(self._pending, (ts, source, next(self._seq), (ts, *reading[1:])))
+
+    def drain(self) -> Iterator[Tuple]:
+        while self._pending:
+            yield heapq.heappop(self._pending)[-1]
+
+
+async def timeline_rows(session, game_id: int, start_ts=None, end_ts=None, batch: int = TIMELINE_BATCH) -> AsyncIterator:
+    """
+    Stored timeline rows (runs unexpanded) from a server-side cursor, or for
+    an archived game from its files merged with rows written since.
+    """
+    archived = await archived_replay_rows(game_id)
+    if archived is not None:
+        quarter_rows, live_rows, max_ids = archived
+        late = (await session.execute(timeline_query(game_id, start_ts, end_ts, after_ids=max_ids))).all()
+        rows = heapq.merge(archived_timeline(quarter_rows, live_rows), late, key=lambda row: (row.timestamp, row.source))
+        # the files are decoded as the merge reaches them, off the event loop
+        while chunk := await asyncio.to_thread(list, itertools.islice(rows, batch)):
+            for row in chunk:
+                yield row
+        return
+    result = await session.stream(timeline_query(game_id, start_ts, end_ts).execution_options(yield_per=batch))
+    async for row in result:
+        yield row
+
+
+async def stream_timeline(session, game_id: int, start_ts=None, end_ts=None, batch: int = TIMELINE_BATCH) -> AsyncIterator[Tuple]:
+    """
+    REPLAY_FIELDS tuples in time order, one per poll, optionally windowed.
+    Memory stays flat however long the game is.
+    """
+    expander = RunExpander(start_ts, end_ts)
+    async for row in timeline_rows(session, game_id, start_ts, end_ts, batch):
+        for out in expander.push(row):
+            yield out
+    for out in expander.drain():
+        yield out
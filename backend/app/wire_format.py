@@ -0,0 +1,118 @@
+"""
+Wire Formats
+Response encodings for snapshot series. JSON is rendered with orjson; series
+endpoints can also answer column-oriented (one array per field, epoch-ms
+timestamps) as JSON, MessagePack or Arrow IPC, chosen by ?format= or Accept.
+msgpack and pyarrow are in requirements.txt but only imported when asked
+for, so JSON-only processes don't load them; without them those formats get
+a 406. An unknown ?format= is a 400.
+"""
+
+import io
+from datetime import datetime, timezone
+from typing import Any, Dict, Optional, Sequence
+
+import orjson
+from fastapi import Request, Response
+
+FORMATS = ("json", "columnar", "msgpack", "arrow")
+
+MEDIA_TYPES = {
+    "json": "application/json",
+    "columnar": "application/json",
+    "msgpack": "application/msgpack",
+    "arrow": "application/vnd.apache.arrow.stream",
+}
+
+ACCEPT_FORMATS = {
+    "application/msgpack": "msgpack",
+    "application/x-msgpack": "msgpack",
+    "application/vnd.apache.arrow.stream": "arrow",
+}
+
+# Headers already stamped on FastAPI's injected response (ETag, cursors) that must survive
+_SKIP_HEADERS = {"content-length", "content-type"}
+
+
+class OrjsonResponse(Response):
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS)
+
+
+class UnknownFormat(ValueError):
+    """?format= named an encoding this server doesn't offer."""
+
+
+def negotiate(request: Request, fmt: Optional[str]) -> str:
+    if fmt:
+        if fmt not in FORMATS:
+            raise UnknownFormat(f"Unknown format {fmt!r}; expected one of {', '.join(FORMATS)}")
+        return fmt
+    for part in request.headers.get("accept", "").split(","):
+        media = part.split(";")[0].strip().lower()
+        if media in ACCEPT_FORMATS:
+            return ACCEPT_FORMATS[media]
+    return "json"
+
+
+def etag_version(version, fmt: str):
+    """Accept-negotiated formats share a URL, so the format must be part of the ETag."""
+    if version is None or fmt == "json":
+        return version
+    return f"{version}.{fmt}"
+
+
+def _epoch_ms(value):
+    if value is None:
+        return None
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return int(value.timestamp() * 1000)
+
+
+def to_columns(rows: Sequence[Sequence], fields: Sequence[str]) -> Dict[str, list]:
+    """Transpose row tuples into one list per field; datetimes become epoch ms."""
+    columns = {}
+    for i, field in enumerate(fields):
+        values = [row[i] for row in rows]
+        if any(isinstance(v, datetime) for v in values):
+            values = [_epoch_ms(v) for v in values]
+        columns[field] = values
+    return columns
+
+
+def _carry_headers(response: Response) -> Dict[str, str]:
+    return {k: v for k, v in response.headers.items() if k.lower() not in _SKIP_HEADERS}
+
+
+def json_response(payload: Any, response: Response) -> Response:
+    return OrjsonResponse(payload, headers=_carry_headers(response))
+
+
+def columns_response(columns: Dict[str, list], fmt: str, response: Response, meta: Optional[Dict] = None) -> Response:
+    meta = meta or {}
+    headers = {**_carry_headers(response), "Vary": "Accept"}
+
+    if fmt == "msgpack":
+        try:
+            import msgpack
+        except ImportError:
+            return OrjsonResponse({"error": "msgpack is not installed on this server"}, status_code=406)
+        body = msgpack.packb({**meta, "columns": columns}, use_bin_type=True)
+        return Response(body, media_type=MEDIA_TYPES["msgpack"], headers=headers)
+
+    if fmt == "arrow":
+        try:
+            import pyarrow as pa
+        except ImportError:
+            return OrjsonResponse({"error": "pyarrow is not installed on this server"}, status_code=406)
+        table = pa.table(columns)
+        table = table.replace_schema_metadata({k: str(v) for k, v in meta.items()})
+        sink = io.BytesIO()
+        with pa.ipc.new_stream(sink, table.schema) as writer:
+            writer.write_table(table)
+        return Response(sink.getvalue(), media_type=MEDIA_TYPES["arrow"], headers=headers)
+
+    return OrjsonResponse({**meta, "columns": columns}, headers=headers)
@@ -0,0 +1,58 @@
+#!/usr/bin/env python
+"""
+Archive finished games to Parquet, for cron.
+
+Exports every `final` game that still has snapshots in the database and
+isn't archived up to date yet to
+GAME_ARCHIVE_DIR/<game_id>/{quarter_snapshots,live_odds_snapshots}.parquet;
+replay, insights and snapshot pages then read those files (plus any rows
+written later) instead of the database. With --prune the archived rows are
+deleted from the database (rollups are kept).
+API processes must see the same GAME_ARCHIVE_DIR. Requires pyarrow.
+
+Usage:
+    python archive_games.py                      # export every final game
+    python archive_games.py --prune --limit 500  # export and delete, 500 games per run
+    python archive_games.py 12 13 14             # just these game ids
+"""
+import argparse
+import json
+import logging
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from app.env import load_env
+load_env()
+from app.db import SessionLocal
+from app.game_archive import GAME_ARCHIVE_DIR, archive_final_games
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("game_ids", nargs="*", type=int)
+    parser.add_argument("--prune", action="store_true", help="delete archived snapshots from the database")
+    parser.add_argument("--limit", type=int, help="archive at most this many games")
+    args = parser.parse_args()
+
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        sys.exit("pyarrow is required: pip install pyarrow")
+
+    db = SessionLocal()
+    try:
+        start = time.time()
+        archived = archive_final_games(db, prune=args.prune, limit=args.limit, game_ids=args.game_ids)
+        print(json.dumps({str(k): v for k, v in archived.items()}, indent=2))
+        print(f"Archived {len(archived)} games to {GAME_ARCHIVE_DIR} in {time.time() - start:.1f}s")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
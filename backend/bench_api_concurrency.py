@@ -0,0 +1,86 @@
+#!/usr/bin/env python
+"""
+Measure API throughput under concurrent dashboard-style load.
+
+Fires concurrent GETs at the read endpoints a dashboard polls and reports
+requests/sec and latency percentiles per endpoint.
+
+Usage:
+    python bench_api_concurrency.py --game-id 2 --concurrency 32 --requests 500
+"""
+import argparse
+import statistics
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+DEFAULT_ENDPOINTS = [
+    "/games",
+    "/games/{game_id}",
+    "/games/{game_id}/quarters",
+    "/games/{game_id}/insights",
+    "/games/{game_id}/replay",
+    "/games/{game_id}/live-snapshots",
+    "/pinnacle/games",
+]
+
+_local = threading.local()
+
+
+def _session():
+    if not hasattr(_local, "session"):
+        _local.session = requests.Session()
+    return _local.session
+
+
+def _hit(url):
+    start = time.perf_counter()
+    try:
+        ok = _session().get(url, timeout=60).status_code < 500
+    except requests.RequestException:
+        ok = False
+    return time.perf_counter() - start, ok
+
+
+def bench_endpoint(base_url, path, concurrency, total):
+    url = base_url + path
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        start = time.perf_counter()
+        results = list(pool.map(_hit, [url] * total))
+        elapsed = time.perf_counter() - start
+
+    latencies = sorted(r[0] for r in results)
+    errors = sum(1 for r in results if not r[1])
+    return {
+        "path": path,
+        "rps": total / elapsed,
+        "p50_ms": statistics.median(latencies) * 1000,
+        "p95_ms": latencies[int(len(latencies) * 0.95) - 1] * 1000,
+        "errors": errors,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--game-id", default="2")
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--endpoint", action="append", help="override endpoint list (repeatable)")
+    args = parser.parse_args()
+
+    endpoints = args.endpoint or DEFAULT_ENDPOINTS
+
+    print("=" * 70)
+    print(f"API CONCURRENCY BENCHMARK  {args.base_url}  concurrency={args.concurrency}")
+    print("=" * 70)
+    print(f"{'endpoint':40} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'err':>5}")
+    for path in endpoints:
+        r = bench_endpoint(args.base_url, path.format(game_id=args.game_id), args.concurrency, args.requests)
+        print(f"{r['path']:40} {r['rps']:8.1f} {r['p50_ms']:8.1f} {r['p95_ms']:8.1f} {r['errors']:5d}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+#!/usr/bin/env python
+"""
+Measure snapshot ingest throughput: ORM add_all vs app.bulk_ingest.
+
+Writes synthetic LiveOddsSnapshot and QuarterSnapshot batches into a scratch
+database and reports rows/sec per path and batch size. On Postgres (psycopg2)
+the bulk path is COPY FROM STDIN; elsewhere it is one executemany INSERT.
+
+Usage:
+    python bench_bulk_ingest.py                                   # scratch SQLite file
+    python bench_bulk_ingest.py --url postgresql://.../bench_scratch --sizes 1000 10000 100000
+The target database is wiped; never point it at real data.
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from sqlalchemy import create_engine, delete
+from sqlalchemy.orm import sessionmaker
+
+from app.bulk_ingest import LIVE_COLUMNS, QUARTER_COLUMNS, bulk_insert_snapshots
+from app.models import Base, Game, LiveOddsSnapshot, QuarterSnapshot
+
+GAME_IDS = list(range(1, 31))
+
+
+def make_rows(model, n: int):
+    rng = random.Random(n)
+    start = datetime(2026, 10, 20, 19)
+    rows = []
+    for i in range(n):
+        ts = start + timedelta(seconds=15 * i)
+        ml = round(1.2 + rng.random() * 3, 2)
+        if model is LiveOddsSnapshot:
+            # LIVE_COLUMNS order
+            rows.append((GAME_IDS[i % len(GAME_IDS)], ts, 1 + i % 4, "10:00", i % 120, i % 117, ml, 2.0, -3.5, 221.5))
+        else:
+            # QUARTER_COLUMNS order
+            rows.append((GAME_IDS[i % len(GAME_IDS)], f"Q{1 + i % 4}", i % 120, i % 117, 3, ml, 2.0, -3.5, ts))
+    return rows
+
+
+def orm_insert(session, model, rows):
+    columns = LIVE_COLUMNS if model is LiveOddsSnapshot else QUARTER_COLUMNS
+    session.add_all([model(**dict(zip(columns, row))) for row in rows])
+
+
+def bench(Session, model, path, rows):
+    with Session() as session:
+        session.execute(delete(model))
+        session.commit()
+        start = time.perf_counter()
+        if path == "orm":
+            orm_insert(session, model, rows)
+        else:
+            bulk_insert_snapshots(session, model, rows)
+        session.commit()
+        return len(rows) / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--url", default=os.getenv("BENCH_DATABASE_URL"),
+                        help="scratch database (wiped); defaults to a temp SQLite file")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000])
+    args = parser.parse_args()
+
+    url = args.url or f"sqlite:///{Path(tempfile.gettempdir()) / 'nba_odds_bench_ingest.db'}"
+    engine = create_engine(url)
+    Base.metadata.drop_all(engine)
+    Base.metadata.create_all(engine)
+    Session = sessionmaker(bind=engine)
+    with Session() as session:
+        session.add_all([Game(id=gid, home_team=f"H{gid}", away_team=f"A{gid}", oddsportal_url=f"https://example.test/{gid}")
+                         for gid in GAME_IDS])
+        session.commit()
+
+    bulk_label = "copy" if engine.dialect.name == "postgresql" and engine.dialect.driver == "psycopg2" else "executemany"
+    print("=" * 70)
+    print(f"BULK INGEST BENCHMARK  {engine.url.render_as_string(hide_password=True)}")
+    print("=" * 70)
+    print(f"{'table':22} {'rows':>8} {'orm rows/s':>12} {bulk_label + ' rows/s':>18} {'speedup':>8}")
+    for model in (LiveOddsSnapshot, QuarterSnapshot):
+        for size in args.sizes:
+            rows = make_rows(model, size)
+            orm = bench(Session, model, "orm", rows)
+            bulk = bench(Session, model, "bulk", rows)
+            print(f"{model.__tablename__:22} {size:8d} {orm:12,.0f} {bulk:18,.0f} {bulk / orm:7.1f}x")
+
+    engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,167 @@
+#!/usr/bin/env python
+"""
+End-to-end pipeline benchmark on the embedded (SQLite/WAL) profile.
+
+Builds a scratch database the way the API does on first start (init_db),
+ingests a slate of games through record_snapshots (the pollers' change-only
+path, rollups included) committing every --commit-every poll cycles, then
+reads insights, replay, series, summary and the live list back through the
+API in-process. Needs no database server, so it can run in CI; exits
+non-zero if any request fails or p95 latency is over --max-p95-ms.
+
+Usage:
+    python bench_pipeline.py                              # 30 games x 720 polls (3h at 15s)
+    python bench_pipeline.py --games 10 --polls 240 --commit-every 10 --max-p95-ms 500
+The scratch file is wiped; pass --db to keep it somewhere else.
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+ENDPOINTS = [
+    "/games/{game_id}/insights",
+    "/games/{game_id}/replay",
+    "/games/{game_id}/series",
+    "/games/{game_id}/series?format=msgpack",
+    "/games/{game_id}/quarters?format=arrow",
+    "/games/{game_id}/summary",
+    "/pinnacle/games",
+]
+
+
+def configure(db_path: Path):
+    """Point app.db at a fresh embedded database; must run before app is imported."""
+    for suffix in ("", "-wal", "-shm"):
+        Path(f"{db_path}{suffix}").unlink(missing_ok=True)
+    os.environ.pop("DATABASE_URL", None)
+    os.environ.pop("ASYNC_DATABASE_URL", None)
+    os.environ["DB_PROFILE"] = "embedded"
+    os.environ["EMBEDDED_DB_PATH"] = str(db_path)
+    os.environ.setdefault("SCRAPE_WORKERS", "0")
+
+
+def poll_cycle(game_ids, poll: int, start: datetime, state: dict):
+    """One poll of every game: a quarter and a live snapshot each, odds moving every few polls."""
+    from app.models import LiveOddsSnapshot, QuarterSnapshot
+
+    ts = start + timedelta(seconds=15 * poll)
+    quarter = 1 + min(3, poll * 4 // state["polls"])
+    snapshots = []
+    for game_id in game_ids:
+        rng, game = state["rng"], state["games"].setdefault(game_id, {"home": 0, "away": 0, "ml": 1.9})
+        # most polls repeat the previous reading, as in a real game
+        if rng.random() < 0.3:
+            game["home"] += rng.choice((0, 2, 3))
+            game["away"] += rng.choice((0, 2, 3))
+            game["ml"] = round(min(15.0, max(1.01, game["ml"] + rng.uniform(-0.15, 0.15))), 2)
+        away_ml = round(1 / max(0.01, 1 - 1 / game["ml"]), 2)
+        snapshots.append(QuarterSnapshot(
+            game_id=game_id, stage=f"Q{quarter}", score_home=game["home"], score_away=game["away"],
+            score_diff=game["home"] - game["away"], ml_home=game["ml"], ml_away=away_ml, spread=-3.5, timestamp=ts,
+        ))
+        snapshots.append(LiveOddsSnapshot(
+            game_id=game_id, timestamp=ts, quarter=quarter, game_clock="10:00", teamA_score=game["home"],
+            teamB_score=game["away"], teamA_ml=game["ml"], teamB_ml=away_ml, spread_line=-3.5, total_line=221.5,
+        ))
+    return snapshots
+
+
+def ingest(args, game_ids) -> dict:
+    from app.db import SessionLocal
+    from app.snapshot_runs import record_snapshots
+
+    start = datetime.utcnow() - timedelta(seconds=15 * args.polls)
+    state = {"rng": random.Random(args.games * args.polls), "games": {}, "polls": args.polls}
+    polled = added = commits = 0
+    began = time.perf_counter()
+    with SessionLocal() as db:
+        for poll in range(args.polls):
+            snapshots = poll_cycle(game_ids, poll, start, state)
+            added += record_snapshots(db, snapshots)
+            polled += len(snapshots)
+            # change-only detection reads the latest stored rows, so flush each cycle; only commits sync the WAL
+            db.flush()
+            if (poll + 1) % args.commit_every == 0 or poll == args.polls - 1:
+                db.commit()
+                commits += 1
+    elapsed = time.perf_counter() - began
+    return {"polled": polled, "stored": added, "commits": commits, "seconds": elapsed}
+
+
+def read_back(client, game_ids, rounds: int) -> list:
+    results = []
+    for path in ENDPOINTS:
+        latencies, errors = [], 0
+        for i in range(rounds):
+            url = path.format(game_id=game_ids[i % len(game_ids)])
+            begin = time.perf_counter()
+            status = client.get(url).status_code
+            latencies.append(time.perf_counter() - begin)
+            errors += status != 200
+        latencies.sort()
+        results.append({
+            "path": path,
+            "p50_ms": statistics.median(latencies) * 1000,
+            "p95_ms": latencies[max(0, int(len(latencies) * 0.95) - 1)] * 1000,
+            "errors": errors,
+        })
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--db", type=Path, default=Path(tempfile.gettempdir()) / "nba_odds_bench_pipeline.db",
+                        help="scratch SQLite file (wiped)")
+    parser.add_argument("--games", type=int, default=30)
+    parser.add_argument("--polls", type=int, default=720, help="poll cycles per game (15s apart)")
+    parser.add_argument("--commit-every", type=int, default=20, help="poll cycles per commit")
+    parser.add_argument("--rounds", type=int, default=100, help="requests per endpoint")
+    parser.add_argument("--max-p95-ms", type=float, default=None, help="fail if any endpoint's p95 is above this")
+    args = parser.parse_args()
+
+    configure(args.db)
+    from fastapi.testclient import TestClient
+    from app.db import SessionLocal, SQLITE_PRAGMAS, init_db
+    from app.main import app
+    from app.models import Game
+
+    init_db()
+    game_ids = list(range(1, args.games + 1))
+    with SessionLocal() as db:
+        db.add_all([Game(id=gid, home_team=f"H{gid}", away_team=f"A{gid}", status="live",
+                         oddsportal_url=f"https://example.test/{gid}") for gid in game_ids])
+        db.commit()
+
+    print("=" * 70)
+    print(f"PIPELINE BENCHMARK  {args.db}  ({', '.join(f'{k}={v}' for k, v in SQLITE_PRAGMAS.items())})")
+    print("=" * 70)
+    stats = ingest(args, game_ids)
+    print(f"ingest: {stats['polled']:,} polled snapshots -> {stats['stored']:,} rows in {stats['commits']} commits, "
+          f"{stats['seconds']:.1f}s ({stats['polled'] / stats['seconds']:,.0f} polls/s)")
+
+    # entering the client runs the API's startup: hot state rebuild, stream hub
+    with TestClient(app) as client:
+        results = read_back(client, game_ids, args.rounds)
+    print(f"{'endpoint':40} {'p50 ms':>9} {'p95 ms':>9} {'errors':>7}")
+    for r in results:
+        print(f"{r['path']:40} {r['p50_ms']:9.1f} {r['p95_ms']:9.1f} {r['errors']:7d}")
+
+    failed = [r["path"] for r in results if r["errors"]]
+    if args.max_p95_ms is not None:
+        failed += [r["path"] for r in results if r["p95_ms"] > args.max_p95_ms]
+    if failed:
+        print(f"FAILED: {', '.join(sorted(set(failed)))}")
+        sys.exit(1)
+    print("PASSED")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,44 @@
+#!/usr/bin/env python
+"""
+Scrape Job Worker
+Runs a pool of scrape workers outside the API process.
+Start the API with SCRAPE_WORKERS=0 when scrape work runs here instead.
+
+Usage:
+    python job_worker.py --workers 4
+"""
+
+import argparse
+import logging
+import time
+from app.env import load_env
+load_env()
+from app.jobs import start_workers, stop_workers, WORKER_COUNT
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s',
+    force=True
+)
+
+logger = logging.getLogger(__name__)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--workers', type=int, default=max(WORKER_COUNT, 1))
+    args = parser.parse_args()
+
+    logger.info(f"Starting {args.workers} scrape workers")
+    start_workers(args.workers)
+    try:
+        while True:
+            time.sleep(60)
+    except KeyboardInterrupt:
+        logger.info("Stopping scrape workers")
+    finally:
+        stop_workers()
+
+
+if __name__ == "__main__":
+    main()
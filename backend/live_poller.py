@@ -6,14 +6,13 @@ Runs in a loop, capturing odds and score every 30-60 seconds
 import time
 import sys
 from datetime import datetime
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
 
 # Add backend to path
 sys.path.insert(0, '/nba-odds-momentum/backend')
 
-from app.db import Base, get_db, DATABASE_URL
+from app.db import SessionLocal
 from app.models import Game, QuarterSnapshot
+from app.snapshot_runs import record_snapshots
 from app.scraper import scrape_live_game
 import logging
 
@@ -28,9 +27,8 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-# Database setup
-engine = create_engine(DATABASE_URL)
-Session = sessionmaker(bind=engine)
+# Database setup: share app.db's configured engine and pool
+Session = SessionLocal
 
 def poll_live_game(game_url: str, game_id: int, poll_interval: int = 30, max_polls: int = None):
     """
@@ -88,11 +86,11 @@ def poll_live_game(game_url: str, game_id: int, poll_interval: int = 30, max_pol
                         away_team=result.get('away_team', 'Unknown')
                     )
                     db.add(game)
-                    db.commit()
                 else:
                     game.home_team = result.get('home_team', game.home_team)
                     game.away_team = result.get('away_team', game.away_team)
-                    db.commit()
+                # one commit per poll: the game row goes in with the snapshot
+                db.flush()
                 
                 # Create snapshot
                 snapshot = QuarterSnapshot(
@@ -107,7 +105,7 @@ def poll_live_game(game_url: str, game_id: int, poll_interval: int = 30, max_pol
                     timestamp=datetime.utcnow()
                 )
                 
-                db.add(snapshot)
+                record_snapshots(db, [snapshot])
                 db.commit()
                 db.close()
                 
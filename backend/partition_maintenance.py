@@ -0,0 +1,27 @@
+#!/usr/bin/env python
+"""
+Snapshot partition maintenance, for cron when the scheduler isn't running.
+
+Creates the current and upcoming monthly partitions of quarter_snapshots and
+live_odds_snapshots, then detaches months older than SNAPSHOT_RETENTION_MONTHS
+(archived to SNAPSHOT_ARCHIVE_DIR as gzipped CSV, else to the archive schema).
+
+Usage:
+    python partition_maintenance.py
+    SNAPSHOT_RETENTION_MONTHS=18 SNAPSHOT_ARCHIVE_DIR=/var/archive python partition_maintenance.py
+"""
+import json
+import logging
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from app.env import load_env
+load_env()
+from app.partitions import run_maintenance
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+if __name__ == "__main__":
+    print(json.dumps(run_maintenance(), indent=2))
@@ -15,6 +15,7 @@ from app.pinnacle import fetch_odds_by_sport
 from app.live_scores import fetch_live_scores_by_date
 from app.db import SessionLocal
 from app.models import LiveOddsSnapshot
+from app.bulk_ingest import bulk_insert_snapshots
 
 
 def _match_event(p_ev, live_events):
@@ -61,22 +62,22 @@ def store_once():
                 quarter = matched.get('quarter')
                 clock = matched.get('clock')
 
-            snap = LiveOddsSnapshot(
-                game_id=str(r.get('event_id') or f"{r.get('home')} vs {r.get('away')}"),
-                timestamp=r.get('timestamp'),
-                quarter=quarter,
-                game_clock=clock,
-                teamA_score=teamA_score,
-                teamB_score=teamB_score,
-                teamA_ml=r.get('ml_home'),
-                teamB_ml=r.get('ml_away'),
-                spread_line=r.get('spread'),
-                total_line=r.get('total')
-            )
-            rows.append(snap)
+            # LIVE_COLUMNS order
+            rows.append((
+                str(r.get('event_id') or f"{r.get('home')} vs {r.get('away')}"),
+                r.get('timestamp'),
+                quarter,
+                clock,
+                teamA_score,
+                teamB_score,
+                r.get('ml_home'),
+                r.get('ml_away'),
+                r.get('spread'),
+                r.get('total'),
+            ))
 
         if rows:
-            db.add_all(rows)
+            bulk_insert_snapshots(db, LiveOddsSnapshot, rows)
             db.commit()
         return len(rows)
     finally:
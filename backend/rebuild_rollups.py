@@ -0,0 +1,47 @@
+#!/usr/bin/env python
+"""
+Rebuild odds_rollups from raw snapshots: backfills games recorded before the
+rollup table existed, or repairs games whose snapshots were edited by hand.
+
+Usage:
+    python rebuild_rollups.py               # every game with snapshots
+    python rebuild_rollups.py 12 13 14      # just these game ids
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from app.env import load_env
+load_env()
+from sqlalchemy import select, union
+from app.db import SessionLocal
+from app.models import LiveOddsSnapshot, QuarterSnapshot
+from app.rollups import rebuild_rollups
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("game_ids", nargs="*", type=int)
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        game_ids = args.game_ids or db.execute(
+            union(select(QuarterSnapshot.game_id), select(LiveOddsSnapshot.game_id))
+        ).scalars().all()
+        start = time.time()
+        for game_id in game_ids:
+            # one transaction per game keeps locks short on a live database
+            samples = rebuild_rollups(db, [game_id])
+            db.commit()
+            print(f"game {game_id}: {samples} polls rolled up")
+        print(f"Rebuilt {len(game_ids)} games in {time.time() - start:.1f}s")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
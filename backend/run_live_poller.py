@@ -60,8 +60,10 @@ def poll_live_game():
             
             try:
                 # Call the live scrape endpoint
+                # Scrapes run on the job queue; wait for this poll's result
                 response = requests.post(
                     f"{BACKEND_URL}/games/{GAME_ID}/scrape-live",
+                    params={"wait": 25},
                     timeout=30
                 )
                 
@@ -9,14 +9,20 @@ import time
 import logging
 from datetime import datetime, timedelta, timezone
 from pathlib import Path
-from dotenv import load_dotenv
-load_dotenv()
+from types import SimpleNamespace
+from app.env import load_env
+load_env()
 from app.db import SessionLocal
-from app.scraper import scrape_oddsportal_quarter
-from app.models import Game, QuarterSnapshot
+from app.models import Game
 from app.insights import detect_momentum_events
 from app.alerts import process_alerts
 from app.sync_games import sync_games_from_oddsportal
+from app.game_sync import upsert_games
+from app.scrape_costs import set_cycle
+from app.partitions import run_maintenance
+from app.scrape_tasks import run_task
+from app.hot_state import hot_state, recent_points
+from app.snapshot_events import add_local_listener
 
 # Setup logging
 log_dir = Path(__file__).parent
@@ -38,6 +44,7 @@ logger = logging.getLogger(__name__)
 POLL_INTERVAL = 60  # seconds
 CLOSE_TO_START_MINUTES = 15  # start polling 15 mins before game
 FINAL_TIMEOUT_MINUTES = 20  # mark final if no score change for 20 mins
+PARTITION_MAINTENANCE_HOURS = 6  # premake snapshot partitions / apply retention
 
 def get_games_to_poll():
     """Get all games that need polling"""
@@ -53,20 +60,7 @@ def get_games_to_poll():
 def sync_games_db():
     db = SessionLocal()
     try:
-        games = sync_games_from_oddsportal()
-        for g in games:
-            existing = db.query(Game).filter(Game.oddsportal_url == g["url"]).first()
-            if existing:
-                existing.home_team = g["home_team"]
-                existing.away_team = g["away_team"]
-                existing.status = g["status"]
-            else:
-                db.add(Game(
-                    home_team=g["home_team"],
-                    away_team=g["away_team"],
-                    oddsportal_url=g["url"],
-                    status=g["status"]
-                ))
+        upsert_games(db, sync_games_from_oddsportal())
         db.commit()
     finally:
         db.close()
@@ -117,30 +111,18 @@ def poll_game(game: Game):
     try:
         logger.info(f"Polling game {game.id} ({game.home_team} vs {game.away_team}) - Status: {game.status}")
 
-        # Scrape live odds
-        snapshots = scrape_oddsportal_quarter(game.id)
+        # Scrape and save live odds (repeats of the latest reading extend it instead);
+        # a scrape of this game already in flight from the API is shared, not repeated
+        result = run_task(db, "quarter", game.id)
+        snapshots = [SimpleNamespace(**reading) for reading in result.get("snapshots", [])]
 
         if snapshots:
-            # Save snapshots
-            db.add_all(snapshots)
-            db.commit()
-
-            # Detect momentum events using recent history
-            recent = db.query(QuarterSnapshot)\
-                .filter(QuarterSnapshot.game_id == game.id)\
-                .order_by(QuarterSnapshot.timestamp.desc())\
-                .limit(10).all()
-            
-            # Convert to dicts for processing
-            all_snaps = []
-            for snap in recent[::-1]:  # Reverse to chronological order
-                all_snaps.append({
-                    'timestamp': snap.timestamp.isoformat(),
-                    'ml_home': snap.ml_home,
-                    'ml_away': snap.ml_away,
-                    'stage': snap.stage
-                })
-            
+
+            # Detect momentum events using recent history (kept in memory, fed by the commit above);
+            # data_version catches snapshots other processes wrote or deleted since it was loaded
+            version = db.query(Game.data_version).filter(Game.id == game.id).scalar()
+            all_snaps = recent_points(db, hot_state, game.id, version)
+
             events = detect_momentum_events(all_snaps)
             if events:
                 process_alerts(events, game.id, db)
@@ -172,14 +154,26 @@ def main():
     logger.info(f"Final timeout: {FINAL_TIMEOUT_MINUTES} minutes")
     logger.info("="*60)
 
+    # Keep the in-memory momentum history current with this process's commits
+    add_local_listener(hot_state.apply_events)
+
     cycle_count = 0
+    last_maintenance = None
 
     while True:
         cycle_count += 1
         cycle_start = datetime.now()
+        set_cycle(int(cycle_start.timestamp()))
 
         logger.info(f"\n[Cycle #{cycle_count}] {cycle_start.strftime('%Y-%m-%d %H:%M:%S')}")
 
+        if last_maintenance is None or cycle_start - last_maintenance >= timedelta(hours=PARTITION_MAINTENANCE_HOURS):
+            try:
+                logger.info(f"Partition maintenance: {run_maintenance()}")
+            except Exception as e:
+                logger.error(f"Partition maintenance failed: {str(e)}")
+            last_maintenance = cycle_start
+
         sync_games_db()
 
         games = get_games_to_poll()
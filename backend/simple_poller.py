@@ -10,6 +10,7 @@ from dotenv import load_dotenv
 load_dotenv()
 from app.db import SessionLocal
 from app.scraper import scrape_oddsportal_quarter
+from app.snapshot_runs import record_snapshots
 
 # Setup logging
 log_dir = Path(__file__).parent
@@ -60,7 +61,7 @@ try:
             try:
                 snapshots = scrape_oddsportal_quarter(GAME_ID)
                 if snapshots:
-                    db.add_all(snapshots)
+                    record_snapshots(db, snapshots)
                     db.commit()
                     success_count += 1
                     logger.info(f"  SUCCESS - Saved {len(snapshots)} snapshots")
@@ -0,0 +1,124 @@
+#!/usr/bin/env python
+"""
+Game archive regression checks on a scratch embedded (SQLite) database:
+archived games read back through the API (streamed a record batch at a
+time) like the database, repeated archive runs only re-export games with
+new rows, and deleting a game's snapshots (/clear, load-demo) drops the
+archived copies too.
+
+Usage:
+    python test_game_archive.py
+Exits non-zero on failure so it can gate CI.
+"""
+import os
+import sys
+import tempfile
+from datetime import datetime, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+SCRATCH = Path(tempfile.mkdtemp(prefix="nba_odds_archive_"))
+os.environ.pop("DATABASE_URL", None)
+os.environ.pop("ASYNC_DATABASE_URL", None)
+os.environ["DB_PROFILE"] = "embedded"
+os.environ["EMBEDDED_DB_PATH"] = str(SCRATCH / "archive.db")
+os.environ["GAME_ARCHIVE_DIR"] = str(SCRATCH / "archive")
+os.environ.setdefault("SCRAPE_WORKERS", "0")
+
+from fastapi.testclient import TestClient
+
+from app import game_archive
+from app.db import SessionLocal, init_db
+from app.game_archive import archive_final_games, archive_path, is_archived
+from app.main import app
+from app.models import Game, LiveOddsSnapshot, QuarterSnapshot
+
+POLLS = 20
+START = datetime(2026, 10, 1, 19)
+
+
+def load_game(db, game_id: int):
+    db.add(Game(id=game_id, home_team=f"H{game_id}", away_team=f"A{game_id}", status="final",
+                oddsportal_url=f"https://example.test/{game_id}"))
+    for i in range(POLLS):
+        ts = START + timedelta(seconds=15 * i)
+        db.add(QuarterSnapshot(game_id=game_id, stage=f"Q{1 + i * 4 // POLLS}", score_home=i, score_away=0,
+                               score_diff=i, ml_home=1.5 + i / 100, ml_away=2.5, spread=-3.5, timestamp=ts))
+        db.add(LiveOddsSnapshot(game_id=game_id, timestamp=ts, quarter=1 + i * 4 // POLLS, teamA_score=i,
+                                teamB_score=0, teamA_ml=1.5 + i / 100, teamB_ml=2.5))
+    db.commit()
+
+
+def archived_game(client, game_id: int):
+    with SessionLocal() as db:
+        load_game(db, game_id)
+        archive_final_games(db, prune=True, game_ids=[game_id])
+    assert is_archived(game_id), "game was not archived"
+    assert len(client.get(f"/games/{game_id}/quarters").json()) == POLLS, "archived quarters not served"
+
+
+def check_replay_matches_database(client):
+    with SessionLocal() as db:
+        load_game(db, 3)
+    before = client.get("/games/3/replay").json()
+    # several record batches per file
+    game_archive.ARCHIVE_BATCH = 3
+    with SessionLocal() as db:
+        archive_final_games(db, prune=True, game_ids=[3])
+    assert is_archived(3), "game was not archived"
+    after = client.get("/games/3/replay").json()
+    assert after == before, "archived replay differs from the database's"
+
+
+def check_cron_skips_current_archives(client):
+    with SessionLocal() as db:
+        load_game(db, 4)
+        assert 4 in archive_final_games(db), "game was not archived"
+        written = archive_path(4, QuarterSnapshot).stat().st_mtime_ns
+        assert 4 not in archive_final_games(db), "unchanged game archived again"
+        db.add(QuarterSnapshot(game_id=4, stage="final", score_home=99, score_away=0, score_diff=99,
+                               ml_home=1.01, ml_away=20.0, spread=-3.5, timestamp=START + timedelta(hours=3)))
+        db.commit()
+        assert 4 in archive_final_games(db), "game with a late row not re-archived"
+    assert archive_path(4, QuarterSnapshot).stat().st_mtime_ns != written, "archive not rewritten"
+    assert len(client.get("/games/4/quarters").json()) == POLLS + 1, "late row missing"
+
+
+def check_clear(client):
+    archived_game(client, 1)
+    client.delete("/games/1/clear").raise_for_status()
+    assert not is_archived(1), "archive left behind by /clear"
+    assert client.get("/games/1/quarters").json() == [], "cleared quarters still served"
+    assert client.get("/games/1/live-snapshots").json() == [], "cleared live snapshots still served"
+
+
+def check_load_demo(client):
+    archived_game(client, 2)
+    client.post("/games/2/quarters/load-demo").raise_for_status()
+    stages = [row["stage"] for row in client.get("/games/2/quarters").json()]
+    assert stages == ["pregame", "Q1", "Q2", "Q3", "final"], f"archived quarters merged into the demo: {stages}"
+    # load-demo only replaces quarter snapshots; the archived live ones are still there
+    assert len(client.get("/games/2/live-snapshots").json()) == POLLS, "archived live snapshots lost"
+
+
+CHECKS = [check_replay_matches_database, check_cron_skips_current_archives, check_clear, check_load_demo]
+
+init_db()
+failures = []
+print("\n" + "=" * 60)
+print(f"GAME ARCHIVE  {SCRATCH}")
+print("=" * 60 + "\n")
+with TestClient(app) as client:
+    for check in CHECKS:
+        try:
+            check(client)
+            print(f"  ok    {check.__name__}")
+        except AssertionError as e:
+            failures.append(check.__name__)
+            print(f"  FAIL  {check.__name__}: {e}")
+
+if failures:
+    print(f"\nFAILED: {', '.join(failures)}")
+    sys.exit(1)
+print("\nPASSED")
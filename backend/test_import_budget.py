@@ -0,0 +1,66 @@
+#!/usr/bin/env python
+"""
+Guard API worker cold-start: import app.main in a fresh interpreter and check
+that the scraper stack stays unloaded and import time stays under budget.
+
+Usage:
+    python test_import_budget.py                 # default 1500 ms budget
+    IMPORT_BUDGET_MS=800 python test_import_budget.py
+Exits non-zero on failure so it can gate CI.
+"""
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+BUDGET_MS = float(os.getenv("IMPORT_BUDGET_MS", "1500"))
+RUNS = 3
+
+# Must never load just to serve reads
+HEAVY_MODULES = ["playwright", "bs4", "requests", "app.scraper", "app.sync_games", "app.pinnacle"]
+
+PROBE = (
+    "import sys, time\n"
+    "t = time.perf_counter()\n"
+    "import app.main\n"
+    "ms = (time.perf_counter() - t) * 1000\n"
+    f"loaded = [m for m in {HEAVY_MODULES!r} if m in sys.modules]\n"
+    "print(f'{ms:.1f}|{\",\".join(loaded)}')\n"
+)
+
+
+def probe(read_only: bool):
+    env = {**os.environ, "PYTHONPATH": str(Path(__file__).parent), "READ_ONLY_API": "1" if read_only else "0"}
+    out = subprocess.run(
+        [sys.executable, "-c", PROBE], env=env, cwd=Path(__file__).parent,
+        capture_output=True, text=True, check=True,
+    ).stdout.strip().splitlines()[-1]
+    ms, loaded = out.split("|")
+    return float(ms), [m for m in loaded.split(",") if m]
+
+
+failures = []
+print("\n" + "=" * 60)
+print("API IMPORT BUDGET")
+print("=" * 60 + "\n")
+
+for read_only in (True, False):
+    label = "read-only" if read_only else "full"
+    # best of N: we are guarding against regressions, not measuring noise
+    results = [probe(read_only) for _ in range(RUNS)]
+    best_ms = min(ms for ms, _ in results)
+    loaded = results[0][1]
+    print(f"{label:10s} import app.main: {best_ms:7.1f} ms (budget {BUDGET_MS:.0f} ms)")
+    if loaded:
+        print(f"           heavy modules loaded: {', '.join(loaded)}")
+        failures.append(f"{label}: loaded {loaded}")
+    if best_ms > BUDGET_MS:
+        failures.append(f"{label}: {best_ms:.0f} ms over budget")
+
+print()
+if failures:
+    print("FAILED:")
+    for f in failures:
+        print(f"  - {f}")
+    sys.exit(1)
+print("PASSED")
@@ -0,0 +1,170 @@
+#!/usr/bin/env python
+"""
+Query-plan regression suite for the hot snapshot queries.
+
+Loads a synthetic multi-season dataset into a scratch database and asserts via
+EXPLAIN that the queries the API and scheduler run on every poll are served by
+indexes rather than sequential scans or ad-hoc sorts.
+
+Usage:
+    python test_query_plans.py                                    # scratch SQLite file
+    python test_query_plans.py --url postgresql://.../plans_scratch --seasons 3
+The target database is wiped and reloaded; never point it at real data.
+Exits non-zero on failure so it can gate CI.
+"""
+import argparse
+import json
+import os
+import random
+import re
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from sqlalchemy import create_engine, func, insert, select, text
+
+from app.models import Base, Game, QuarterSnapshot, LiveOddsSnapshot, Alert
+from app.replay import snapshot_page_query
+from app.timeline import timeline_query
+from app.snapshot_runs import latest_runs_query
+from app.rollups import apply_samples, series_query, snapshot_samples
+from app.hot_state import active_games_query, latest_live_query, recent_quarter_query
+
+GAMES_PER_SEASON = 1230
+HOT_TABLES = {"games", "quarter_snapshots", "live_odds_snapshots", "alerts", "odds_rollups"}
+
+
+def load_dataset(engine, seasons: int, per_game: int):
+    rng = random.Random(42)
+    season_start = datetime(2026 - seasons, 10, 20)
+    game_rows, quarter_rows, live_rows, alert_rows = [], [], [], []
+    game_id = 0
+    for season in range(seasons):
+        for n in range(GAMES_PER_SEASON):
+            game_id += 1
+            start = season_start + timedelta(days=365 * season + n // 8, hours=19)
+            # only the newest handful of games are still active
+            status = "final" if season < seasons - 1 or n < GAMES_PER_SEASON - 12 else rng.choice(["scheduled", "live"])
+            game_rows.append({"id": game_id, "home_team": f"H{n % 30}", "away_team": f"A{(n + 7) % 30}",
+                              "oddsportal_url": f"https://example.test/{season}/{n}", "status": status, "start_time": start})
+            for i in range(per_game):
+                ts = start + timedelta(seconds=15 * i)
+                ml = round(1.2 + rng.random() * 3, 2)
+                quarter_rows.append({"game_id": game_id, "stage": f"Q{1 + i * 4 // per_game}", "ml_home": ml,
+                                     "ml_away": round(1 / (1 - 1 / ml), 2) if ml > 1.01 else 50.0, "timestamp": ts})
+                live_rows.append({"game_id": game_id, "quarter": 1 + i * 4 // per_game, "teamA_ml": ml,
+                                  "teamB_ml": 2.0, "teamA_score": i, "teamB_score": i + 1, "timestamp": ts})
+            alert_rows.append({"game_id": game_id, "type": "reversal", "message": "synthetic", "timestamp": start})
+
+    with engine.begin() as conn:
+        for table, rows in ((Game.__table__, game_rows), (QuarterSnapshot.__table__, quarter_rows),
+                            (LiveOddsSnapshot.__table__, live_rows), (Alert.__table__, alert_rows)):
+            for i in range(0, len(rows), 5000):
+                conn.execute(insert(table), rows[i:i + 5000])
+        apply_samples(conn, [sample for model, rows in ((QuarterSnapshot, quarter_rows), (LiveOddsSnapshot, live_rows))
+                             for row in rows for sample in snapshot_samples(model, row)])
+    with engine.begin() as conn:
+        conn.exec_driver_sql("ANALYZE")
+    return game_id, len(quarter_rows)
+
+
+def hot_queries(game_id: int, mid_ts: datetime):
+    """The statements app/main.py, app/timeline.py, app/alerts.py, app/snapshot_runs.py, app/rollups.py, app/hot_state.py and scheduler.py issue per poll."""
+    return {
+        "quarters (id order)": snapshot_page_query(QuarterSnapshot, game_id),
+        "quarters since_id": snapshot_page_query(QuarterSnapshot, game_id, since_id=1000),
+        "live-snapshots since_id + changed_since": snapshot_page_query(LiveOddsSnapshot, game_id, since_id=1000, changed_since=mid_ts),
+        "live-snapshots (time order)": snapshot_page_query(LiveOddsSnapshot, game_id, by_timestamp=True),
+        "live-snapshots after_ts page": snapshot_page_query(LiveOddsSnapshot, game_id, since_id=1000, after_ts=mid_ts, limit=500),
+        "timeline (insights, replay, health)": timeline_query(game_id),
+        "timeline window (replay stream)": timeline_query(game_id, start_ts=mid_ts),
+        "hot state game load (summary miss, scheduler momentum)": recent_quarter_query(game_id),
+        "hot state active games": active_games_query(),
+        "hot state live reload": latest_live_query(),
+        "scheduler games to poll": select(Game).where(Game.status.in_(["scheduled", "live"])),
+        "game sync known urls": select(Game.oddsportal_url, Game.id).where(Game.oddsportal_url.in_([f"https://example.test/{game_id}"])),
+        "alerts cooldown": select(Alert).where(Alert.game_id == game_id).order_by(Alert.timestamp.desc()).limit(1),
+        "change-only latest quarter run": latest_runs_query(QuarterSnapshot, [game_id]),
+        "change-only latest live runs": latest_runs_query(LiveOddsSnapshot, [game_id, game_id + 1, game_id + 2]),
+        "series 1m": series_query(game_id, "1m"),
+        "series since": series_query(game_id, "1m", since=mid_ts),
+    }
+
+
+def _pg_nodes(plan):
+    yield plan
+    for child in plan.get("Plans", []):
+        yield from _pg_nodes(child)
+
+
+def check_plan(conn, stmt):
+    """Return (plan summary lines, problems)."""
+    sql = str(stmt.compile(dialect=conn.dialect, compile_kwargs={"literal_binds": True}))
+    if conn.dialect.name == "postgresql":
+        plan = conn.exec_driver_sql("EXPLAIN (FORMAT JSON) " + sql).scalar()
+        plan = plan if isinstance(plan, list) else json.loads(plan)
+        nodes = list(_pg_nodes(plan[0]["Plan"]))
+        lines = [f"{n['Node Type']} {n.get('Relation Name', '')} {n.get('Index Name', '')}".strip() for n in nodes]
+        problems = [l for n, l in zip(nodes, lines) if n["Node Type"] == "Seq Scan" and n.get("Relation Name") in HOT_TABLES]
+        return lines, problems
+
+    rows = conn.exec_driver_sql("EXPLAIN QUERY PLAN " + sql).all()
+    lines = [r[-1] for r in rows]
+    problems = []
+    for line in lines:
+        m = re.match(r"SCAN (\w+)", line)
+        if m and m.group(1) in HOT_TABLES and "INDEX" not in line:
+            problems.append(line)
+        if "USE TEMP B-TREE FOR ORDER BY" in line:
+            problems.append(line)
+    return lines, problems
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--url", default=os.getenv("QUERY_PLAN_DATABASE_URL"),
+                        help="scratch database (wiped); defaults to a temp SQLite file")
+    parser.add_argument("--seasons", type=int, default=2)
+    parser.add_argument("--snapshots-per-game", type=int, default=40)
+    args = parser.parse_args()
+
+    url = args.url or f"sqlite:///{Path(tempfile.gettempdir()) / 'nba_odds_query_plans.db'}"
+    engine = create_engine(url)
+
+    print("\n" + "=" * 60)
+    print("QUERY PLAN REGRESSION SUITE")
+    print("=" * 60 + "\n")
+    print(f"Database: {engine.url.render_as_string(hide_password=True)}")
+
+    Base.metadata.drop_all(engine)
+    Base.metadata.create_all(engine)
+    t = time.time()
+    games, per_table = load_dataset(engine, args.seasons, args.snapshots_per_game)
+    print(f"Loaded {games} games, {per_table} rows per snapshot table in {time.time() - t:.1f}s\n")
+
+    failures = 0
+    with engine.connect() as conn:
+        game_id = games // 2
+        mid_ts = conn.execute(select(func.min(LiveOddsSnapshot.timestamp)).where(LiveOddsSnapshot.game_id == game_id)).scalar()
+        for name, stmt in hot_queries(game_id, mid_ts + timedelta(minutes=2)).items():
+            lines, problems = check_plan(conn, stmt)
+            status = "FAIL" if problems else "ok"
+            print(f"[{status:4s}] {name}")
+            for line in lines:
+                print(f"         {line}")
+            failures += bool(problems)
+
+    engine.dispose()
+    print()
+    if failures:
+        print(f"FAILED: {failures} hot queries are not index-served")
+        sys.exit(1)
+    print("PASSED")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+#!/usr/bin/env python
+"""
+Check that odds_rollups kept up incrementally by the change-only write path
+(inserted rows, runs extended in place) match rebuild_rollups' recompute
+from the stored rows: same buckets, sample counts, first/last timestamps
+and OHLC.
+
+Usage:
+    python test_rollups.py                  # scratch embedded (SQLite) database
+    python test_rollups.py --games 5 --polls 600
+Exits non-zero on failure so it can gate CI.
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+from datetime import datetime, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+
+def configure(db_path: Path):
+    """Point app.db at a fresh embedded database; must run before app is imported."""
+    for suffix in ("", "-wal", "-shm"):
+        Path(f"{db_path}{suffix}").unlink(missing_ok=True)
+    os.environ.pop("DATABASE_URL", None)
+    os.environ.pop("ASYNC_DATABASE_URL", None)
+    os.environ["DB_PROFILE"] = "embedded"
+    os.environ["EMBEDDED_DB_PATH"] = str(db_path)
+
+
+def ingest(db, game_ids, polls: int, rng: random.Random):
+    """Both sources per game at jittered poll times, mostly repeats, committing every few polls."""
+    from app.bulk_ingest import bulk_insert_snapshots, snapshot_columns
+    from app.models import LiveOddsSnapshot, QuarterSnapshot
+    from app.snapshot_runs import record_snapshots
+
+    state = {gid: {"home": 0, "away": 0, "ml": 1.9} for gid in game_ids}
+    ts = {gid: datetime(2026, 10, 1, 19) for gid in game_ids}
+    live_columns = snapshot_columns(LiveOddsSnapshot)
+    for poll in range(polls):
+        snapshots, live_rows = [], []
+        for gid in game_ids:
+            game = state[gid]
+            # 5-40s apart: runs span irregular polls, and some minutes get none
+            ts[gid] += timedelta(seconds=rng.randint(5, 40))
+            if rng.random() < 0.2:
+                game["home"] += rng.choice((0, 2, 3))
+                game["ml"] = round(min(15.0, max(1.01, game["ml"] + rng.uniform(-0.2, 0.2))), 2)
+            quarter = 1 + poll * 4 // polls
+            snapshots.append(QuarterSnapshot(
+                game_id=gid, stage=f"Q{quarter}", score_home=game["home"], score_away=game["away"],
+                score_diff=game["home"] - game["away"], ml_home=game["ml"], ml_away=2.0, spread=-3.5, timestamp=ts[gid],
+            ))
+            live = {"game_id": gid, "timestamp": ts[gid] + timedelta(seconds=2), "quarter": quarter, "game_clock": None,
+                    "teamA_score": game["home"], "teamB_score": game["away"], "teamA_ml": game["ml"], "teamB_ml": 2.0,
+                    "spread_line": -3.5, "total_line": 221.5}
+            live_rows.append(tuple(live.get(c) for c in live_columns))
+        record_snapshots(db, snapshots)
+        # change-only detection reads the latest stored rows
+        db.flush()
+        bulk_insert_snapshots(db, LiveOddsSnapshot, live_rows)
+        if poll % 7 == 6:
+            db.commit()
+    db.commit()
+
+
+def rollup_rows(db):
+    from sqlalchemy import select
+    from app.models import OddsRollup
+
+    columns = [c for c in OddsRollup.__table__.columns if c.key != "id"]
+    rows = db.execute(select(*columns)).all()
+    return {(r.game_id, r.bucket, r.bucket_key): tuple(r) for r in rows}
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--db", type=Path, default=Path(tempfile.gettempdir()) / "nba_odds_rollups.db",
+                        help="scratch SQLite file (wiped)")
+    parser.add_argument("--games", type=int, default=3)
+    parser.add_argument("--polls", type=int, default=300)
+    args = parser.parse_args()
+
+    configure(args.db)
+    from app.db import SessionLocal, init_db
+    from app.models import Game
+    from app.rollups import rebuild_rollups
+
+    init_db()
+    game_ids = list(range(1, args.games + 1))
+    with SessionLocal() as db:
+        db.add_all([Game(id=gid, home_team=f"H{gid}", away_team=f"A{gid}", status="live",
+                         oddsportal_url=f"https://example.test/{gid}") for gid in game_ids])
+        db.commit()
+        ingest(db, game_ids, args.polls, random.Random(7))
+        incremental = rollup_rows(db)
+        rebuild_rollups(db, game_ids)
+        db.commit()
+        rebuilt = rollup_rows(db)
+
+    print("=" * 60)
+    print(f"ROLLUPS  incremental vs rebuild  ({len(rebuilt)} buckets)")
+    print("=" * 60)
+    mismatched = sorted(key for key in incremental.keys() | rebuilt.keys() if incremental.get(key) != rebuilt.get(key))
+    for key in mismatched[:10]:
+        print(f"  {key}\n    incremental {incremental.get(key)}\n    rebuilt     {rebuilt.get(key)}")
+    if mismatched:
+        print(f"FAILED: {len(mismatched)} buckets differ")
+        sys.exit(1)
+    print("PASSED")
+
+
+if __name__ == "__main__":
+    main()
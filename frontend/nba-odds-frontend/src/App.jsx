@@ -1,4 +1,4 @@
-import { useEffect, useState } from "react";
+import { useEffect, useRef, useState } from "react";
 import axios from "axios";
 import { API_BASE_URL } from "./config";
 import {
@@ -12,6 +12,9 @@ import {
   ReferenceDot,
 } from "recharts";
 
+// Seconds a scrape POST blocks for its job before the page polls /jobs/{id}
+const SCRAPE_WAIT_SECONDS = 20;
+
 function App() {
   console.log("App component rendering");
   const [quarters, setQuarters] = useState([]);
@@ -19,6 +22,9 @@ function App() {
   const [gameInfo, setGameInfo] = useState({ home: "Home", away: "Away" });
   const GAME_ID = 2; // Match the poller's game ID
   const [liveGameId, setLiveGameId] = useState(null);
+  // Poll cursors; null until the initial live-snapshots load sets them
+  const lastLiveIdRef = useRef(null);
+  const liveChangedSinceRef = useRef(null);
   const [insights, setInsights] = useState({ summary: {}, events: [] });
   const [replayMode, setReplayMode] = useState(false);
   const [replayCursor, setReplayCursor] = useState(0);
@@ -92,7 +98,11 @@ function App() {
               // fetch live snapshots for that game
               axios
                 .get(`${API_BASE_URL}/games/${encodeURIComponent(gid)}/live-snapshots`)
-                .then((r) => setLiveSnapshots(r.data))
+                .then((r) => {
+                  setLiveSnapshots(r.data);
+                  liveChangedSinceRef.current = r.headers["x-next-changed-since"] || liveChangedSinceRef.current;
+                  lastLiveIdRef.current = Math.max(0, ...r.data.map((s) => s.id));
+                })
                 .catch((e) => console.error("Error fetching live snapshots:", e));
             }
           })
@@ -101,6 +111,22 @@ function App() {
       .catch((err) => console.error("Error polling Pinnacle:", err));
   };
 
+  // Scrapes run as background jobs: the POST waits up to ?wait= seconds, then
+  // poll the job until it finishes so the refresh shows what it stored
+  const runScrape = (kind) => {
+    const waitForJob = (job) => {
+      if (!job.job_id || !["queued", "running"].includes(job.status)) return job;
+      return new Promise((resolve) => setTimeout(resolve, 1000))
+        .then(() => axios.get(`${API_BASE_URL}/jobs/${job.job_id}`))
+        .then((res) => waitForJob(res.data));
+    };
+    axios
+      .post(`${API_BASE_URL}/games/${GAME_ID}/scrape-${kind}?wait=${SCRAPE_WAIT_SECONDS}`)
+      .then((res) => waitForJob(res.data))
+      .then(() => fetchData())
+      .catch((err) => console.error("Error scraping:", err));
+  };
+
   useEffect(() => {
     // Fetch immediately on load
     fetchData();
@@ -112,9 +138,25 @@ function App() {
     let liveInterval = null;
     if (liveGameId) {
       liveInterval = setInterval(() => {
+        // Wait for the initial load, or this would fetch (and merge) everything again
+        if (lastLiveIdRef.current === null) return;
+        // Fetch rows appended since the last poll, plus rows whose run of repeated
+        // quotes was extended in place (change-only storage moves valid_until)
+        const params = { since_id: lastLiveIdRef.current };
+        if (liveChangedSinceRef.current) params.changed_since = liveChangedSinceRef.current;
         axios
-          .get(`${API_BASE_URL}/games/${encodeURIComponent(liveGameId)}/live-snapshots`)
-          .then((r) => setLiveSnapshots(r.data))
+          .get(`${API_BASE_URL}/games/${encodeURIComponent(liveGameId)}/live-snapshots`, { params })
+          .then((r) => {
+            if (r.data.length === 0) return;
+            lastLiveIdRef.current = Number(r.headers["x-next-since-id"]) || lastLiveIdRef.current;
+            liveChangedSinceRef.current = r.headers["x-next-changed-since"] || liveChangedSinceRef.current;
+            // Replace re-sent rows by id, append new ones
+            setLiveSnapshots((prev) => {
+              const byId = new Map(prev.map((s) => [s.id, s]));
+              r.data.forEach((s) => byId.set(s.id, s));
+              return [...byId.values()].sort((a, b) => a.id - b.id);
+            });
+          })
           .catch((e) => console.error("Error fetching live snapshots:", e));
       }, 5000);
     }
@@ -144,22 +186,12 @@ function App() {
     <div style={{ padding: "2rem", fontFamily: "sans-serif" }}>
       <h1>NBA Odds Momentum – Quarter by Quarter</h1>
       <button
-        onClick={() => {
-          axios
-            .post(`${API_BASE_URL}/games/${GAME_ID}/scrape-pregame`)
-            .then(() => fetchData())
-            .catch((err) => console.error("Error scraping:", err));
-        }}
+        onClick={() => runScrape("pregame")}
       >
         Scrape Pre-Game Odds Now
       </button>
       <button
-        onClick={() => {
-          axios
-            .post(`${API_BASE_URL}/games/${GAME_ID}/scrape-live`)
-            .then(() => fetchData())
-            .catch((err) => console.error("Error scraping:", err));
-        }}
+        onClick={() => runScrape("live")}
         style={{ marginLeft: "1rem" }}
       >
         Scrape Live Odds Now
@@ -100,8 +100,24 @@ function GameDetail() {
     };
 
     fetchData();
-    const interval = setInterval(fetchData, 5000);
-    return () => clearInterval(interval);
+
+    // New snapshots and insights are pushed over SSE; the slow poll only resyncs
+    const stream = new EventSource(`${API_BASE_URL}/games/${gameId}/stream`);
+    stream.addEventListener("quarter_snapshot", (e) => {
+      const { row } = JSON.parse(e.data);
+      setQuarters((prev) => [...prev, row]);
+    });
+    stream.addEventListener("insight", (e) => {
+      const { event } = JSON.parse(e.data);
+      setInsights((prev) => ({ ...prev, events: [...(prev.events || []), event] }));
+    });
+    stream.addEventListener("resync", fetchData);
+
+    const interval = setInterval(fetchData, 60000);
+    return () => {
+      stream.close();
+      clearInterval(interval);
+    };
   }, [gameId]);
 
   return (